@@ -0,0 +1,215 @@
+# Verificación de muchas cadenas a la vez sobre un AFD compilado, usando NumPy
+#
+# Las cadenas se codifican a una matriz de enteros (una fila por cadena, una columna
+# por carácter) con el mapa de alfabeto de compile_afd, y todas avanzan un carácter
+# por paso indexando la tabla de transiciones de NumPy. Las cadenas se codifican por
+# tramos consecutivos y, dentro de cada tramo, se ordenan por longitud y se agrupan en
+# bloques de a lo sumo `chunk_cells` celdas (cadenas × longitud máxima del bloque), así
+# que la memoria queda acotada y casi no hay relleno. Las cadenas muy largas se recorren
+# una por una con run_compiled_afd, donde el vector no ahorra nada.
+
+import numpy as np
+
+from regexpToAFD import run_compiled_afd
+
+# Cantidad máxima de celdas de la matriz codificada de cada bloque
+DEFAULT_CHUNK_CELLS = 1 << 24
+
+# Cadenas por bloque que debe admitir una cadena para simularse con NumPy (las de
+# más de chunk_cells / MIN_VECTOR_ROWS caracteres se recorren una por una)
+MIN_VECTOR_ROWS = 32
+
+
+# Función que elige el tipo entero más chico que representa valores hasta `limit`
+def smallest_dtype(limit):
+    for dtype in (np.uint8, np.int16, np.int32):
+        if limit <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+# Función que convierte el AFD compilado a tablas de NumPy
+def numpy_tables(compiled_afd):
+    """
+    Devuelve la tabla de transiciones de NumPy aplanada y el arreglo de aceptación.
+
+    Se agrega un estado muerto (la última fila) al que van las transiciones inexistentes
+    y una última columna para los caracteres que no están en el alfabeto. Cada celda
+    guarda el desplazamiento de la fila destino (estado × ancho), así que un paso es
+    solo table[estados + columnas].
+    """
+    width = compiled_afd["width"]
+    state_count = len(compiled_afd["accepting"])
+    dead = state_count
+    stride = width + 1
+
+    table = np.full((state_count + 1, stride), dead, dtype=np.int64)
+    flat = np.asarray(compiled_afd["table"], dtype=np.int32).reshape(state_count, width)
+    table[:state_count, :width] = np.where(flat < 0, dead, flat)
+
+    accepting = np.zeros(state_count + 1, dtype=bool)
+    accepting[:state_count] = (
+        np.frombuffer(bytes(compiled_afd["accepting"]), dtype=np.uint8) == 1
+    )
+
+    # Los desplazamientos más una columna deben caber sin desbordarse
+    offset_dtype = np.promote_types(smallest_dtype(table.size), np.int32)
+    return (table * stride).astype(offset_dtype).ravel(), accepting, stride
+
+
+# Función que crea el arreglo que traduce cada punto de código a su columna
+def symbol_columns(compiled_afd):
+    """
+    Devuelve el arreglo denso de los símbolos sueltos del alfabeto y, si el AFD tiene
+    clases de varios caracteres, sus intervalos como arreglos (inicios, finales,
+    columnas) para buscarlos con searchsorted; si no, None.
+    """
+    alphabet = compiled_afd["alphabet"]
+    unknown = compiled_afd["width"]
+    singles = {
+        symbol: column for symbol, column in alphabet.items() if len(symbol) == 1
+    }
+    code_points = [ord(symbol) for symbol in singles]
+    column_dtype = smallest_dtype(unknown)
+    columns = np.full(max(code_points, default=0) + 2, unknown, dtype=column_dtype)
+    for symbol, column in singles.items():
+        columns[ord(symbol)] = column
+
+    ranges = compiled_afd.get("ranges")
+    if ranges is not None:
+        starts, ends, range_columns = ranges
+        ranges = (
+            np.asarray(starts, dtype=np.int64),
+            np.asarray(ends, dtype=np.int64),
+            np.asarray(range_columns, dtype=column_dtype),
+        )
+    return columns, ranges
+
+
+# Función que traduce las cadenas concatenadas a sus columnas del alfabeto
+def encode_symbols(strings, columns, ranges=None):
+    # Un sustituto suelto ("\ud800") no es UTF-32 válido: surrogatepass lo deja como
+    # su punto de código, igual que lo ve run_compiled_afd
+    code_points = np.frombuffer(
+        "".join(strings).encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+    )
+    symbols = columns[np.minimum(code_points, len(columns) - 1)]
+    if ranges is not None:
+        # Caracteres que pertenecen a una clase de varios caracteres
+        starts, ends, range_columns = ranges
+        index = np.maximum(np.searchsorted(starts, code_points, side="right") - 1, 0)
+        inside = (starts[index] <= code_points) & (code_points <= ends[index])
+        symbols = np.where(inside, range_columns[index], symbols)
+    return symbols
+
+
+# Función que simula un bloque de cadenas ya codificadas
+def match_chunk(symbols, starts, lengths, table, accepting, stride, initial):
+    """
+    Cada fila del bloque es symbols[starts[i] : starts[i] + lengths[i]]; las filas
+    vienen ordenadas de la más larga a la más corta, así que en el paso j solo avanzan
+    las primeras `active` filas, que son las que tienen más de j caracteres. Devuelve
+    la aceptación de cada fila en ese mismo orden.
+    """
+    count = len(lengths)
+    longest = int(lengths[0]) if count else 0
+    active_counts = np.searchsorted(-lengths, -np.arange(longest), side="left")
+
+    # Matriz (carácter j, cadena) para que cada paso lea una fila contigua
+    total = int(lengths.sum())
+    row_starts = np.cumsum(lengths) - lengths
+    offsets = np.arange(total) - np.repeat(row_starts, lengths)
+    encoded = np.zeros((longest, count), dtype=symbols.dtype)
+    encoded[offsets, np.repeat(np.arange(count), lengths)] = symbols[
+        np.repeat(starts, lengths) + offsets
+    ]
+
+    states = np.full(count, initial * stride, dtype=table.dtype)
+    for step in range(longest):
+        active = active_counts[step]
+        states[:active] = table[states[:active] + encoded[step, :active]]
+
+    return accepting[states // stride]
+
+
+# Función que divide las cadenas ordenadas por longitud en bloques de celdas acotadas
+def length_chunks(lengths, chunk_cells):
+    """
+    Devuelve los índices de las cadenas (de la más corta a la más larga) y los límites
+    [inicio, fin) de cada bloque dentro de ese orden. Cada bloque cumple
+    cadenas × longitud máxima <= chunk_cells, salvo una cadena que sola ya lo supera.
+    """
+    order = np.argsort(lengths, kind="stable")
+    sorted_lengths = lengths[order]
+    bounds = []
+    start = 0
+
+    while start < len(order):
+        # Las celdas de un bloque desde `start` crecen con cada cadena agregada (la
+        # última es la más larga), así que el fin se busca con searchsorted; ninguna
+        # cadena es más corta que la primera, lo que acota la ventana de búsqueda
+        shortest = max(int(sorted_lengths[start]), 1)
+        window = sorted_lengths[start : start + chunk_cells // shortest]
+        cells = np.arange(1, len(window) + 1) * window
+        end = start + max(int(np.searchsorted(cells, chunk_cells, side="right")), 1)
+        bounds.append((start, end))
+        start = end
+
+    return order, bounds
+
+
+# Función que verifica un lote de cadenas y devuelve un arreglo de booleanos
+def match_batch(compiled_afd, strings, chunk_cells=DEFAULT_CHUNK_CELLS):
+    """
+    Verifica todas las cadenas de `strings` (lista o arreglo) contra el AFD compilado.
+
+    Las cadenas se codifican por tramos consecutivos de a lo sumo `chunk_cells`
+    caracteres; dentro de cada tramo se ordenan por longitud y se simulan en bloques
+    cuya matriz mide a lo sumo `chunk_cells` celdas. Las cadenas de más de
+    chunk_cells / MIN_VECTOR_ROWS caracteres se verifican con run_compiled_afd.
+    Devuelve un arreglo booleano en el mismo orden que `strings`.
+    """
+    strings = list(strings)
+    table, accepting, stride = numpy_tables(compiled_afd)
+    columns, ranges = symbol_columns(compiled_afd)
+    initial = compiled_afd["initial"]
+    result = np.empty(len(strings), dtype=bool)
+
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+    long_strings = lengths > chunk_cells // MIN_VECTOR_ROWS
+    for index in np.flatnonzero(long_strings).tolist():
+        result[index] = run_compiled_afd(compiled_afd, strings[index])
+
+    # Tramos consecutivos de cadenas cortas con a lo sumo chunk_cells caracteres
+    short_indices = np.flatnonzero(~long_strings)
+    short_lengths = lengths[short_indices]
+    ends = np.cumsum(short_lengths)
+    start = 0
+    while start < len(short_indices):
+        limit = (ends[start - 1] if start else 0) + chunk_cells
+        end = max(int(np.searchsorted(ends, limit, side="right")), start + 1)
+        indices = short_indices[start:end]
+        slab_lengths = short_lengths[start:end]
+        first, last = int(indices[0]), int(indices[-1])
+        if last - first + 1 == len(indices):
+            slab = strings[first : last + 1]
+        else:
+            slab = [strings[index] for index in indices.tolist()]
+        symbols = encode_symbols(slab, columns, ranges)
+        slab_starts = np.cumsum(slab_lengths) - slab_lengths
+
+        order, bounds = length_chunks(slab_lengths, chunk_cells)
+        for chunk_start, chunk_end in bounds:
+            rows = order[chunk_start:chunk_end][::-1]
+            result[indices[rows]] = match_chunk(
+                symbols,
+                slab_starts[rows],
+                slab_lengths[rows],
+                table,
+                accepting,
+                stride,
+                initial,
+            )
+        start = end
+
+    return result
@@ -0,0 +1,136 @@
+# Compilación en paralelo de un catálogo de expresiones regulares
+#
+# Las expresiones se reparten entre los procesos de un ProcessPoolExecutor. Cada
+# proceso devuelve el AFD minimizado en el formato binario de serialize_compiled_afd
+# (unos pocos bytes que se copian entre procesos mucho más rápido que los
+# diccionarios y frozensets intermedios). Los resultados conservan el orden de
+# entrada y un error o un tiempo agotado solo afecta a su propia expresión.
+#
+#   python Primera_parte/bulkAFD.py patrones.txt --workers 8 --timeout 5
+
+import argparse
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cacheAFD import CompileCache, pipeline_functions
+from regexpToAFD import serialize_compiled_afd
+
+# Cantidad de expresiones que se envían juntas a cada proceso
+DEFAULT_CHUNK_SIZE = 16
+
+
+class CompileTimeout(Exception):
+    pass
+
+
+def raise_timeout(signum, frame):
+    raise CompileTimeout()
+
+
+# Función que compila una expresión en un proceso del pool
+def compile_task(task):
+    """
+    Devuelve (bytes del AFD, None) o (None, mensaje de error).
+
+    El tiempo límite se aplica dentro del proceso con una alarma (SIGALRM), que
+    interrumpe la compilación sin perder el proceso; en plataformas sin setitimer la
+    expresión se compila sin límite.
+    """
+    regex, engine, timeout = task
+    use_alarm = timeout and hasattr(signal, "setitimer")
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        _, compile_function = pipeline_functions(engine)
+        return serialize_compiled_afd(compile_function(regex)), None
+    except CompileTimeout:
+        return None, f"tiempo agotado ({timeout} s)"
+    except Exception as error:
+        return None, f"{type(error).__name__}: {error}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+# Función que lee una expresión por línea (se omiten las líneas vacías)
+def read_patterns(path):
+    with open(path, encoding="utf-8") as file:
+        return [line.rstrip("\r\n") for line in file if line.strip()]
+
+
+# Función que compila todas las expresiones en paralelo
+def bulk_compile(
+    patterns,
+    engine="direct",
+    workers=None,
+    timeout=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """
+    Compila `patterns` (una ruta de archivo con una expresión por línea o un iterable
+    de expresiones) y devuelve, en el mismo orden, una lista de diccionarios
+    {"regex", "data", "error"}: "data" son los bytes de serialize_compiled_afd
+    (deserialize_compiled_afd los convierte en un AFD listo para usar) o None si la
+    compilación falló, y en ese caso "error" describe el problema.
+    """
+    if isinstance(patterns, (str, os.PathLike)):
+        patterns = read_patterns(patterns)
+    patterns = list(patterns)
+    pipeline_functions(engine)  # Validar el pipeline antes de crear los procesos
+
+    tasks = [(regex, engine, timeout) for regex in patterns]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(compile_task, tasks, chunksize=chunk_size))
+
+    return [
+        {"regex": regex, "data": data, "error": error}
+        for regex, (data, error) in zip(patterns, outcomes)
+    ]
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description="Compila en paralelo un catálogo de expresiones regulares."
+    )
+    parser.add_argument("patterns", help="archivo con una expresión por línea")
+    parser.add_argument("--engine", choices=("direct", "subsets"), default="direct")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="segundos máximos por expresión"
+    )
+    parser.add_argument(
+        "--cache", metavar="CARPETA", help="guardar los AFDs en una CompileCache"
+    )
+    options = parser.parse_args(arguments)
+
+    start = time.perf_counter()
+    results = bulk_compile(
+        options.patterns, options.engine, options.workers, options.timeout
+    )
+    elapsed = time.perf_counter() - start
+
+    cache = CompileCache(options.cache) if options.cache else None
+    failures = 0
+    for number, result in enumerate(results, 1):
+        if result["error"] is not None:
+            failures += 1
+            print(f"{number}: {result['regex']!r}: {result['error']}", file=sys.stderr)
+        elif cache is not None:
+            cache.store_bytes(
+                cache.key(result["regex"], options.engine), result["data"]
+            )
+
+    print(
+        f"{len(results) - failures} compiladas, {failures} con error "
+        f"en {elapsed:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
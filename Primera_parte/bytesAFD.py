@@ -0,0 +1,267 @@
+# Autómata a nivel de bytes (UTF-8) para verificar búferes sin decodificarlos
+#
+# compile_byte_afd baja el AFD compilado (de cualquiera de los dos pipelines) a un
+# AFD de 256 columnas, una por valor de byte: cada clase del alfabeto se divide en
+# secuencias de rangos de bytes UTF-8 (utf8_sequences) y los caracteres de varios
+# bytes pasan por estados intermedios. Así la verificación recorre directamente un
+# bytes, bytearray, memoryview o mmap, sin decodificar ni crear cadenas intermedias;
+# un carácter partido entre dos bloques tampoco necesita un decodificador, porque el
+# estado intermedio pasa de un bloque al siguiente. Las secuencias que no son UTF-8
+# válido (incluidos los sustitutos D800-DFFF) se rechazan.
+#
+#   byte_afd = compile_byte_afd(compile_regex("[a-zé]*"))
+#   byte_fullmatch(byte_afd, "café".encode())
+
+import mmap
+import os
+
+from cacheAFD import compile
+from symbolsAFD import symbol_set
+
+# Cantidad de columnas de la tabla (una por valor de byte)
+BYTE_WIDTH = 256
+
+# Último punto de código que se codifica con 1, 2 y 3 bytes
+UTF8_BOUNDARIES = (0x7F, 0x7FF, 0xFFFF)
+
+# Puntos de código sustitutos: no se pueden codificar en UTF-8 válido
+SURROGATES = (0xD800, 0xDFFF)
+
+# Cada cuántos bytes se revisa si el recorrido llegó al estado muerto
+DEAD_CHECK_INTERVAL = 1 << 16
+
+
+# Función que divide un intervalo de puntos de código en secuencias de rangos de bytes
+def utf8_sequences(start, end):
+    """
+    Devuelve una lista de tuplas ((lo1, hi1), (lo2, hi2), ...): los bytes cuyo i-ésimo
+    valor está en el i-ésimo rango son exactamente las codificaciones UTF-8 de
+    [start, end] (el mismo algoritmo que usan RE2 y el crate regex de Rust). El
+    intervalo no debe contener sustitutos.
+    """
+    sequences = []
+    pending = [(start, end)]
+
+    while pending:
+        start, end = pending.pop()
+
+        # 1. Separar por cantidad de bytes de la codificación
+        for boundary in UTF8_BOUNDARIES:
+            if start <= boundary < end:
+                pending.append((boundary + 1, end))
+                pending.append((start, boundary))
+                break
+        else:
+            # 2. Alinear los extremos a bloques completos de bytes de continuación
+            for continuation in (1, 2, 3):
+                mask = (1 << (6 * continuation)) - 1
+                if start & ~mask == end & ~mask:
+                    continue
+                if start & mask:
+                    pending.append(((start | mask) + 1, end))
+                    pending.append((start, start | mask))
+                    break
+                if end & mask != mask:
+                    pending.append((end & ~mask, end))
+                    pending.append((start, (end & ~mask) - 1))
+                    break
+            else:
+                # 3. Los bytes de los extremos delimitan cada rango de la secuencia
+                low = chr(start).encode("utf-8")
+                high = chr(end).encode("utf-8")
+                sequences.append(tuple(zip(low, high)))
+
+    return sequences
+
+
+# Función que quita los sustitutos de una lista de intervalos
+def without_surrogates(intervals):
+    result = []
+    for lo, hi in intervals:
+        if lo < SURROGATES[0]:
+            result.append((lo, min(hi, SURROGATES[0] - 1)))
+        if hi > SURROGATES[1]:
+            result.append((max(lo, SURROGATES[1] + 1), hi))
+    return result
+
+
+# Función que baja el AFD compilado a un AFD de bytes de 256 columnas
+def compile_byte_afd(compiled_afd):
+    """
+    Devuelve {"table", "accepting", "initial", "dead"}.
+
+    Cada estado del AFD de bytes es un conjunto de elementos: un estado del AFD de
+    caracteres (un entero) o un carácter a medio leer (rangos de bytes restantes,
+    estado destino). Se construyen por subconjuntos desde el estado inicial; como las
+    clases son disjuntas, al terminar un carácter el conjunto vuelve a tener un solo
+    estado del AFD de caracteres.
+
+    La tabla es plana (estado × 256 + byte) y cada celda guarda el desplazamiento de
+    la fila destino (estado × 256), así que un paso es solo table[fila + byte]. Las
+    transiciones inexistentes van a un estado muerto (el último, que no acepta y
+    vuelve a sí mismo); "dead" es su desplazamiento.
+    """
+    width = compiled_afd["width"]
+    char_table = compiled_afd["table"]
+    char_accepting = compiled_afd["accepting"]
+
+    # Secuencias UTF-8 de cada columna del AFD de caracteres
+    column_sequences = []
+    for symbol, column in compiled_afd["alphabet"].items():
+        sequences = []
+        for lo, hi in without_surrogates(symbol_set(symbol)):
+            sequences.extend(utf8_sequences(lo, hi))
+        column_sequences.append((column, sequences))
+
+    def moves(items):
+        # Byte -> conjunto de elementos alcanzados
+        reached = {}
+
+        def add(ranges, target):
+            # El primer rango lleva al resto de la secuencia (o al destino al final)
+            item = target if len(ranges) == 1 else (ranges[1:], target)
+            for byte in range(ranges[0][0], ranges[0][1] + 1):
+                reached.setdefault(byte, set()).add(item)
+
+        for item in items:
+            if isinstance(item, int):
+                for column, sequences in column_sequences:
+                    target = char_table[item * width + column]
+                    if target < 0:
+                        continue
+                    for sequence in sequences:
+                        add(sequence, target)
+            else:
+                add(*item)
+
+        return reached
+
+    start = frozenset([compiled_afd["initial"]])
+    state_ids = {start: 0}
+    pending = [start]
+    rows = []
+
+    while pending:
+        items = pending.pop()
+        row = {}
+        for byte, reached in moves(items).items():
+            reached = frozenset(reached)
+            if reached not in state_ids:
+                state_ids[reached] = len(state_ids)
+                pending.append(reached)
+            row[byte] = state_ids[reached]
+        rows.append((state_ids[items], row))
+
+    # Un solo objeto entero por desplazamiento: las celdas de la tupla lo comparten
+    dead = len(state_ids)
+    offsets = [state * BYTE_WIDTH for state in range(dead + 1)]
+    table = [offsets[dead]] * ((dead + 1) * BYTE_WIDTH)
+    for state, row in rows:
+        for byte, target in row.items():
+            table[state * BYTE_WIDTH + byte] = offsets[target]
+
+    accepting = bytearray(dead + 1)
+    for items, state in state_ids.items():
+        if any(isinstance(item, int) and char_accepting[item] for item in items):
+            accepting[state] = 1
+
+    return {
+        "table": tuple(table),
+        "accepting": bytes(accepting),
+        "initial": 0,
+        "dead": dead * BYTE_WIDTH,
+    }
+
+
+# Función que avanza el AFD de bytes desde un estado y devuelve el estado final
+def advance_byte_afd(byte_afd, state, buffer):
+    """
+    `buffer` es cualquier objeto con el protocolo de búfer (bytes, bytearray,
+    memoryview, mmap, array); se recorre a través de un memoryview, sin copiarlo. El
+    estado es el desplazamiento de la fila (estado × 256), así que el resultado de un
+    bloque sirve como estado inicial del siguiente aunque un carácter quede partido.
+    """
+    table = byte_afd["table"]
+    dead = byte_afd["dead"]
+
+    with memoryview(buffer) as view, view.cast("B") as data:
+        for start in range(0, len(data), DEAD_CHECK_INTERVAL):
+            for byte in data[start : start + DEAD_CHECK_INTERVAL]:
+                state = table[state + byte]
+            if state == dead:
+                break
+
+    return state
+
+
+# Función que verifica si todo el búfer es aceptado por el AFD de bytes
+def byte_fullmatch(byte_afd, buffer):
+    state = advance_byte_afd(byte_afd, byte_afd["initial"] * BYTE_WIDTH, buffer)
+    return byte_afd["accepting"][state // BYTE_WIDTH] == 1
+
+
+# Función que verifica un archivo completo recorriéndolo con mmap
+def byte_fullmatch_file(byte_afd, path):
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return byte_fullmatch(byte_afd, b"")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return byte_fullmatch(byte_afd, mapped)
+
+
+class ByteMatcher:
+    """
+    Verificador inmutable sobre bytes UTF-8, equivalente a matcherAFD.Matcher sobre
+    el texto decodificado (las secuencias UTF-8 inválidas se rechazan).
+    """
+
+    __slots__ = ("regex", "engine", "byte_afd", "_table", "_accepting", "_initial")
+
+    def __init__(self, compiled_afd, regex=None, engine=None):
+        byte_afd = compile_byte_afd(compiled_afd)
+        set_attribute = object.__setattr__
+        set_attribute(self, "regex", regex)
+        set_attribute(self, "engine", engine)
+        set_attribute(self, "byte_afd", byte_afd)
+        set_attribute(self, "_table", byte_afd["table"])
+        set_attribute(self, "_accepting", byte_afd["accepting"])
+        set_attribute(self, "_initial", byte_afd["initial"] * BYTE_WIDTH)
+
+    @classmethod
+    def from_regex(cls, regex, engine="direct"):
+        return cls(compile(regex, engine), regex, engine)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ByteMatcher es inmutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ByteMatcher es inmutable")
+
+    def __repr__(self):
+        return f"ByteMatcher({self.regex!r}, engine={self.engine!r})"
+
+    def fullmatch(self, buffer):
+        state = advance_byte_afd(self.byte_afd, self._initial, buffer)
+        return self._accepting[state // BYTE_WIDTH] == 1
+
+    def fullmatch_file(self, path):
+        return byte_fullmatch_file(self.byte_afd, path)
+
+    def match_many(self, buffers):
+        table = self._table
+        accepting = self._accepting
+        initial = self._initial
+        results = []
+        append = results.append
+
+        # Búferes cortos (líneas, registros): se recorren completos sin revisar el
+        # estado muerto; bytes y bytearray ya se recorren como enteros
+        for buffer in buffers:
+            if not isinstance(buffer, (bytes, bytearray)):
+                buffer = memoryview(buffer).cast("B")
+            state = initial
+            for byte in buffer:
+                state = table[state + byte]
+            append(accepting[state // BYTE_WIDTH] == 1)
+
+        return results
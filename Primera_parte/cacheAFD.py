@@ -0,0 +1,303 @@
+# Caché en disco de AFDs compilados y minimizados
+#
+# Cada expresión regular se compila una sola vez por combinación de expresión
+# (normalizada a postfix), pipeline y versión del código; el resultado se guarda en el
+# formato binario de serialize_compiled_afd. La clave es un hash SHA-256 de esos tres
+# datos, así que cambiar el código de construcción invalida las entradas anteriores.
+# Las escrituras son atómicas (archivo temporal + os.replace) y el directorio tiene un
+# límite de tamaño: al superarlo se borran las entradas usadas hace más tiempo.
+#
+# Sobre la caché en disco hay una caché en memoria (MemoryCache) de AFDs compilados
+# inmutables, con desalojo LRU y segura entre hilos; compile() usa una compartida.
+
+import functools
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+from regexpToAFD import (
+    COMPILED_AFD_VERSION,
+    augmented_postfix,
+    compile_regex,
+    deserialize_compiled_afd,
+    freeze_compiled_afd,
+    run_compiled_afd,
+    serialize_compiled_afd,
+)
+
+PRIMERA_PARTE = os.path.dirname(os.path.abspath(__file__))
+SEGUNDA_PARTE = os.path.join(PRIMERA_PARTE, "..", "Segunda_parte")
+
+# Directorio por defecto de la caché (se puede cambiar con AFD_CACHE_DIR)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AFD_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "afd")
+)
+
+# Tamaño máximo por defecto de la caché (en bytes)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+CACHE_SUFFIX = ".afd"
+
+# Cantidad máxima por defecto de AFDs guardados en memoria
+DEFAULT_MAX_ENTRIES = 256
+
+# Archivos cuyo contenido forma parte de la versión del código de cada pipeline
+PIPELINE_SOURCES = {
+    "direct": [
+        os.path.join(PRIMERA_PARTE, "regexpToAFD.py"),
+        os.path.join(PRIMERA_PARTE, "symbolsAFD.py"),
+    ],
+    "subsets": [
+        os.path.join(PRIMERA_PARTE, "regexpToAFD.py"),
+        os.path.join(PRIMERA_PARTE, "symbolsAFD.py"),
+        os.path.join(SEGUNDA_PARTE, "shunYard.py"),
+        os.path.join(SEGUNDA_PARTE, "regexpToAFN.py"),
+        os.path.join(SEGUNDA_PARTE, "AFNToAFD.py"),
+        os.path.join(SEGUNDA_PARTE, "minimizeAFD.py"),
+        os.path.join(SEGUNDA_PARTE, "compileAFD.py"),
+    ],
+}
+
+
+# Función que devuelve las funciones (normalizar, compilar) de cada pipeline
+def pipeline_functions(pipeline):
+    if pipeline == "direct":
+        # Construcción directa con followpos (Primera_parte)
+        return augmented_postfix, compile_regex
+    if pipeline == "subsets":
+        # Thompson, subconjuntos y minimización (Segunda_parte)
+        if SEGUNDA_PARTE not in sys.path:
+            sys.path.append(SEGUNDA_PARTE)
+        from compileAFD import compileRegex
+        from shunYard import toPostFix as subsetsPostFix
+
+        return subsetsPostFix, compileRegex
+    raise ValueError(
+        f"Pipeline desconocido: {pipeline!r} (se esperaba 'direct' o 'subsets')"
+    )
+
+
+# Función que calcula la versión del código de un pipeline (hash de sus fuentes)
+@functools.cache
+def code_version(pipeline):
+    digest = hashlib.sha256(f"formato {COMPILED_AFD_VERSION}".encode())
+    for path in PIPELINE_SOURCES[pipeline]:
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+class CompileCache:
+    """
+    Caché en disco de AFDs compilados.
+
+    `directory` es la carpeta de la caché (se crea si no existe) y `max_bytes` el
+    tamaño total máximo de sus archivos. La fecha de modificación de cada archivo se
+    actualiza al leerlo, así que sirve como marca de último uso para el desalojo LRU.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self.hits = 0  # AFDs leídos de la caché
+        self.misses = 0  # AFDs que hubo que compilar
+        self.evictions = 0  # Archivos borrados por el límite de tamaño
+
+    def key(self, regex, pipeline="direct"):
+        normalize, _ = pipeline_functions(pipeline)
+        digest = hashlib.sha256()
+        for part in (normalize(regex), pipeline, code_version(pipeline)):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def load(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            compiled_afd = deserialize_compiled_afd(data)
+        except FileNotFoundError:
+            return None
+        except (ValueError, struct.error):
+            # Archivo dañado o de otra versión del formato: se descarta
+            self.remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return compiled_afd
+
+    def store(self, key, compiled_afd):
+        self.store_bytes(key, serialize_compiled_afd(compiled_afd))
+
+    def store_bytes(self, key, data):
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            # El archivo final aparece completo o no aparece
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            self.remove(temporary)
+            raise
+        self.evict()
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(CACHE_SUFFIX):
+                    continue
+                try:
+                    info = entry.stat()
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, entry.path))
+                total += info.st_size
+
+        # Borrar desde el usado hace más tiempo hasta quedar bajo el límite
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+            self.evictions += 1
+
+    def compile(self, regex, pipeline="direct"):
+        key = self.key(regex, pipeline)
+        compiled_afd = self.load(key)
+        if compiled_afd is not None:
+            self.hits += 1
+            return compiled_afd
+
+        self.misses += 1
+        _, compile_function = pipeline_functions(pipeline)
+        compiled_afd = compile_function(regex)
+        self.store(key, compiled_afd)
+        return compiled_afd
+
+    def matcher(self, regex, pipeline="direct"):
+        # Función lista para usar: matcher(cadena) -> bool
+        return functools.partial(run_compiled_afd, self.compile(regex, pipeline))
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class MemoryCache:
+    """
+    Caché en memoria de AFDs compilados e inmutables (freeze_compiled_afd).
+
+    Guarda a lo sumo `max_entries` AFDs y desaloja el usado hace más tiempo. Si se
+    indica `disk_cache` (un CompileCache), las compilaciones que faltan se buscan
+    primero en disco. Es segura entre hilos: un candado protege el diccionario y, si
+    varios hilos piden a la vez la misma expresión que falta, solo uno la compila y
+    los demás esperan su resultado.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, disk_cache=None):
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self.entries = OrderedDict()  # (regex, engine) -> AFD compilado
+        self.compiling = {}  # (regex, engine) -> candado de la compilación en curso
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        # Debe llamarse con el candado tomado
+        compiled_afd = self.entries.get(key)
+        if compiled_afd is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return compiled_afd
+
+    def compile(self, regex, engine="direct"):
+        key = (regex, engine)
+        with self.lock:
+            compiled_afd = self.get(key)
+            if compiled_afd is not None:
+                return compiled_afd
+            key_lock = self.compiling.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self.lock:
+                # Otro hilo pudo terminar la compilación mientras se esperaba
+                compiled_afd = self.get(key)
+                if compiled_afd is not None:
+                    return compiled_afd
+                self.misses += 1
+
+            try:
+                if self.disk_cache is not None:
+                    compiled_afd = self.disk_cache.compile(regex, engine)
+                else:
+                    _, compile_function = pipeline_functions(engine)
+                    compiled_afd = compile_function(regex)
+                compiled_afd = freeze_compiled_afd(compiled_afd)
+
+                with self.lock:
+                    self.entries[key] = compiled_afd
+                    while len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+                        self.evictions += 1
+            finally:
+                with self.lock:
+                    self.compiling.pop(key, None)
+
+        return compiled_afd
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Caché compartida por compile()
+DEFAULT_MEMORY_CACHE = MemoryCache()
+
+
+# Función que compila (o toma de la caché) el AFD de una expresión regular
+def compile(regex, engine="direct", cache=None):
+    """
+    Devuelve el AFD compilado, minimizado e inmutable de `regex`. `engine` es el
+    pipeline: "direct" (construcción directa) o "subsets" (Thompson y subconjuntos).
+    Sin `cache` se usa DEFAULT_MEMORY_CACHE.
+    """
+    if cache is None:
+        cache = DEFAULT_MEMORY_CACHE
+    return cache.compile(regex, engine)
@@ -0,0 +1,128 @@
+# Instrumentación opcional de las etapas de compilación
+#
+# Las etapas de ambos pipelines están decoradas con @stage y registran contadores con
+# count(). Mientras no haya un `with instrument():` activo, @stage solo consulta una
+# ContextVar antes de llamar a la función y count() no hace nada, así que el costo es
+# casi nulo. Dentro del bloque se guardan el tiempo de cada llamada a una etapa y los
+# contadores (posiciones, tamaño de siguientepos, estados y transiciones, cierres
+# epsilon, divisiones de la partición, ...), agrupados por etapa.
+#
+#   with instrument() as recorder:
+#       compile_regex("(a|b)*abb")
+#   print(recorder.as_dict())
+#   print(recorder.json_lines())
+
+import contextlib
+import contextvars
+import functools
+import json
+import time
+
+# Registro activo en el contexto actual (None = instrumentación desactivada). Al ser
+# una ContextVar cada hilo tiene el suyo.
+_recorder = contextvars.ContextVar("afd_recorder", default=None)
+
+
+class Recorder:
+    """
+    Acumula los eventos de las etapas ejecutadas dentro de `instrument()`.
+
+    Cada llamada a una etapa produce un evento {"stage", "depth", "seconds",
+    "counters"}; los contadores se suman al evento de la etapa en curso más interna y
+    al total. Si se indica `callback`, se llama con cada evento al terminar la etapa.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.events = []
+        self.counters = {}
+        self.open_events = []
+
+    def begin(self, name):
+        event = {
+            "stage": name,
+            "depth": len(self.open_events),
+            "seconds": 0.0,
+            "counters": {},
+        }
+        self.open_events.append(event)
+        return event
+
+    def end(self, event, seconds):
+        event["seconds"] = seconds
+        self.open_events.pop()
+        self.events.append(event)
+        if self.callback is not None:
+            self.callback(event)
+
+    def add(self, name, amount):
+        self.counters[name] = self.counters.get(name, 0) + amount
+        if self.open_events:
+            counters = self.open_events[-1]["counters"]
+            counters[name] = counters.get(name, 0) + amount
+
+    def as_dict(self):
+        stages = {}
+        for event in self.events:
+            summary = stages.setdefault(
+                event["stage"], {"calls": 0, "seconds": 0.0, "counters": {}}
+            )
+            summary["calls"] += 1
+            summary["seconds"] += event["seconds"]
+            for name, amount in event["counters"].items():
+                summary["counters"][name] = summary["counters"].get(name, 0) + amount
+        return {"stages": stages, "counters": dict(self.counters)}
+
+    def json_lines(self):
+        return "".join(json.dumps(event) + "\n" for event in self.events)
+
+
+@contextlib.contextmanager
+def instrument(callback=None):
+    recorder = Recorder(callback)
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+# Función que crea un callback que escribe cada evento como una línea JSON en `file`
+def json_lines_writer(file):
+    def write(event):
+        file.write(json.dumps(event) + "\n")
+
+    return write
+
+
+# Función que indica si hay una instrumentación activa (para no calcular contadores caros)
+def enabled():
+    return _recorder.get() is not None
+
+
+# Función que suma `amount` al contador `name` si la instrumentación está activa
+def count(name, amount=1):
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.add(name, amount)
+
+
+# Decorador que mide el tiempo de una etapa si la instrumentación está activa
+def stage(name):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder.get()
+            if recorder is None:
+                return function(*args, **kwargs)
+
+            event = recorder.begin(name)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                recorder.end(event, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
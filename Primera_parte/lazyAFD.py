@@ -0,0 +1,176 @@
+# AFD perezoso: los estados se calculan durante la simulación y se guardan en caché
+#
+# En lugar de construir todo el AFD antes de probar una cadena, cada estado se calcula
+# la primera vez que la entrada llega a él. Para expresiones como (a|b)*a(a|b)(a|b)...
+# el AFD completo es exponencial, pero una cadena solo visita tantos estados como
+# caracteres tiene. La caché tiene un límite de memoria; al superarlo se vacía por
+# completo (se conserva solo el estado actual) y se sigue calculando desde ahí.
+#
+# Con repeticiones {m,n} los estados son conjuntos de configuraciones (posición,
+# contadores): x{1,100000} se prepara en el tiempo de x y solo se calculan los
+# estados de los contadores que la entrada alcanza.
+
+import sys
+
+from regexpToAFD import (
+    augmented_postfix,
+    build_syntax_tree,
+    compute_counted_followpos,
+    compute_followpos,
+    follow_configurations,
+    has_repetition,
+    initial_configurations,
+)
+from symbolsAFD import label_contains
+
+# Memoria estimada por transición guardada (entrada de diccionario más el entero)
+TRANSITION_BYTES = 64
+
+# Límite de memoria por defecto de la caché de estados (en bytes)
+DEFAULT_MAX_MEMORY = 8 * 1024 * 1024
+
+
+class LazyAFD:
+    """
+    Simulador de un AFD cuyos estados se calculan bajo demanda.
+
+    `start` es la clave del estado inicial, `step(key, symbol)` devuelve la clave del
+    siguiente estado (una clave vacía significa rechazo) y `is_accepting(key)` indica si
+    el estado acepta. Las claves deben ser hashables (por ejemplo frozensets).
+    """
+
+    def __init__(self, start, step, is_accepting, max_memory=DEFAULT_MAX_MEMORY):
+        self.start = start
+        self.step = step
+        self.is_accepting = is_accepting
+        self.max_memory = max_memory
+
+        self.hits = 0  # Transiciones encontradas en la caché
+        self.misses = 0  # Transiciones que hubo que calcular
+        self.flushes = 0  # Veces que se vació la caché por falta de memoria
+        self.clear_cache()
+
+    def clear_cache(self):
+        self.state_ids = {}  # Clave -> id del estado
+        self.keys = []  # Id -> clave
+        self.rows = []  # Id -> {símbolo: id del siguiente estado (-1 = rechazo)}
+        self.accepting = []  # Id -> si es de aceptación
+        self.memory = 0
+
+    def add_state(self, key):
+        state_id = len(self.keys)
+        self.state_ids[key] = state_id
+        self.keys.append(key)
+        self.rows.append({})
+        self.accepting.append(bool(self.is_accepting(key)))
+        self.memory += sys.getsizeof(key) + sys.getsizeof({})
+        return state_id
+
+    def state_id(self, key):
+        state_id = self.state_ids.get(key)
+        if state_id is None:
+            state_id = self.add_state(key)
+        return state_id
+
+    def next_state(self, state_id, symbol):
+        # Calcular la transición que no estaba en la caché
+        self.misses += 1
+        key = self.step(self.keys[state_id], symbol)
+        if not key:
+            next_id = -1
+        else:
+            if self.memory > self.max_memory:
+                # Sin memoria: se vacía la caché conservando solo el estado actual
+                current = self.keys[state_id]
+                self.clear_cache()
+                self.flushes += 1
+                state_id = self.add_state(current)
+            next_id = self.state_id(key)
+
+        self.rows[state_id][symbol] = next_id
+        self.memory += TRANSITION_BYTES
+        return next_id
+
+    def fullmatch(self, input_string):
+        current = self.state_id(self.start)
+
+        for symbol in input_string:
+            next_id = self.rows[current].get(symbol)
+            if next_id is None:
+                next_id = self.next_state(current, symbol)
+            else:
+                self.hits += 1
+            if next_id < 0:
+                return False
+            current = next_id
+
+        return self.accepting[current]
+
+    def stats(self):
+        return {
+            "states": len(self.keys),
+            "memory": self.memory,
+            "hits": self.hits,
+            "misses": self.misses,
+            "flushes": self.flushes,
+        }
+
+
+# Función que crea el AFD perezoso a partir del árbol sintáctico (construcción directa)
+def lazy_afd_from_tree(root, position_symbol_map, max_memory=DEFAULT_MAX_MEMORY):
+    if has_repetition(root):
+        return lazy_afd_from_counters(root, position_symbol_map, max_memory)
+
+    followpos = {pos: set() for pos in position_symbol_map}
+    compute_followpos(root, followpos)
+    end_positions = {
+        pos for pos, symbol in position_symbol_map.items() if symbol == "#"
+    }
+
+    def step(state, symbol):
+        next_state = set()
+        for pos in state:
+            label = position_symbol_map[pos]
+            # "#" y "_" no son símbolos de entrada, igual que en construct_afd
+            if label == "#" or label == "_":
+                continue
+            if label == symbol or label_contains(label, symbol):
+                next_state |= followpos[pos]
+        return frozenset(next_state)
+
+    def is_accepting(state):
+        return not end_positions.isdisjoint(state)
+
+    return LazyAFD(frozenset(root.firstpos), step, is_accepting, max_memory)
+
+
+# Función que crea el AFD perezoso de un árbol con repeticiones {m,n}
+def lazy_afd_from_counters(root, position_symbol_map, max_memory=DEFAULT_MAX_MEMORY):
+    followpos, scopes, bounds = compute_counted_followpos(root)
+    end_positions = {
+        pos for pos, symbol in position_symbol_map.items() if symbol == "#"
+    }
+
+    def step(state, symbol):
+        next_state = set()
+        for pos, values in state:
+            label = position_symbol_map[pos]
+            if label == "#" or label == "_":
+                continue
+            if label == symbol or label_contains(label, symbol):
+                follow_configurations(
+                    pos, values, followpos, scopes, bounds, next_state
+                )
+        return frozenset(next_state)
+
+    def is_accepting(state):
+        return any(pos in end_positions for pos, _ in state)
+
+    start = initial_configurations(root, scopes)
+    return LazyAFD(start, step, is_accepting, max_memory)
+
+
+# Función que crea el AFD perezoso a partir de una expresión regular en infix
+def lazy_afd_from_regex(regex, max_memory=DEFAULT_MAX_MEMORY):
+    root, position_symbol_map = build_syntax_tree(augmented_postfix(regex))
+    return lazy_afd_from_tree(root, position_symbol_map, max_memory)
@@ -0,0 +1,79 @@
+# Analizador léxico (tokenizador) de coincidencia más larga sobre el AFD directo
+#
+# Las reglas son una lista ordenada de (nombre del token, expresión regular). Se
+# compilan con compile_regex_set en un solo AFD donde cada estado de aceptación
+# guarda la regla de mayor prioridad (la primera de la lista) que acepta ahí. El
+# tokenizador avanza por el AFD hasta que no puede seguir, recordando la última
+# posición de aceptación, y emite el token más largo; solo retrocede hasta esa
+# posición, nunca más atrás.
+
+from regexpToAFD import transition_rows, wide_transition
+from setAFD import compile_regex_set
+
+
+# Función que compila las reglas del analizador léxico
+def compile_lexer(rules):
+    """
+    `rules` es una lista ordenada de (nombre, expresión regular). Devuelve el AFD
+    compilado de compile_regex_set con dos claves más: "tokens" (nombres de las reglas
+    por índice) y "rows" (por estado, diccionario símbolo -> siguiente estado), que
+    permite avanzar con una sola consulta por carácter.
+    """
+    if not rules:
+        raise ValueError("El analizador léxico necesita al menos una regla")
+
+    compiled_lexer = compile_regex_set([regex for _, regex in rules], priority=True)
+    compiled_lexer["tokens"] = [name for name, _ in rules]
+    compiled_lexer["rows"] = transition_rows(compiled_lexer)
+    return compiled_lexer
+
+
+# Función que genera los tokens de `text` como tuplas (token, inicio, fin)
+def tokenize(compiled_lexer, text, skip=""):
+    """
+    Generador perezoso de (nombre del token, inicio, fin) con la semántica de la
+    coincidencia más larga; si dos reglas aceptan el mismo lexema gana la primera.
+
+    Los caracteres de `skip` (por ejemplo " \\t\\n") se ignoran entre tokens. Si en
+    una posición ninguna regla acepta un lexema no vacío se lanza ValueError.
+    """
+    rows = compiled_lexer["rows"]
+    wide = wide_transition(compiled_lexer)
+    names = compiled_lexer["tokens"]
+    tags = compiled_lexer["tags"]
+    initial = compiled_lexer["initial"]
+
+    # Regla aceptada por estado (-1 si el estado no acepta)
+    accept = [state_tags[0] if state_tags else -1 for state_tags in tags]
+
+    length = len(text)
+    position = 0
+    while position < length:
+        if text[position] in skip:
+            position += 1
+            continue
+
+        state = initial
+        last_rule = -1
+        last_end = position
+        index = position
+        while index < length:
+            next_state = rows[state].get(text[index])
+            if next_state is None:
+                next_state = wide(state, text[index])
+                if next_state is None:
+                    break
+            state = next_state
+            index += 1
+            if accept[state] >= 0:
+                last_rule = accept[state]
+                last_end = index
+
+        if last_rule < 0:
+            raise ValueError(
+                f"Ningún token reconoce el texto en la posición {position}: "
+                f"{text[position : position + 20]!r}"
+            )
+
+        yield names[last_rule], position, last_end
+        position = last_end
@@ -0,0 +1,229 @@
+# Verificador compilado sin efectos secundarios y modo de línea de comandos por lotes
+#
+# Matcher envuelve el AFD compilado y minimizado de una expresión: fullmatch y
+# match_many solo recorren la tabla, sin imprimir ni escribir archivos. El modo de
+# línea de comandos lee una cadena por línea (de un archivo o de la entrada estándar)
+# y escribe los resultados en bloque; los grafos y el JSON de los autómatas solo se
+# generan si se piden con --graphs y --json.
+#
+#   python Primera_parte/matcherAFD.py "(a|b)*abb" cadenas.txt
+#   cat cadenas.txt | python Primera_parte/matcherAFD.py "(a|b)*abb" --matches
+
+import argparse
+import os
+import sys
+
+from cacheAFD import SEGUNDA_PARTE, compile
+from regexpToAFD import transition_rows, wide_transition
+
+# Cantidad de líneas que se verifican y escriben por bloque en el modo por lotes
+LINES_PER_BLOCK = 65536
+
+
+class Matcher:
+    """
+    Verificador inmutable de una expresión regular compilada.
+
+    Se construye con Matcher.from_regex(regex, engine) o a partir de un AFD compilado
+    (compile_afd o cacheAFD.compile). Cada estado guarda un diccionario símbolo ->
+    siguiente estado, así que cada carácter cuesta una sola consulta; solo los
+    caracteres de clases anchas que no están en la fila se buscan por intervalos.
+    """
+
+    __slots__ = (
+        "regex",
+        "engine",
+        "compiled_afd",
+        "_rows",
+        "_wide",
+        "_accepting",
+        "_initial",
+    )
+
+    def __init__(self, compiled_afd, regex=None, engine=None):
+        set_attribute = object.__setattr__
+        set_attribute(self, "regex", regex)
+        set_attribute(self, "engine", engine)
+        set_attribute(self, "compiled_afd", compiled_afd)
+        set_attribute(self, "_rows", tuple(transition_rows(compiled_afd)))
+        set_attribute(self, "_wide", wide_transition(compiled_afd))
+        set_attribute(self, "_accepting", bytes(compiled_afd["accepting"]))
+        set_attribute(self, "_initial", compiled_afd["initial"])
+
+    @classmethod
+    def from_regex(cls, regex, engine="direct"):
+        return cls(compile(regex, engine), regex, engine)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Matcher es inmutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Matcher es inmutable")
+
+    def __repr__(self):
+        return f"Matcher({self.regex!r}, engine={self.engine!r})"
+
+    def fullmatch(self, input_string):
+        rows = self._rows
+        wide = self._wide
+        state = self._initial
+        for symbol in input_string:
+            next_state = rows[state].get(symbol)
+            if next_state is None:
+                next_state = wide(state, symbol)
+                if next_state is None:
+                    return False
+            state = next_state
+        return self._accepting[state] == 1
+
+    def match_many(self, strings):
+        rows = self._rows
+        wide = self._wide
+        accepting = self._accepting
+        initial = self._initial
+        results = []
+        append = results.append
+
+        for input_string in strings:
+            state = initial
+            for symbol in input_string:
+                next_state = rows[state].get(symbol)
+                if next_state is None:
+                    next_state = wide(state, symbol)
+                    if next_state is None:
+                        state = None
+                        break
+                state = next_state
+            append(state is not None and accepting[state] == 1)
+
+        return results
+
+
+# Función que genera los grafos y/o el JSON de los autómatas intermedios
+def export_automata(regex, engine, graphs, json_folder, render=False):
+    """
+    Los grafos van a la misma carpeta que usa simulate.py (o a `json_folder` si se
+    indica). Los avisos se escriben en stderr para no mezclarse con los resultados
+    que el modo por lotes escribe en stdout.
+    """
+    if SEGUNDA_PARTE not in sys.path:
+        sys.path.append(SEGUNDA_PARTE)
+    from simulate import graphs_folder, save_automaton_graph, save_automaton_json
+
+    if engine == "subsets":
+        from AFNToAFD import fromAFNToAFD
+        from minimizeAFD import minimize_afd
+        from regexpToAFN import toAFN
+        from shunYard import toPostFix
+
+        afn = toAFN(toPostFix(regex))
+        afd = fromAFNToAFD(afn)
+        automata = {"AFN": afn, "AFD": afd, "Minimized_AFD": minimize_afd(afd)}
+    else:
+        from regexpToAFD import (
+            augmented_postfix,
+            build_syntax_tree,
+            construct_afd,
+            minimize_afd,
+        )
+
+        states, transitions, accepting_states = construct_afd(
+            *build_syntax_tree(augmented_postfix(regex))
+        )
+        new_states, new_transitions, new_accepting_states, _ = minimize_afd(
+            states, transitions, accepting_states
+        )
+        # Al formato de diccionarios de Segunda_parte (el estado inicial va primero)
+        automata = {}
+        for name, (names, pairs, accepted) in {
+            "AFD": (states, transitions, accepting_states),
+            "Minimized_AFD": (new_states, new_transitions, new_accepting_states),
+        }.items():
+            table = {state: {} for state in names}
+            for (state, symbol), next_state in pairs.items():
+                table[state][symbol] = next_state
+            automata[name] = {"transitions": table, "accepted": sorted(accepted)}
+
+    folder = json_folder or graphs_folder(regex)
+    os.makedirs(folder, exist_ok=True)
+    for name, automaton in automata.items():
+        if json_folder:
+            path = os.path.join(folder, f"{name.lower()}.json")
+            save_automaton_json(automaton, path)
+            print(f"{name}: {path}", file=sys.stderr)
+        if graphs:
+            path, image_path = save_automaton_graph(automaton, name, folder, render)
+            print(f"{name}: {image_path or path}", file=sys.stderr)
+
+
+# Función que verifica las líneas de `lines` por bloques y escribe los resultados
+def run_batch(matcher, lines, output, only_matches=False):
+    block = []
+    for line in lines:
+        block.append(line.rstrip("\r\n"))
+        if len(block) == LINES_PER_BLOCK:
+            write_results(matcher, block, output, only_matches)
+            block.clear()
+    if block:
+        write_results(matcher, block, output, only_matches)
+
+
+def write_results(matcher, block, output, only_matches):
+    results = matcher.match_many(block)
+    if only_matches:
+        accepted = [line for line, result in zip(block, results) if result]
+        if accepted:
+            output.write("\n".join(accepted) + "\n")
+    else:
+        output.write("".join("1\n" if result else "0\n" for result in results))
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description="Verifica una cadena por línea contra una expresión regular."
+    )
+    parser.add_argument("regex", help="expresión regular (infix)")
+    parser.add_argument(
+        "input", nargs="?", help="archivo con una cadena por línea (por defecto stdin)"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("direct", "subsets"),
+        default="direct",
+        help="construcción directa o Thompson y subconjuntos",
+    )
+    parser.add_argument(
+        "--matches",
+        action="store_true",
+        help="escribir solo las cadenas aceptadas en lugar de 1/0 por línea",
+    )
+    parser.add_argument(
+        "--graphs",
+        action="store_true",
+        help="generar los grafos (DOT) de los autómatas",
+    )
+    parser.add_argument(
+        "--render",
+        action="store_true",
+        help="con --graphs, dibujar también los PNG en segundo plano",
+    )
+    parser.add_argument(
+        "--json", metavar="CARPETA", help="escribir los autómatas en JSON en CARPETA"
+    )
+    options = parser.parse_args(arguments)
+
+    matcher = Matcher.from_regex(options.regex, options.engine)
+    if options.graphs or options.json:
+        export_automata(
+            options.regex, options.engine, options.graphs, options.json, options.render
+        )
+
+    if options.input:
+        with open(options.input, encoding="utf-8") as file:
+            run_batch(matcher, file, sys.stdout, options.matches)
+    else:
+        run_batch(matcher, sys.stdin, sys.stdout, options.matches)
+
+
+if __name__ == "__main__":
+    main()
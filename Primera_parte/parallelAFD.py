@@ -0,0 +1,166 @@
+# Verificación en paralelo de una sola entrada muy grande
+#
+# Recorrer un AFD es secuencial, pero cada bloque de la entrada se puede resumir como
+# una función estado inicial -> estado final (un vector con una entrada por estado).
+# Los procesos del pool calculan esos vectores para bloques distintos y el proceso
+# principal los compone en orden para obtener el estado final de toda la entrada.
+#
+# Calcular el vector de un bloque no cuesta |estados| recorridos: se avanzan todos los
+# estados a la vez por "carriles" y los carriles que llegan al mismo estado se fusionan
+# (o se descartan si mueren). En un AFD minimizado casi siempre queda un solo carril
+# después de unos pocos caracteres, así que el costo es cercano a un solo recorrido.
+
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from regexpToAFD import (
+    deserialize_compiled_afd,
+    serialize_compiled_afd,
+    transition_rows,
+    wide_transition,
+)
+
+# Tamaño por defecto de cada bloque (en bytes para archivos, en caracteres para texto)
+DEFAULT_CHUNK_SIZE = 32 * 1024 * 1024
+
+# Cada cuántos caracteres se fusionan los carriles que llegaron al mismo estado
+MERGE_INTERVAL = 64
+
+# Filas de transición y paso de respaldo de las clases anchas del AFD en cada proceso
+# del pool (se cargan una sola vez)
+worker_rows = None
+worker_wide = None
+
+
+def init_worker(data):
+    global worker_rows, worker_wide
+    compiled_afd = deserialize_compiled_afd(data)
+    worker_rows = transition_rows(compiled_afd)
+    worker_wide = wide_transition(compiled_afd)
+
+
+# Función que calcula el vector estado inicial -> estado final (-1 = rechazo) de un bloque
+def chunk_mapping(rows, text, wide=None):
+    state_count = len(rows)
+    lanes = list(range(state_count))  # Estado actual de cada carril
+    members = [[state] for state in range(state_count)]  # Estados iniciales por carril
+    position = 0
+    length = len(text)
+
+    # Avanzar todos los carriles por tramos y fusionar los que coinciden
+    while position < length and len(lanes) > 1:
+        segment = text[position : position + MERGE_INTERVAL]
+        position += len(segment)
+
+        merged = {}
+        for lane, state in enumerate(lanes):
+            for symbol in segment:
+                next_state = rows[state].get(symbol)
+                if next_state is None and wide is not None:
+                    next_state = wide(state, symbol)
+                state = next_state
+                if state is None:
+                    break
+            if state is None:
+                continue
+            if state in merged:
+                merged[state].extend(members[lane])
+            else:
+                merged[state] = members[lane]
+
+        lanes = list(merged)
+        members = list(merged.values())
+
+    # Un solo carril: el resto del bloque es un recorrido normal
+    if lanes and position < length:
+        state = lanes[0]
+        for symbol in text[position:] if position else text:
+            next_state = rows[state].get(symbol)
+            if next_state is None and wide is not None:
+                next_state = wide(state, symbol)
+            state = next_state
+            if state is None:
+                lanes, members = [], []
+                break
+        else:
+            lanes[0] = state
+
+    mapping = [-1] * state_count
+    for state, starts in zip(lanes, members):
+        for start in starts:
+            mapping[start] = state
+    return mapping
+
+
+# Función que calcula el vector de un bloque dentro de un proceso del pool
+def map_chunk(task):
+    if task[0] == "file":
+        _, path, start, end = task
+        with open(path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text = mapped[start:end].decode("utf-8")
+    else:
+        text = task[1]
+    return chunk_mapping(worker_rows, text, worker_wide)
+
+
+# Función que divide un archivo en rangos de bytes que no parten un carácter UTF-8
+def file_tasks(path, chunk_size):
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            offsets = [0]
+            for offset in range(chunk_size, size, chunk_size):
+                # Retroceder a un byte que no sea de continuación (10xxxxxx)
+                while offset > offsets[-1] and mapped[offset] & 0xC0 == 0x80:
+                    offset -= 1
+                if offset > offsets[-1]:
+                    offsets.append(offset)
+            offsets.append(size)
+
+    return [("file", path, start, end) for start, end in zip(offsets, offsets[1:])]
+
+
+# Función que compone en orden los vectores de los bloques calculados en el pool
+def run_tasks(compiled_afd, tasks, workers):
+    state = compiled_afd["initial"]
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(serialize_compiled_afd(compiled_afd),),
+    )
+    try:
+        for mapping in executor.map(map_chunk, tasks):
+            state = mapping[state]
+            if state < 0:
+                # Estado muerto: los bloques restantes ya no importan
+                break
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    return state >= 0 and compiled_afd["accepting"][state] == 1
+
+
+# Función que verifica en paralelo si todo el archivo es aceptado por el AFD
+def parallel_fullmatch(compiled_afd, path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Cada proceso lee su rango de bytes del archivo con mmap y lo decodifica como
+    UTF-8; los rangos nunca parten un carácter. El resultado es el mismo que el de
+    streamAFD.fullmatch_stream sobre el mismo archivo.
+    """
+    return run_tasks(compiled_afd, file_tasks(path, chunk_size), workers)
+
+
+# Función que verifica en paralelo un texto que ya está en memoria
+def parallel_fullmatch_text(
+    compiled_afd, text, workers=None, chunk_size=DEFAULT_CHUNK_SIZE
+):
+    tasks = [
+        ("text", text[start : start + chunk_size])
+        for start in range(0, len(text), chunk_size)
+    ]
+    return run_tasks(compiled_afd, tasks, workers)
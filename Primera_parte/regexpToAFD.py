@@ -11,31 +11,228 @@ https://programminghistorian.org/es/lecciones/manipular-cadenas-de-caracteres-en
 """
 
 # Importamos las librerías necesarias
+import functools
+import gc
 import itertools
+import json
+import struct
+import sys
+from array import array
+from collections import deque
+from types import MappingProxyType
 from colorama import Fore, Style
 import graphviz
 import os
 import string
 
+from instrumentAFD import count, enabled, stage
+from renderAFD import save_graph
+from symbolsAFD import (
+    alphabet_classes,
+    class_ranges,
+    class_symbols,
+    infix_tokens,
+    is_class,
+    is_repetition,
+    iter_tokens,
+    range_lookup,
+    repetition_bounds,
+)
+
+# Códigos de operación de los nodos del árbol sintáctico
+LEAF, CONCAT, UNION, STAR, PLUS, OPTIONAL, REPETITION = range(7)
+OPERATOR_CODES = {".": CONCAT, "|": UNION, "*": STAR, "+": PLUS, "?": OPTIONAL}
+OPERATOR_VALUES = {code: operator for operator, code in OPERATOR_CODES.items()}
+
+# Identificador del conjunto de posiciones vacío
+EMPTY_SET = 0
+
+
+# Clase que guarda el árbol de sintaxis en arreglos paralelos, uno por atributo
+class SyntaxTree:
+    """
+    Los nodos se numeran en el orden en que build_syntax_tree los crea (el postorden
+    del postfix): los hijos siempre tienen un número menor que su padre y los nodos
+    de un subárbol forman un tramo contiguo que termina en su raíz. Cada atributo es
+    un arreglo tipado (código de operación, hijos, anulable, firstpos y lastpos), así
+    que un nodo ocupa unos pocos bytes en lugar de un objeto con dos conjuntos.
+
+    firstpos y lastpos son identificadores de conjunto en un almacén compartido: 0
+    es el vacío, p > 0 es {p} y un negativo -k - 1 es la unión de los conjuntos
+    set_left[k] y set_right[k]. Las dos partes de una unión vienen de subárboles
+    distintos, así que son disjuntas: unir cuesta un registro, recorrer un conjunto
+    cuesta su tamaño y un nodo que repite el conjunto de un hijo (*, +, ?, o "." con
+    el izquierdo no anulable) guarda el mismo identificador.
+    """
+
+    __slots__ = (
+        "ops",
+        "left",
+        "right",
+        "nullable",
+        "first",
+        "last",
+        "set_left",
+        "set_right",
+        "set_size",
+        "symbols",
+        "repetitions",
+    )
+
+    def __init__(self, symbols):
+        self.ops = bytearray()  # Código de operación de cada nodo
+        self.left = array("i")  # Hijo izquierdo (-1 = sin hijo)
+        self.right = array("i")  # Hijo derecho (-1 = sin hijo)
+        self.nullable = bytearray()  # 1 si el nodo es anulable
+        self.first = array("i")  # Identificador del conjunto firstpos
+        self.last = array("i")  # Identificador del conjunto lastpos
+        self.set_left = array("i")  # Partes y tamaño de cada unión de conjuntos
+        self.set_right = array("i")
+        self.set_size = array("i")
+        self.symbols = symbols  # Posición -> símbolo
+        self.repetitions = {}  # Nodo -> texto canónico de su repetición {m,n}
+
+    def add_node(self, op, left, right, nullable, first, last):
+        self.ops.append(op)
+        self.left.append(left)
+        self.right.append(right)
+        self.nullable.append(nullable)
+        self.first.append(first)
+        self.last.append(last)
+        return len(self.ops) - 1
+
+    # Función que une dos conjuntos disjuntos y devuelve el identificador de la unión
+    def union(self, first_set, second_set):
+        if first_set == EMPTY_SET:
+            return second_set
+        if second_set == EMPTY_SET:
+            return first_set
+        self.set_left.append(first_set)
+        self.set_right.append(second_set)
+        self.set_size.append(self.size(first_set) + self.size(second_set))
+        return -len(self.set_left)
+
+    def size(self, set_id):
+        if set_id >= 0:
+            return 1 if set_id else 0
+        return self.set_size[-set_id - 1]
+
+    # Función que devuelve la lista de posiciones de un conjunto
+    def positions(self, set_id):
+        if set_id >= 0:
+            return [set_id] if set_id else []
+        set_left = self.set_left
+        set_right = self.set_right
+        result = []
+        pending = [set_id]
+        while pending:
+            set_id = pending.pop()
+            if set_id > 0:
+                result.append(set_id)
+            else:
+                pending.append(set_right[-set_id - 1])
+                pending.append(set_left[-set_id - 1])
+        return result
+
+    # Función que devuelve el tramo de nodos del subárbol con raíz `node`
+    def subtree(self, node):
+        # El primer nodo creado del subárbol se alcanza bajando siempre por la izquierda
+        low = node
+        while self.left[low] >= 0:
+            low = self.left[low]
+        return range(low, node + 1)
+
 
 # Clase Nodo encargada de inicializar los valores de los nodos en el árbol de sintaxis
 class Node:
     """
-    Esta parte se hizo con ayuda de LLMs para poder entender mejor el funcionamiento de los nodos
+    Esta parte se hizo con ayuda de LLMs para poder entender mejor el funcionamiento de los nodos
 
     Promt utilizado:
 
     Could you give me a structure or class of node type in python where I can represent the important parts of an AFD with direct construction, I want it to have, the value of the node, if it has children (both left and right), if it is voidable, a set of sets for first pos, another for last pos and another for the identification of the position.
+
+    Ahora el nodo es una vista de solo lectura sobre una fila de SyntaxTree: los
+    atributos se leen de los arreglos cuando se piden (firstpos y lastpos devuelven
+    un conjunto nuevo) y la vista no guarda nada más que el árbol y el índice.
     """
 
-    def __init__(self, value, left=None, right=None):
-        self.value = value  # Valor del nodo
-        self.left = left  # Nodo izquierdo
-        self.right = right  # Nodo derecho
-        self.nullable = False  # Esto funciona para representar si es anulable o no
-        self.firstpos = set()  # Contiene el conjunto de posiciones de primera-pos
-        self.lastpos = set()  # # Contiene el conjunto de posiciones de última-pos
-        self.position = None  # Sirve para identificar la posición del nodo
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree, index):
+        self.tree = tree  # Árbol al que pertenece el nodo
+        self.index = index  # Fila del nodo en los arreglos del árbol
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Node)
+            and self.tree is other.tree
+            and self.index == other.index
+        )
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    def __repr__(self):
+        return f"Node({self.value!r}, index={self.index})"
+
+    @property
+    def value(self):  # Valor del nodo: símbolo, operador o repetición {m,n}
+        op = self.tree.ops[self.index]
+        if op == LEAF:
+            return self.tree.symbols[self.tree.first[self.index]]
+        if op == REPETITION:
+            return self.tree.repetitions[self.index]
+        return OPERATOR_VALUES[op]
+
+    @property
+    def left(self):  # Nodo izquierdo
+        child = self.tree.left[self.index]
+        return Node(self.tree, child) if child >= 0 else None
+
+    @property
+    def right(self):  # Nodo derecho
+        child = self.tree.right[self.index]
+        return Node(self.tree, child) if child >= 0 else None
+
+    @property
+    def nullable(self):  # Si es anulable o no
+        return self.tree.nullable[self.index] == 1
+
+    @property
+    def firstpos(self):  # Conjunto de posiciones de primera-pos
+        return set(self.tree.positions(self.tree.first[self.index]))
+
+    @property
+    def lastpos(self):  # Conjunto de posiciones de última-pos
+        return set(self.tree.positions(self.tree.last[self.index]))
+
+    @property
+    def position(self):  # Posición de una hoja (None en los operadores)
+        if self.tree.ops[self.index] != LEAF:
+            return None
+        return self.tree.first[self.index]
+
+
+# Decorador que pausa el recolector de basura mientras se ejecuta una etapa
+def pause_gc(function):
+    """
+    Las etapas de compilación crean cientos de miles de nodos y conjuntos que no
+    forman ciclos; con el recolector activo cada pasada recorre todo el montículo y
+    el tiempo total deja de ser lineal. Se pausa durante la etapa y se restaura al final.
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if was_enabled:
+                gc.enable()
+
+    return wrapper
 
 
 # Función para sanitizar el nombre de la carpeta
@@ -44,7 +241,10 @@ def sanitize_filename(name):
 
 
 # Definimos las precedencias de los operadores
-precedence = {"|": 1, ".": 2, "*": 3}
+precedence = {"|": 1, ".": 2, "*": 3, "+": 3, "?": 3}
+
+# Límites (mínimo, máximo) de los operadores de repetición con símbolo propio
+OPERATOR_BOUNDS = {"*": (0, None), "+": (1, None), "?": (0, 1)}
 
 
 # Función que verifica si es un operador
@@ -57,8 +257,20 @@ def is_operand(c: str) -> bool:
     return c.isalnum() or c == "_" or c == "#"
 
 
+# Función que verifica si un símbolo (carácter o clase canónica) es un operando
+def is_symbol_operand(token: str) -> bool:
+    return is_operand(token) or is_class(token)
+
+
+# Función que verifica si es un operador unario (*, +, ? o una repetición {m,n})
+def is_unary_operator(token: str) -> bool:
+    return token in OPERATOR_BOUNDS or is_repetition(token)
+
+
 # Función que inserta operadores de concatenación (Se utilizó el mismo algoritmo que se implementó el semestre pasado)
 def insert_concatenation_operators(infix: str) -> str:
+    # Las clases, escapes y "." se convierten antes en un solo símbolo canónico
+    infix = infix_tokens(infix, is_operand)
     result = []
     length = len(infix)
 
@@ -68,16 +280,16 @@ def insert_concatenation_operators(infix: str) -> str:
         if i < length - 1:
             if (
                 (
-                    is_operand(infix[i])
-                    and (is_operand(infix[i + 1]) or infix[i + 1] == "(")
+                    is_symbol_operand(infix[i])
+                    and (is_symbol_operand(infix[i + 1]) or infix[i + 1] == "(")
                 )
                 or (
                     infix[i] == ")"
-                    and (is_operand(infix[i + 1]) or infix[i + 1] == "(")
+                    and (is_symbol_operand(infix[i + 1]) or infix[i + 1] == "(")
                 )
                 or (
-                    infix[i] == "*"
-                    and (is_operand(infix[i + 1]) or infix[i + 1] == "(")
+                    is_unary_operator(infix[i])
+                    and (is_symbol_operand(infix[i + 1]) or infix[i + 1] == "(")
                 )
             ):
                 result.append(".")
@@ -86,15 +298,18 @@ def insert_concatenation_operators(infix: str) -> str:
 
 
 # Función que convierte la expresión regular a postfix (Se utilizó el mismo algoritmo que se implementó el semestre pasado)
+@stage("direct.toPostFix")
 def toPostFix(infixExpression: str) -> str:
     infixExpression = insert_concatenation_operators(infixExpression)
     output = []
     operators = []
 
-    i = 0
-    while i < len(infixExpression):
-        c = infixExpression[i]
-        if is_operand(c):
+    for c in iter_tokens(infixExpression):
+        if is_symbol_operand(c):
+            output.append(c)
+        elif is_unary_operator(c):
+            # Los operadores unarios tienen la mayor precedencia y se aplican al
+            # operando anterior, así que van directo a la salida
             output.append(c)
         elif c == "(":
             operators.append(c)
@@ -110,7 +325,6 @@ def toPostFix(infixExpression: str) -> str:
             ):
                 output.append(operators.pop())
             operators.append(c)
-        i += 1
 
     while operators:
         output.append(operators.pop())
@@ -118,112 +332,454 @@ def toPostFix(infixExpression: str) -> str:
     return "".join(output)
 
 
+# Función que convierte a postfix la expresión aumentada con el marcador de fin "#"
+def augmented_postfix(regex):
+    # Los paréntesis hacen que "#" se concatene a toda la expresión: en a|b# solo la
+    # última alternativa tendría el marcador
+    return toPostFix(f"({regex})#" if regex else "#")
+
+
+# Función que agrega el nodo de un operador de repetición (+, ?, *, {m,n})
+def repetition_node(tree, child, token):
+    """
+    Una repetición {m,n} es un solo nodo sobre el subárbol, sin copiarlo: sus
+    posiciones se recorren con contadores (compute_counted_followpos). Las que
+    equivalen a un operador simple se reemplazan por él ({0,} es *, {1,} es +, {0,1}
+    es ?) y {1} es el mismo subárbol. Devuelve el índice del nodo.
+    """
+    bounds = OPERATOR_BOUNDS.get(token) or repetition_bounds(token)
+    if bounds == (1, 1):
+        return child
+
+    op = next(
+        (
+            OPERATOR_CODES[operator]
+            for operator, limits in OPERATOR_BOUNDS.items()
+            if limits == bounds
+        ),
+        REPETITION,
+    )
+    minimum, maximum = bounds
+    nullable = tree.nullable[child] or minimum == 0
+    if maximum == 0:
+        # {0} solo acepta la cadena vacía: ninguna posición del hijo es alcanzable
+        node = tree.add_node(op, child, -1, nullable, EMPTY_SET, EMPTY_SET)
+    else:
+        # Se comparten los conjuntos del hijo
+        node = tree.add_node(
+            op, child, -1, nullable, tree.first[child], tree.last[child]
+        )
+    if op == REPETITION:
+        tree.repetitions[node] = token
+    return node
+
+
 # Función que construye el árbol de sintaxis
+@stage("direct.build_syntax_tree")
+@pause_gc
 def build_syntax_tree(postfix):
-    stack = []  # Pila para almacenar los nodos
+    """
+    Construye el SyntaxTree en una sola pasada por el postfix (que ya está en
+    postorden) y devuelve la vista Node de la raíz y el mapa posición -> símbolo.
+    """
+    stack = []  # Pila con los índices de los nodos
     pos_counter = itertools.count(1)  # Contador para las posiciones
     position_symbol_map = {}  # Diccionario para mapear las posiciones a los símbolos
-
-    # Recorremos la expresión postfix
-    for char in postfix:
-        # Si es un operando, creamos un nodo y lo agregamos a la pila
-        if is_operand(char):
-            node = Node(char)
-            node.position = next(pos_counter)  # Asignamos la siguiente posición al nodo
-            node.firstpos.add(node.position)  # Añadimos la posición a firstpos
-            node.lastpos.add(node.position)  # Añadimos la posición a lastpos
-            position_symbol_map[node.position] = char  # Mapeamos la posición al símbolo
-            stack.append(node)  # Agregamos el nodo a la pila
+    tree = SyntaxTree(position_symbol_map)
+    first = tree.first
+    last = tree.last
+    nullable = tree.nullable
+
+    # Recorremos la expresión postfix (una clase como [a-z] es un solo símbolo)
+    for char in iter_tokens(postfix):
+        # Si es un operando, creamos una hoja: firstpos y lastpos son {posición}
+        if is_symbol_operand(char):
+            position = next(pos_counter)  # Asignamos la siguiente posición al nodo
+            position_symbol_map[position] = char  # Mapeamos la posición al símbolo
+            stack.append(tree.add_node(LEAF, -1, -1, False, position, position))
 
         # Si el caracter es una cerradura de Kleene
         elif char == "*":
             child = stack.pop()  # Sacamos el nodo de la pila
-            node = Node("*", left=child)  # Creamos un nodo con el operador *
-            node.nullable = True  # El nodo es anulable ya que la cerradura de Kleene produce un vacío
-            node.firstpos = child.firstpos  # firstpos es igual al firstpos del hijo
-            node.lastpos = child.lastpos  # lastpos es igual al lastpos del hijo
-            stack.append(node)  # Agregamos el nodo a la pila
+            # El nodo es anulable y firstpos y lastpos son los del hijo
+            stack.append(
+                tree.add_node(STAR, child, -1, True, first[child], last[child])
+            )
+
+        # Si el caracter es "+" (una o más), "?" (cero o una) o una repetición {m,n}
+        elif char == "+" or char == "?" or is_repetition(char):
+            stack.append(repetition_node(tree, stack.pop(), char))
 
         # Si el caracter es una concatenación
         elif char == ".":
             right = stack.pop()  # Sacamos el nodo derecho de la pila
             left = stack.pop()  # Sacamos el nodo izquierdo de la pila
-            node = Node(
-                ".", left, right
-            )  # Creamos un nodo con el operador "." (concatenación)
-            node.nullable = (
-                left.nullable and right.nullable
-            )  # El nodo es anulable si ambos hijos lo son
-            node.firstpos = left.firstpos | (
-                right.firstpos if left.nullable else set()
-            )  # firstpos es la unión de los firstpos de los hijos si c1 o el hijo izquierdo es anulable de caso contrario se toma el firstpos del hijo izquierdo (c1)
-            node.lastpos = right.lastpos | (
-                left.lastpos if right.nullable else set()
-            )  # lastpos es la unión de los lastpos de los hijos si c2 o el hijo derecho es anulable de caso contrario se toma el lastpos del hijo derecho (c2)
-            stack.append(node)
+            # firstpos es la unión de los firstpos de los hijos si el hijo izquierdo es anulable; si no, es el firstpos del hijo izquierdo
+            node_first = (
+                tree.union(first[left], first[right]) if nullable[left] else first[left]
+            )
+            # lastpos es la unión de los lastpos de los hijos si el hijo derecho es anulable; si no, es el lastpos del hijo derecho
+            node_last = (
+                tree.union(last[left], last[right]) if nullable[right] else last[right]
+            )
+            stack.append(
+                tree.add_node(
+                    CONCAT,
+                    left,
+                    right,
+                    nullable[left] and nullable[right],  # Anulable si ambos lo son
+                    node_first,
+                    node_last,
+                )
+            )
 
         # Si el caracter es una unión
         elif char == "|":
             right = stack.pop()
             left = stack.pop()
-            node = Node("|", left, right)  # Creamos un nodo con el operador |
-            node.nullable = (
-                left.nullable or right.nullable
-            )  # El nodo es anulable si alguno de los hijos lo es
-            node.firstpos = (
-                left.firstpos | right.firstpos
-            )  # firstpos es la unión de los firstpos de los hijos
-            node.lastpos = (
-                left.lastpos | right.lastpos
-            )  # lastpos es la unión de los lastpos de los hijos
-            stack.append(node)
+            # Anulable si alguno de los hijos lo es; firstpos y lastpos son las uniones
+            stack.append(
+                tree.add_node(
+                    UNION,
+                    left,
+                    right,
+                    nullable[left] or nullable[right],
+                    tree.union(first[left], first[right]),
+                    tree.union(last[left], last[right]),
+                )
+            )
 
-    return stack.pop(), position_symbol_map
+    count("positions", len(position_symbol_map))
+    return Node(tree, stack.pop()), position_symbol_map
 
 
 # Función que calcula el siguientepos
+@stage("direct.compute_followpos")
 def compute_followpos(node, followpos):
-    # Si el nodo es nulo, retornamos None porque lo único que nos sirve para el siguiente pos es la cerradura de Kleene y la concatenación
-    if node is None:
-        return
+    tree = node.tree
+    ops, left, right = tree.ops, tree.left, tree.right
+    first, last = tree.first, tree.last
+
+    # Los nodos del subárbol son un tramo contiguo: se recorren en orden, sin pila ni
+    # recursión. Solo la concatenación y las cerraduras aportan al siguientepos
+    for index in tree.subtree(node.index):
+        op = ops[index]
+
+        # Si el nodo es una concatenación, cada posición en lastpos del hijo izquierdo
+        # es seguida por las posiciones de firstpos del hijo derecho
+        if op == CONCAT:
+            targets = set(tree.positions(first[right[index]]))
+            for pos in tree.positions(last[left[index]]):
+                followpos[pos] |= targets
+
+        # Si el nodo es una cerradura de Kleene (o positiva), cada posición en
+        # lastpos del hijo es seguida por las posiciones de firstpos del hijo
+        elif op == STAR or op == PLUS:
+            targets = set(tree.positions(first[index]))
+            for pos in tree.positions(last[index]):
+                followpos[pos] |= targets
+
+    if enabled():
+        count("followpos_size", sum(map(len, followpos.values())))
+
+
+# Función que convierte un conjunto de posiciones a una máscara de bits (bit i = posición i)
+def positions_to_mask(positions):
+    if not positions:
+        return 0
+
+    bits = bytearray((max(positions) >> 3) + 1)
+    for pos in positions:
+        bits[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bits, "little")
+
+
+# Función que devuelve las posiciones encendidas en una máscara de bits, en orden
+def mask_to_positions(mask):
+    bits = bin(mask)[:1:-1]  # Dígitos binarios del menos al más significativo
+    positions = []
+    pos = bits.find("1")
+    while pos >= 0:
+        positions.append(pos)
+        pos = bits.find("1", pos + 1)
+    return positions
+
+
+# Función que calcula el siguientepos como un arreglo de máscaras de bits
+@stage("direct.compute_followpos_masks")
+def compute_followpos_masks(root, position_count):
+    tree = root.tree
+    ops, left, right = tree.ops, tree.left, tree.right
+    first, last = tree.first, tree.last
+    followpos = [0] * (position_count + 1)
+    # Los nodos comparten conjuntos, así que cada uno se convierte una sola vez
+    masks = {}
+
+    def mask_of(set_id):
+        if set_id not in masks:
+            masks[set_id] = positions_to_mask(tree.positions(set_id))
+        return masks[set_id]
+
+    for index in tree.subtree(root.index):
+        op = ops[index]
+
+        # Concatenación: lastpos del hijo izquierdo -> firstpos del hijo derecho
+        if op == CONCAT:
+            right_firstpos = mask_of(first[right[index]])
+            for pos in tree.positions(last[left[index]]):
+                followpos[pos] |= right_firstpos
+
+        # Cerradura de Kleene o positiva: lastpos del nodo -> firstpos del nodo
+        elif op == STAR or op == PLUS:
+            firstpos = mask_of(first[index])
+            for pos in tree.positions(last[index]):
+                followpos[pos] |= firstpos
+
+    if enabled():
+        count("followpos_size", sum(mask.bit_count() for mask in followpos))
+    return followpos
+
+
+# Función que estima (por arriba) el total de pares de siguientepos sin calcularlos
+def estimate_followpos_size(root):
+    tree = root.tree
+    ops, left, right = tree.ops, tree.left, tree.right
+    first, last = tree.first, tree.last
+    size = tree.size
+
+    total = 0
+    for index in tree.subtree(root.index):
+        op = ops[index]
+        if op == CONCAT:
+            total += size(last[left[index]]) * size(first[right[index]])
+        elif op == STAR or op == PLUS:
+            total += size(last[index]) * size(first[index])
+    return total
+
+
+# Función que indica si el árbol tiene alguna repetición {m,n} (con contador)
+def has_repetition(root):
+    nodes = root.tree.subtree(root.index)
+    return REPETITION in root.tree.ops[nodes.start : nodes.stop]
+
+
+# Función que calcula el siguientepos de un árbol con repeticiones {m,n}
+@stage("direct.compute_counted_followpos")
+def compute_counted_followpos(root):
+    """
+    Cada repetición {m,n} tiene un contador en lugar de m o n copias de su subárbol.
+    Una posición guarda en `scopes` los contadores de las repeticiones que la
+    contienen (de afuera hacia adentro) y cada arista de siguientepos lleva una
+    acción (keep, increment): se conservan los primeros `keep` contadores (el último
+    se incrementa si `increment`, al empezar otra vuelta de la repetición), los demás
+    contadores del origen deben haber llegado a su mínimo (se sale de esas
+    repeticiones) y los del destino empiezan en 1.
+
+    Devuelve followpos (posición -> {(keep, increment): posiciones destino}), scopes
+    (posición -> tupla de contadores) y bounds (contador -> (mínimo, máximo)).
+    """
+    tree = root.tree
+    ops, left, right = tree.ops, tree.left, tree.right
+    first, last = tree.first, tree.last
+    followpos = {}
+    scopes = {}
+    bounds = []
+
+    def add(sources, targets, keep, increment):
+        targets = set(tree.positions(targets))
+        for pos in tree.positions(sources):
+            actions = followpos.setdefault(pos, {})
+            if (keep, increment) in actions:
+                actions[(keep, increment)] |= targets
+            else:
+                actions[(keep, increment)] = set(targets)
+
+    # Los padres tienen un índice mayor que sus hijos: recorriendo el tramo al revés
+    # cada nodo recibe antes los contadores de las repeticiones que lo contienen
+    nodes = tree.subtree(root.index)
+    node_counters = [()] * len(nodes)
+    for index in reversed(nodes):
+        counters = node_counters[index - nodes.start]
+        op = ops[index]
+
+        if op == CONCAT:
+            add(last[left[index]], first[right[index]], len(counters), False)
+        elif op == STAR or op == PLUS:
+            add(last[index], first[index], len(counters), False)
+        elif op == REPETITION:
+            child = left[index]
+            minimum, maximum = repetition_bounds(tree.repetitions[index])
+            if tree.nullable[child]:
+                # Las vueltas vacías completan cualquier mínimo
+                minimum = 0
+            counters += (len(bounds),)
+            bounds.append((minimum, maximum))
+            add(last[child], first[child], len(counters), True)
+        elif op == LEAF:
+            scopes[first[index]] = counters
+
+        for child in (left[index], right[index]):
+            if child >= 0:
+                node_counters[child - nodes.start] = counters
+
+    if enabled():
+        count(
+            "followpos_size",
+            sum(
+                len(targets)
+                for actions in followpos.values()
+                for targets in actions.values()
+            ),
+        )
+    return followpos, scopes, bounds
 
-    # Si el nodo es una concatenación
-    if node.value == ".":
-        # Entonces para cada posición en lastpos del hijo izquierdo se encuentran en las posiciones de firstpos del hijo derecho
-        for pos in node.left.lastpos:
-            followpos[pos] |= node.right.firstpos
 
-    # Si el nodo es una cerradura de Kleene
-    if node.value == "*":
-        # Entonces para cada posición en lastpos del hijo se encuentran en las posiciones de firstpos del hijo
-        for pos in node.lastpos:
-            followpos[pos] |= node.firstpos
+# Función que agrega a `result` las configuraciones que siguen a (pos, values)
+def follow_configurations(pos, values, followpos, scopes, bounds, result):
+    """
+    Una configuración es una posición con el valor de cada contador de `scopes[pos]`.
+    Sin máximo ({m,}) los valores mayores que el mínimo son equivalentes, así que el
+    contador se queda en el mínimo y el AFD sigue siendo finito.
+    """
+    source_scopes = scopes[pos]
+    for (keep, increment), targets in followpos.get(pos, {}).items():
+        # Salir de las repeticiones internas exige haber llegado a su mínimo
+        if any(
+            values[i] < bounds[source_scopes[i]][0] for i in range(keep, len(values))
+        ):
+            continue
+
+        kept = values[:keep]
+        if increment:
+            minimum, maximum = bounds[source_scopes[keep - 1]]
+            value = values[keep - 1] + 1
+            if maximum is None:
+                value = min(value, max(minimum, 1))
+            elif value > maximum:
+                continue
+            kept = values[: keep - 1] + (value,)
 
-    # Llamamos recursivamente a la función para el hijo izquierdo y el hijo derecho
-    compute_followpos(node.left, followpos)
-    compute_followpos(node.right, followpos)
+        for target in targets:
+            result.add((target, kept + (1,) * (len(scopes[target]) - keep)))
+
+
+# Función que devuelve las configuraciones iniciales (todos los contadores en 1)
+def initial_configurations(root, scopes):
+    return frozenset((pos, (1,) * len(scopes[pos])) for pos in root.firstpos)
+
+
+# Número máximo de posiciones para construir el AFD con máscaras de bits. Las máscaras
+# ocupan tantos bits como la posición más alta, así que para expresiones más grandes
+# (uniones de miles de palabras) se usan conjuntos, cuyo tamaño solo depende de cuántas
+# posiciones contienen.
+BITSET_MAX_POSITIONS = 1 << 14
 
 
 # Función que construye el AFD
+@stage("direct.construct_afd")
 def construct_afd(root, position_symbol_map):
+    if has_repetition(root):
+        # Las repeticiones {m,n} se recorren con contadores en lugar de copias
+        return construct_afd_from_counters(root, position_symbol_map)
+
+    position_count = len(position_symbol_map)
+    if position_count <= BITSET_MAX_POSITIONS:
+        # Cada operación sobre una máscara procesa ~64 posiciones a la vez, así que solo
+        # conviene cuando los siguientepos son densos; si son dispersos (uniones de
+        # palabras sin cerradura) los conjuntos hacen menos trabajo por estado.
+        if estimate_followpos_size(root) * 64 >= position_count * position_count:
+            return construct_afd_from_masks(root, position_symbol_map)
+
+    return construct_afd_from_sets(root, position_symbol_map)
+
+
+# Función que construye el AFD representando las posiciones con máscaras de bits
+@pause_gc
+def construct_afd_from_masks(root, position_symbol_map):
+    followpos = compute_followpos_masks(root, max(position_symbol_map, default=0))
+
+    # Máscara de posiciones por etiqueta y máscara de las posiciones de "#"
+    symbol_positions = {}
+    for pos, symbol in position_symbol_map.items():
+        symbol_positions.setdefault(symbol, []).append(pos)
+    end_mask = positions_to_mask(symbol_positions.pop("#", ()))
+    symbol_positions.pop("_", None)
+
+    # Máscara por clase del alfabeto: unión de las etiquetas que la cubren
+    classes = alphabet_classes(symbol_positions)
+    symbol_masks = {}
+    for label, positions in symbol_positions.items():
+        mask = positions_to_mask(positions)
+        for symbol in classes[label]:
+            symbol_masks[symbol] = symbol_masks.get(symbol, 0) | mask
+
+    # Los estados del AFD se identifican por su máscara de posiciones
+    start = positions_to_mask(root.firstpos)
+    state_names = {start: 0}
+    state_queue = deque([start])
+    transitions = {}
+
+    while state_queue:
+        state = state_queue.popleft()
+
+        for symbol, symbol_mask in symbol_masks.items():
+            hit = state & symbol_mask
+            if not hit:
+                continue
+
+            # Unión de siguientepos de las posiciones del símbolo dentro del estado
+            if hit & (hit - 1) == 0:
+                next_state = followpos[hit.bit_length() - 1]
+            else:
+                next_state = 0
+                for pos in mask_to_positions(hit):
+                    next_state |= followpos[pos]
+            if not next_state:
+                continue
+
+            if next_state not in state_names:
+                state_names[next_state] = len(state_names)
+                state_queue.append(next_state)
+
+            transitions[(state_names[state], symbol)] = state_names[next_state]
+
+    states = {
+        name: frozenset(mask_to_positions(mask)) for mask, name in state_names.items()
+    }
+    accepting_states = {name for mask, name in state_names.items() if mask & end_mask}
+
+    count("afd_states", len(states))
+    count("afd_transitions", len(transitions))
+    return states, transitions, accepting_states
+
+
+# Función que construye el AFD representando las posiciones con conjuntos
+@pause_gc
+def construct_afd_from_sets(root, position_symbol_map):
     followpos = {pos: set() for pos in position_symbol_map}
     compute_followpos(root, followpos)
+    classes = alphabet_classes(
+        symbol
+        for symbol in position_symbol_map.values()
+        if symbol != "#" and symbol != "_"
+    )
 
     states = {}
-    state_queue = [frozenset(root.firstpos)]
+    state_queue = deque([frozenset(root.firstpos)])
     transitions = {}
     state_names = {}
-    current_name = itertools.count(ord("A"))
+    # Los estados se identifican con enteros 0, 1, 2, ...
+    current_name = itertools.count()
     accepting_states = set()
 
     while state_queue:
-        state = state_queue.pop(0)
+        state = state_queue.popleft()
         if not state:
             continue
 
         # Si el estado no está en el diccionario de estados, lo agregamos
         if state not in state_names:
-            state_names[state] = chr(next(current_name))
+            state_names[state] = next(current_name)
             states[state_names[state]] = state
 
         # Mapeamos los símbolos a los siguientes estados
@@ -231,14 +787,15 @@ def construct_afd(root, position_symbol_map):
 
         for pos in state:
             symbol = position_symbol_map.get(pos)
-            # Si el símbolo no es "#" ni "_", lo agregamos al mapeo
+            # Si el símbolo no es "#" ni "_", lo agregamos al mapeo de cada clase que cubre
             if symbol and symbol != "#" and symbol != "_":
-                # Si el símbolo no está en el mapeo, lo agregamos y le asignamos un conjunto vacío
-                if symbol not in symbol_map:
-                    symbol_map[symbol] = set()
+                for symbol in classes[symbol]:
+                    # Si el símbolo no está en el mapeo, lo agregamos y le asignamos un conjunto vacío
+                    if symbol not in symbol_map:
+                        symbol_map[symbol] = set()
 
-                # Agregamos las posiciones de followpos al mapeo
-                symbol_map[symbol] |= followpos.get(pos, set())
+                    # Agregamos las posiciones de followpos al mapeo
+                    symbol_map[symbol] |= followpos.get(pos, set())
 
         # Para cada símbolo en el mapeo, creamos un nuevo estado
         for symbol, next_state in symbol_map.items():
@@ -250,7 +807,7 @@ def construct_afd(root, position_symbol_map):
             # Si el siguiente estado no está en el diccionario de estados, lo agregamos y lo agregamos a la cola de estados a procesar
             if next_state not in state_names:
                 state_queue.append(next_state)
-                state_names[next_state] = chr(next(current_name))
+                state_names[next_state] = next(current_name)
                 states[state_names[next_state]] = next_state
 
             # Agregamos la transición al diccionario de transiciones
@@ -261,6 +818,73 @@ def construct_afd(root, position_symbol_map):
         if any(position_symbol_map.get(pos) == "#" for pos in positions):
             accepting_states.add(state_name)
 
+    count("afd_states", len(states))
+    count("afd_transitions", len(transitions))
+    return states, transitions, accepting_states
+
+
+# Función que construye el AFD de un árbol con repeticiones {m,n}
+@pause_gc
+def construct_afd_from_counters(root, position_symbol_map):
+    """
+    Igual que construct_afd_from_sets, pero cada estado es un conjunto de
+    configuraciones (posición, contadores). El árbol tiene una sola copia de cada
+    posición, así que x{1,5000} cuesta las posiciones de x y no 5000 veces más; el
+    AFD sí tiene un estado por valor del contador, como el de la expresión
+    desenrollada.
+    En `states` cada estado se describe con sus posiciones, sin los contadores.
+    """
+    followpos, scopes, bounds = compute_counted_followpos(root)
+    classes = alphabet_classes(
+        symbol
+        for symbol in position_symbol_map.values()
+        if symbol != "#" and symbol != "_"
+    )
+
+    start = initial_configurations(root, scopes)
+    state_names = {start: 0}
+    state_queue = deque([start])
+    transitions = {}
+
+    while state_queue:
+        state = state_queue.popleft()
+
+        # Configuraciones siguientes por clase del alfabeto
+        symbol_map = {}
+        for pos, values in state:
+            symbol = position_symbol_map[pos]
+            if symbol == "#" or symbol == "_":
+                continue
+            reached = set()
+            follow_configurations(pos, values, followpos, scopes, bounds, reached)
+            if not reached:
+                continue
+            for symbol in classes[symbol]:
+                if symbol in symbol_map:
+                    symbol_map[symbol] |= reached
+                else:
+                    symbol_map[symbol] = set(reached)
+
+        for symbol, next_state in symbol_map.items():
+            next_state = frozenset(next_state)
+            if next_state not in state_names:
+                state_names[next_state] = len(state_names)
+                state_queue.append(next_state)
+            transitions[(state_names[state], symbol)] = state_names[next_state]
+
+    states = {
+        name: frozenset(pos for pos, _ in configurations)
+        for configurations, name in state_names.items()
+    }
+    accepting_states = {
+        name
+        for name, positions in states.items()
+        if any(position_symbol_map[pos] == "#" for pos in positions)
+    }
+
+    count("repetition_counters", len(bounds))
+    count("afd_states", len(states))
+    count("afd_transitions", len(transitions))
     return states, transitions, accepting_states
 
 
@@ -279,7 +903,7 @@ def print_afd(states, transitions, accepting_states):
     if accepting_states:
         print(
             Fore.YELLOW
-            + f"\nEstados de aceptación: {', '.join(accepting_states)}"
+            + f"\nEstados de aceptación: {', '.join(map(str, accepting_states))}"
             + Style.RESET_ALL
         )
 
@@ -299,99 +923,125 @@ def print_mini_afd(states, transitions, accepting_states):
     if accepting_states:
         print(
             Fore.YELLOW
-            + f"\nEstados de aceptación: {', '.join(accepting_states)}"
+            + f"\nEstados de aceptación: {', '.join(map(str, accepting_states))}"
             + Style.RESET_ALL
         )
 
 
-"""
+@pause_gc
+@stage("direct.minimize_afd")
+def minimize_afd(
+    states, transitions, accepting_states, initial_state=None, accepting_tags=None
+):
+    """
+    Implementa la minimización de un AFD con el algoritmo de Hopcroft en O(n log n).
 
-Esta función se realizó con ayuda de LLMs para poder entender mejor el funcionamiento de la minimización de un AFD
+    Se construye un índice inverso (símbolo -> destino -> predecesores), un arreglo
+    estado -> bloque y una lista de trabajo indexada por bloque. Como el AFD es
+    parcial (no tiene estado sumidero), todos los bloques iniciales entran a la lista
+    de trabajo. Si no se indica el estado inicial se toma el primero de `states`.
 
-Promt utilizado:
+    `accepting_tags` (estado -> etiqueta hashable) separa desde el inicio los estados
+    de aceptación con etiquetas distintas, de modo que nunca se fusionan.
+    """
 
-Could you help me with a function that minimizes an AFD using the method of equivalent state partitioning? I need to minimize the AFD that I built from a regular expression. I need to minimize the states, transitions, and accepting states if possible.
+    if initial_state is None:
+        initial_state = next(iter(states))
 
-"""
+    # 1. Numerar los estados y construir el índice inverso de transiciones
+    names = list(states)
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
 
+    inverse = {}
+    for (state, symbol), next_state in transitions.items():
+        predecessors = inverse.setdefault(symbol, {})
+        predecessors.setdefault(index[next_state], []).append(index[state])
 
-def minimize_afd(states, transitions, accepting_states):
-    """
-    Implementa la minimización de un AFD utilizando el método de partición de estados equivalentes.
-    """
-
-    # 1. Inicializar particiones
-    P = [set(accepting_states), set(states.keys()) - set(accepting_states)]
-    W = [
-        set(accepting_states),
-        set(states.keys()) - set(accepting_states),
-    ]  # Conjunto de trabajo
-
-    def get_partition(state, partitions):
-        """Devuelve el índice de la partición a la que pertenece un estado."""
-        for i, group in enumerate(partitions):
-            if state in group:
-                return i
-        return None
-
-    # 2. Refinar particiones hasta que sean estables
-    while W:
-        A = W.pop()  # Extraemos un grupo de trabajo
-
-        for symbol in set(sym for _, sym in transitions.keys()):
-            X = {
-                state
-                for state in states
-                if (state, symbol) in transitions and transitions[(state, symbol)] in A
-            }
-
-            for Y in P[:]:  # Iteramos sobre una copia de P
-                interseccion = X & Y
-                diferencia = Y - X
-
-                if interseccion and diferencia:
-                    P.remove(Y)  # Eliminamos el conjunto original
-                    P.append(interseccion)  # Agregamos las nuevas particiones
-                    P.append(diferencia)
-
-                    # Actualizar W con las nuevas particiones si es necesario
-                    if Y in W:
-                        W.remove(Y)
-                        W.append(interseccion)
-                        W.append(diferencia)
-                    else:
-                        W.append(
-                            interseccion
-                            if len(interseccion) <= len(diferencia)
-                            else diferencia
-                        )
-
-    # 3. Construcción del nuevo AFD minimizado
-    new_states = {chr(65 + i): group for i, group in enumerate(P)}
-    state_mapping = {
-        state: new_state for new_state, group in new_states.items() for state in group
-    }
+    # 2. Partición inicial: estados de aceptación (por etiqueta) y de no aceptación
+    accepting = {index[state] for state in accepting_states}
+    if accepting_tags is None:
+        accepting_groups = [set(accepting)]
+    else:
+        tagged = {}
+        for state in sorted(accepting):
+            tagged.setdefault(accepting_tags[names[state]], set()).add(state)
+        accepting_groups = list(tagged.values())
+    blocks = [
+        group for group in (*accepting_groups, set(range(n)) - accepting) if group
+    ]
+    block_of = [0] * n
+    for block_id, group in enumerate(blocks):
+        for state in group:
+            block_of[state] = block_id
+
+    worklist = list(range(len(blocks)))
+    in_worklist = [True] * len(blocks)
+    splits = 0
+
+    # 3. Refinar con cada bloque separador hasta que no queden en la lista de trabajo
+    while worklist:
+        splitter_id = worklist.pop()
+        in_worklist[splitter_id] = False
+        splitter = list(blocks[splitter_id])
+
+        for predecessors in inverse.values():
+            # Agrupar por bloque los estados que llegan al separador con este símbolo
+            touched = {}
+            for target in splitter:
+                for state in predecessors.get(target, ()):
+                    touched.setdefault(block_of[state], []).append(state)
+
+            for block_id, moved in touched.items():
+                group = blocks[block_id]
+                if len(moved) == len(group):
+                    continue
+
+                # Dividir el bloque: los estados tocados forman un bloque nuevo
+                splits += 1
+                new_id = len(blocks)
+                new_group = set(moved)
+                group -= new_group
+                blocks.append(new_group)
+                in_worklist.append(False)
+                for state in moved:
+                    block_of[state] = new_id
+
+                if in_worklist[block_id]:
+                    worklist.append(new_id)
+                    in_worklist[new_id] = True
+                else:
+                    smaller = new_id if len(new_group) <= len(group) else block_id
+                    worklist.append(smaller)
+                    in_worklist[smaller] = True
+
+    # 4. Renumerar los bloques dejando el bloque del estado inicial como 0
+    new_ids = {block_of[index[initial_state]]: 0}
+    for state in range(n):
+        if block_of[state] not in new_ids:
+            new_ids[block_of[state]] = len(new_ids)
+
+    new_states = {new_id: set() for new_id in range(len(new_ids))}
+    for state in range(n):
+        new_states[new_ids[block_of[state]]].add(names[state])
 
     new_transitions = {}
     for (state, symbol), next_state in transitions.items():
-        new_transitions[(state_mapping[state], symbol)] = state_mapping[next_state]
+        new_transitions[(new_ids[block_of[index[state]]], symbol)] = new_ids[
+            block_of[index[next_state]]
+        ]
 
-    # Determinar el nuevo estado inicial
-    initial_state = "A"  # Estado inicial del AFD original
-    new_initial_state = state_mapping[initial_state]
+    new_accepting_states = {new_ids[block_of[state]] for state in accepting}
+    new_initial_state = 0
 
-    # Determinar los nuevos estados de aceptación
-    new_accepting_states = {
-        new_state
-        for new_state, group in new_states.items()
-        if any(s in accepting_states for s in group)
-    }
+    count("partition_splits", splits)
+    count("minimized_states", len(new_states))
 
     return new_states, new_transitions, new_accepting_states, new_initial_state
 
 
 # Función para generar la representación gráfica del AFD en una carpeta específica
-def visualize_afd(states, transitions, accepting_states, regex):
+def visualize_afd(states, transitions, accepting_states, regex, render=False):
     sanitized_regex = sanitize_filename(regex)
     output_dir = f"./Primera_parte/grafos/{sanitized_regex}/direct_AFD"
     os.makedirs(output_dir, exist_ok=True)  # Crear la carpeta si no existe
@@ -401,24 +1051,26 @@ def visualize_afd(states, transitions, accepting_states, regex):
 
     # Nodo especial para el estado inicial
     dot.node("start", shape="none", label="Inicio")
-    dot.edge("start", "A")  # Flecha hacia el estado inicial
+    dot.edge("start", "0")  # Flecha hacia el estado inicial
 
     for state in states:
         if state in accepting_states:
-            dot.node(state, state, shape="doublecircle", color="blue")
+            dot.node(str(state), str(state), shape="doublecircle", color="blue")
         else:
-            dot.node(state, state, shape="circle")
+            dot.node(str(state), str(state), shape="circle")
 
     for (state, symbol), next_state in transitions.items():
-        dot.edge(state, next_state, label=symbol)
+        # Las clases ([^\n]) llevan barras que Graphviz interpretaría como escapes
+        dot.edge(str(state), str(next_state), label=graphviz.escape(symbol))
 
+    # Solo el DOT por defecto; la imagen se dibuja en segundo plano si se pide
     output_path = os.path.join(output_dir, "grafo_AFD")
-    dot.render(output_path, view=True)
+    save_graph(dot, output_path, len(states), render=render, view=render)
 
 
 # Función para generar la representación gráfica del AFD minimizado
 def visualize_minimized_afd(
-    states, transitions, accepting_states, initial_state, regex
+    states, transitions, accepting_states, initial_state, regex, render=False
 ):
     """
     Genera la representación gráfica del AFD minimizado.
@@ -435,42 +1087,249 @@ def visualize_minimized_afd(
 
     # Nodo especial para el estado inicial
     dot.node("start", shape="none", label="Inicio")
-    dot.edge("start", initial_state)  # Flecha hacia el estado inicial
+    dot.edge("start", str(initial_state))  # Flecha hacia el estado inicial
 
     # Dibujar los estados
     for state in states:
         if state in accepting_states:
             dot.node(
-                state, state, shape="doublecircle", color="blue"
+                str(state), str(state), shape="doublecircle", color="blue"
             )  # Estado de aceptación
         else:
-            dot.node(state, state, shape="circle")  # Estado normal
+            dot.node(str(state), str(state), shape="circle")  # Estado normal
 
     # Dibujar las transiciones
     for (state, symbol), next_state in transitions.items():
-        dot.edge(state, next_state, label=symbol)
+        # Las clases ([^\n]) llevan barras que Graphviz interpretaría como escapes
+        dot.edge(str(state), str(next_state), label=graphviz.escape(symbol))
 
-    # Guardar y visualizar el gráfico
+    # Guardar el DOT y, si se pide, dibujar y mostrar el gráfico en segundo plano
     output_path = os.path.join(output_dir, "grafo_mini_AFD")
-    dot.render(output_path, view=True)
+    save_graph(dot, output_path, len(states), render=render, view=render)
 
 
-# Función para procesar cadenas y verificar si son aceptadas por el AFD
-def procesar_cadena(afd_transitions, accepting_states, initial_state, input_string):
-    current_state = initial_state
+# Función que compila el AFD a una tabla de transiciones densa
+@stage("direct.compile_afd")
+def compile_afd(states, transitions, accepting_states, initial_state):
+    """
+    Compila un AFD de diccionarios a una tabla de transiciones densa.
 
-    for symbol in input_string:
-        if (current_state, symbol) in afd_transitions:
-            current_state = afd_transitions[(current_state, symbol)]
+    Los estados se renumeran con enteros (el estado inicial siempre es el 0) y cada
+    símbolo del alfabeto recibe una columna. La tabla es un array plano donde la
+    fila corresponde al estado y la columna al símbolo: table[state * width + column]
+    contiene el siguiente estado o -1 si la transición no existe (rechazo).
+
+    Los símbolos que son clases de varios caracteres ([a-wyz], [^\n]) también van en
+    "ranges" (ver symbolsAFD.class_ranges), para buscar la columna de un carácter
+    que no está en el alfabeto.
+    """
+
+    # Renumerar los estados empezando por el estado inicial
+    state_ids = {initial_state: 0}
+    for state in states:
+        if state not in state_ids:
+            state_ids[state] = len(state_ids)
+
+    # Asignar una columna a cada símbolo del alfabeto
+    alphabet = {}
+    for _, symbol in transitions:
+        if symbol not in alphabet:
+            alphabet[symbol] = len(alphabet)
+
+    width = len(alphabet)
+    table = array("i", [-1]) * (len(state_ids) * width)
+    for (state, symbol), next_state in transitions.items():
+        table[state_ids[state] * width + alphabet[symbol]] = state_ids[next_state]
+
+    # Bandera de aceptación por estado
+    accepting = bytearray(len(state_ids))
+    for state in accepting_states:
+        accepting[state_ids[state]] = 1
+
+    return {
+        "alphabet": alphabet,
+        "width": width,
+        "table": table,
+        "accepting": accepting,
+        "initial": 0,
+        "state_ids": state_ids,
+        "ranges": class_ranges(alphabet),
+    }
+
+
+# Función que crea una copia de solo lectura del AFD compilado
+def freeze_compiled_afd(compiled_afd):
+    """
+    La tabla pasa a ser una tupla (indexarla cuesta lo mismo que al array, a
+    diferencia de un memoryview de solo lectura), la aceptación un bytes y los
+    diccionarios vistas inmutables (MappingProxyType). Los simuladores la recorren
+    igual que a la versión mutable, así que se puede compartir entre hilos.
+    """
+    frozen = dict(compiled_afd)
+    frozen["alphabet"] = MappingProxyType(dict(compiled_afd["alphabet"]))
+    frozen["table"] = tuple(compiled_afd["table"])
+    frozen["accepting"] = bytes(compiled_afd["accepting"])
+    if "state_ids" in frozen:
+        frozen["state_ids"] = MappingProxyType(dict(compiled_afd["state_ids"]))
+    return MappingProxyType(frozen)
+
+
+# Encabezado del formato binario del AFD compilado: identificador, versión del
+# formato, cantidad de estados, ancho del alfabeto, estado inicial y bytes del alfabeto
+COMPILED_AFD_MAGIC = b"AFDT"
+COMPILED_AFD_VERSION = 1
+COMPILED_AFD_HEADER = struct.Struct("<4sHIIII")
+
+
+# Función que serializa el AFD compilado a un formato binario compacto
+def serialize_compiled_afd(compiled_afd):
+    alphabet = json.dumps(list(compiled_afd["alphabet"]), ensure_ascii=False).encode()
+    table = array("i", compiled_afd["table"])
+    if sys.byteorder == "big":
+        table.byteswap()
+
+    header = COMPILED_AFD_HEADER.pack(
+        COMPILED_AFD_MAGIC,
+        COMPILED_AFD_VERSION,
+        len(compiled_afd["accepting"]),
+        compiled_afd["width"],
+        compiled_afd["initial"],
+        len(alphabet),
+    )
+    return header + alphabet + table.tobytes() + bytes(compiled_afd["accepting"])
+
+
+# Función que reconstruye el AFD compilado desde su formato binario
+def deserialize_compiled_afd(data):
+    magic, version, state_count, width, initial, alphabet_size = (
+        COMPILED_AFD_HEADER.unpack_from(data)
+    )
+    if magic != COMPILED_AFD_MAGIC or version != COMPILED_AFD_VERSION:
+        raise ValueError("Formato de AFD compilado no reconocido")
+
+    offset = COMPILED_AFD_HEADER.size
+    table_size = state_count * width * array("i").itemsize
+    if len(data) != offset + alphabet_size + table_size + state_count:
+        raise ValueError("AFD compilado incompleto")
+
+    symbols = json.loads(bytes(data[offset : offset + alphabet_size]).decode())
+    offset += alphabet_size
+
+    table = array("i")
+    table.frombytes(data[offset : offset + table_size])
+    if sys.byteorder == "big":
+        table.byteswap()
+    offset += table_size
+
+    alphabet = {symbol: column for column, symbol in enumerate(symbols)}
+    return {
+        "alphabet": alphabet,
+        "width": width,
+        "table": table,
+        "accepting": bytearray(data[offset : offset + state_count]),
+        "initial": initial,
+        "ranges": class_ranges(alphabet),
+    }
+
+
+# Función que compila una expresión regular hasta la tabla del AFD minimizado
+def compile_regex(regex):
+    postfix = augmented_postfix(regex)
+    syntax_tree, position_symbol_map = build_syntax_tree(postfix)
+    states, transitions, accepting_states = construct_afd(
+        syntax_tree, position_symbol_map
+    )
+    return compile_afd(*minimize_afd(states, transitions, accepting_states))
+
+
+# Las filas de transition_rows incluyen los caracteres de las clases con punto de
+# código menor que este límite; los demás se buscan con wide_transition
+ROW_EXPAND_LIMIT = 256
+
+
+# Función que convierte la tabla compilada en un diccionario símbolo -> estado por estado
+def transition_rows(compiled_afd):
+    """
+    Con estas filas cada carácter cuesta una sola consulta (rows[estado].get(símbolo))
+    en lugar de buscar la columna y luego indexar la tabla.
+    """
+    width = compiled_afd["width"]
+    table = compiled_afd["table"]
+    symbols = []
+    for symbol, column in compiled_afd["alphabet"].items():
+        if len(symbol) > 1:
+            for member in class_symbols(symbol, ROW_EXPAND_LIMIT):
+                symbols.append((member, column))
         else:
-            print(
-                Fore.RED
-                + f"La cadena '{input_string}' NO es aceptada."
-                + Style.RESET_ALL
-            )
-            return False
+            symbols.append((symbol, column))
+
+    rows = []
+    for state in range(len(compiled_afd["accepting"])):
+        row = {}
+        for symbol, column in symbols:
+            next_state = table[state * width + column]
+            if next_state >= 0:
+                row[symbol] = next_state
+        rows.append(row)
+    return rows
+
+
+# Función que crea el paso de respaldo para los caracteres que no están en las filas
+def wide_transition(compiled_afd):
+    """
+    Un carácter que no está en la fila de transition_rows todavía puede pertenecer
+    a una clase ancha ([^a], ., \\W). La función devuelta, step(estado, símbolo),
+    lo busca en los intervalos del AFD y devuelve el siguiente estado o None. Si el
+    AFD no tiene clases siempre devuelve None.
+    """
+    ranges = compiled_afd.get("ranges")
+    width = compiled_afd["width"]
+    table = compiled_afd["table"]
+
+    def step(state, symbol):
+        if ranges is None:
+            return None
+        column = range_lookup(ranges, symbol)
+        if column is None:
+            return None
+        next_state = table[state * width + column]
+        return next_state if next_state >= 0 else None
+
+    return step
 
-    if current_state in accepting_states:
+
+# Función que avanza por la tabla compilada desde un estado y devuelve el estado final (-1 = rechazo)
+def advance_compiled_afd(compiled_afd, current_state, input_string):
+    alphabet = compiled_afd["alphabet"]
+    width = compiled_afd["width"]
+    table = compiled_afd["table"]
+    ranges = compiled_afd.get("ranges")
+
+    for symbol in input_string:
+        column = alphabet.get(symbol)
+        if column is None:
+            # El carácter puede pertenecer a una clase de varios caracteres
+            column = range_lookup(ranges, symbol) if ranges else None
+            if column is None:
+                return -1
+        current_state = table[current_state * width + column]
+        if current_state < 0:
+            return -1
+
+    return current_state
+
+
+# Función que recorre la tabla compilada y devuelve si la cadena es aceptada
+def run_compiled_afd(compiled_afd, input_string):
+    current_state = advance_compiled_afd(
+        compiled_afd, compiled_afd["initial"], input_string
+    )
+    return current_state >= 0 and compiled_afd["accepting"][current_state] == 1
+
+
+# Función para procesar cadenas y verificar si son aceptadas por el AFD
+def procesar_cadena(compiled_afd, input_string):
+    if run_compiled_afd(compiled_afd, input_string):
         print(Fore.GREEN + f"La cadena '{input_string}' es aceptada." + Style.RESET_ALL)
         return True
     else:
@@ -484,11 +1343,10 @@ def procesar_cadena(afd_transitions, accepting_states, initial_state, input_stri
 if __name__ == "__main__":
     regex = input(
         Fore.GREEN
-        + "Ingresa la regexp que deseas convertir a AFD (or = '|', '+', Cerradura de Kleene = '*'): "
+        + "Ingresa la regexp que deseas convertir a AFD (or = '|', Cerradura de Kleene = '*', una o más = '+', opcional = '?', repetición = '{m,n}'): "
         + Style.RESET_ALL
     )
-    regex += "#"
-    postfix = toPostFix(regex)
+    postfix = augmented_postfix(regex)
     syntax_tree, position_symbol_map = build_syntax_tree(postfix)
     states, transitions, accepting_states = construct_afd(
         syntax_tree, position_symbol_map
@@ -502,10 +1360,20 @@ if __name__ == "__main__":
     print_afd(states, transitions, accepting_states)
     print_mini_afd(new_states, new_transitions, new_accepting_states)
 
-    # Generar visualización del AFD directo y minimizado
-    visualize_afd(states, transitions, accepting_states, regex)
+    # Generar visualización del AFD directo y minimizado (se dibujan en segundo plano)
+    visualize_afd(states, transitions, accepting_states, regex, render=True)
     visualize_minimized_afd(
-        new_states, new_transitions, new_accepting_states, new_initial_state, regex
+        new_states,
+        new_transitions,
+        new_accepting_states,
+        new_initial_state,
+        regex,
+        render=True,
+    )
+
+    # Compilar el AFD minimizado a su tabla de transiciones
+    compiled_afd = compile_afd(
+        new_states, new_transitions, new_accepting_states, new_initial_state
     )
 
     # Probar cadenas en el AFD minimizado
@@ -519,6 +1387,4 @@ if __name__ == "__main__":
         if test_string.lower() == "salir":
             break
 
-        procesar_cadena(
-            new_transitions, new_accepting_states, new_initial_state, test_string
-        )
+        procesar_cadena(compiled_afd, test_string)
@@ -0,0 +1,105 @@
+# Generación de grafos fuera del camino crítico
+#
+# Por defecto solo se escribe el archivo DOT (texto, instantáneo). Si se pide la
+# imagen, el `dot.render` se encola en un hilo de fondo, así que la construcción y la
+# simulación no esperan al layout de Graphviz, que para miles de estados tarda minutos.
+# Los autómatas con más de MAX_RENDER_STATES estados no se dibujan. Junto a cada DOT se
+# guarda el hash de su contenido (para no reescribirlo si no cambió) y junto a cada
+# imagen el hash del DOT con el que se dibujó, escrito por el hilo de fondo solo
+# después de dibujarla: si coincide con el DOT actual, no se vuelve a dibujar.
+
+import atexit
+import hashlib
+import os
+import queue
+import sys
+import threading
+
+import graphviz
+
+# Cantidad máxima de estados para dibujar la imagen (los DOT se escriben siempre)
+MAX_RENDER_STATES = 200
+
+render_queue = queue.Queue()
+render_thread = None
+render_lock = threading.Lock()
+
+
+def render_worker():
+    while True:
+        dot, digest, image_path, image_format, view = render_queue.get()
+        try:
+            # pipe no reescribe el DOT, que puede haber cambiado desde que se encoló
+            image = dot.pipe(format=image_format)
+            with open(image_path, "wb") as file:
+                file.write(image)
+            with open(image_path + ".sha256", "w") as file:
+                file.write(digest)
+            if view:
+                graphviz.view(image_path)
+        except Exception as error:
+            print(f"No se pudo dibujar {image_path}: {error}", file=sys.stderr)
+        finally:
+            render_queue.task_done()
+
+
+def start_render_thread():
+    global render_thread
+    with render_lock:
+        if render_thread is None:
+            render_thread = threading.Thread(target=render_worker, daemon=True)
+            render_thread.start()
+            # Terminar los dibujos pendientes antes de salir del programa
+            atexit.register(wait_for_renders)
+
+
+# Función que espera a que terminen todos los dibujos encolados
+def wait_for_renders():
+    render_queue.join()
+
+
+# Función que lee un hash guardado junto a un archivo (None si no existe)
+def read_digest(path):
+    hash_path = path + ".sha256"
+    if not os.path.exists(hash_path) or not os.path.exists(path):
+        return None
+    with open(hash_path) as file:
+        return file.read().strip()
+
+
+# Función que guarda el DOT y, si se pide, encola el dibujo de la imagen
+def save_graph(
+    dot, output_path, state_count, render=False, view=False, image_format="png"
+):
+    """
+    Escribe `output_path` (fuente DOT) y devuelve la ruta de la imagen si se encoló
+    su dibujo o si la imagen existente ya se dibujó con el mismo DOT, o None si no se
+    dibuja (no se pidió o supera MAX_RENDER_STATES).
+    """
+    source = dot.source
+    digest = hashlib.sha256(source.encode()).hexdigest()
+    image_path = f"{output_path}.{image_format}"
+
+    if read_digest(output_path) != digest:
+        with open(output_path, "w", encoding="utf-8") as file:
+            file.write(source)
+        with open(output_path + ".sha256", "w") as file:
+            file.write(digest)
+
+    if not render:
+        return None
+    if state_count > MAX_RENDER_STATES:
+        print(
+            f"{output_path}: {state_count} estados (más de {MAX_RENDER_STATES}), "
+            "solo se escribió el DOT",
+            file=sys.stderr,
+        )
+        return None
+    if read_digest(image_path) == digest:
+        if view:
+            graphviz.view(image_path)
+        return image_path
+
+    start_render_thread()
+    render_queue.put((dot, digest, image_path, image_format, view))
+    return image_path
@@ -0,0 +1,87 @@
+# Conjunto de expresiones regulares compiladas en un solo AFD
+#
+# Cada patrón termina con su propio marcador "#" y todos se unen con "|" antes de
+# construir el árbol sintáctico, así que construct_afd produce un único AFD. Las
+# posiciones de los marcadores se etiquetan con el índice de su patrón: un estado de
+# aceptación sabe qué patrones aceptan la entrada leída hasta ahí. La minimización
+# recibe esas etiquetas para no fusionar estados que aceptan patrones distintos.
+
+from regexpToAFD import (
+    advance_compiled_afd,
+    augmented_postfix,
+    build_syntax_tree,
+    compile_afd,
+    construct_afd,
+    minimize_afd,
+)
+
+
+# Función que construye el árbol sintáctico de la unión de los patrones
+def build_set_syntax_tree(patterns):
+    """
+    Devuelve la raíz, el mapa posición -> símbolo y el mapa posición de "#" ->
+    índice del patrón.
+
+    El postfix de cada patrón contiene un solo "#" y los postfix se concatenan en
+    orden ("p0 p1 | p2 | ..."), así que las posiciones de los marcadores aparecen en
+    el mismo orden que los patrones.
+    """
+    if not patterns:
+        raise ValueError("El conjunto de patrones está vacío")
+
+    postfixes = [augmented_postfix(pattern) for pattern in patterns]
+    postfix = postfixes[0] + "".join(postfix + "|" for postfix in postfixes[1:])
+    root, position_symbol_map = build_syntax_tree(postfix)
+
+    end_positions = sorted(
+        pos for pos, symbol in position_symbol_map.items() if symbol == "#"
+    )
+    if len(end_positions) != len(patterns):
+        raise ValueError("Los patrones no pueden contener el marcador '#'")
+
+    end_tags = {pos: pattern_id for pattern_id, pos in enumerate(end_positions)}
+    return root, position_symbol_map, end_tags
+
+
+# Función que compila el conjunto de patrones a una tabla con etiquetas de aceptación
+def compile_regex_set(patterns, priority=False):
+    """
+    Compila `patterns` (lista de expresiones en infix) a un AFD compilado igual al de
+    compile_afd, más la clave "tags": para cada estado, la tupla ordenada de índices
+    de los patrones que aceptan (vacía si el estado no acepta).
+
+    Con `priority=True` cada estado conserva solo el patrón de menor índice (el de
+    mayor prioridad), así que la minimización puede fusionar más estados.
+    """
+    root, position_symbol_map, end_tags = build_set_syntax_tree(patterns)
+    states, transitions, accepting_states = construct_afd(root, position_symbol_map)
+
+    state_tags = {
+        state: tuple(sorted(end_tags[pos] for pos in positions if pos in end_tags))
+        for state, positions in states.items()
+    }
+    if priority:
+        state_tags = {state: tags[:1] for state, tags in state_tags.items()}
+
+    new_states, new_transitions, new_accepting_states, new_initial_state = minimize_afd(
+        states, transitions, accepting_states, accepting_tags=state_tags
+    )
+    compiled_afd = compile_afd(
+        new_states, new_transitions, new_accepting_states, new_initial_state
+    )
+
+    # Todos los estados de un bloque tienen las mismas etiquetas
+    tags = [()] * len(compiled_afd["accepting"])
+    for block, members in new_states.items():
+        tags[compiled_afd["state_ids"][block]] = state_tags[next(iter(members))]
+    compiled_afd["tags"] = tags
+
+    return compiled_afd
+
+
+# Función que devuelve los índices de los patrones que aceptan la cadena completa
+def match_regex_set(compiled_set, input_string):
+    state = advance_compiled_afd(compiled_set, compiled_set["initial"], input_string)
+    if state < 0:
+        return ()
+    return compiled_set["tags"][state]
@@ -0,0 +1,137 @@
+# Simulación de un AFD compilado sobre entradas que no caben en memoria
+#
+# La entrada se lee por bloques (un archivo mapeado con mmap, un flujo binario o un
+# iterador de bloques) y el estado actual del AFD pasa de un bloque al siguiente.
+# Los bytes se decodifican como UTF-8 de forma incremental, así que un carácter partido
+# entre dos bloques se decodifica correctamente.
+
+import codecs
+import mmap
+import os
+
+from regexpToAFD import advance_compiled_afd
+from symbolsAFD import range_lookup
+
+# Tamaño por defecto de cada bloque leído (en bytes)
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Cantidad máxima de conjuntos de estados guardados al buscar una coincidencia parcial
+MAX_SEARCH_STATES = 4096
+
+
+# Función que lee bloques de bytes de un archivo usando mmap
+def iter_file_chunks(path, chunk_size):
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, len(mapped), chunk_size):
+                yield mapped[start : start + chunk_size]
+
+
+# Función que lee bloques de un flujo (archivo abierto, socket, etc.)
+def iter_stream_chunks(stream, chunk_size):
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+# Función que convierte cualquier fuente de entrada en bloques de texto
+def iter_text_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8"):
+    """
+    `source` puede ser una ruta (str o os.PathLike), un flujo con método read() o un
+    iterable de bloques. Los bloques de bytes se decodifican de forma incremental; los
+    bloques de texto se devuelven tal cual.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        chunks = iter_file_chunks(source, chunk_size)
+    elif hasattr(source, "read"):
+        chunks = iter_stream_chunks(source, chunk_size)
+    else:
+        chunks = iter(source)
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            yield chunk
+        else:
+            yield decoder.decode(chunk)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+# Función que verifica si toda la entrada es aceptada por el AFD
+def fullmatch_stream(compiled_afd, source, chunk_size=DEFAULT_CHUNK_SIZE):
+    current_state = compiled_afd["initial"]
+
+    for text in iter_text_chunks(source, chunk_size):
+        current_state = advance_compiled_afd(compiled_afd, current_state, text)
+        if current_state < 0:
+            # Estado muerto: ninguna continuación puede ser aceptada
+            return False
+
+    return compiled_afd["accepting"][current_state] == 1
+
+
+# Función que verifica si alguna subcadena de la entrada es aceptada por el AFD
+def search_stream(compiled_afd, source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Simula el AFD empezando en cada posición de la entrada a la vez: el estado de la
+    búsqueda es el conjunto de estados del AFD alcanzados desde todos los inicios
+    posibles. Las transiciones entre conjuntos se guardan en una caché, así que en
+    la práctica cada carácter cuesta una consulta a un diccionario. Se detiene en la
+    primera coincidencia.
+    """
+    alphabet = compiled_afd["alphabet"]
+    width = compiled_afd["width"]
+    table = compiled_afd["table"]
+    accepting = compiled_afd["accepting"]
+    initial = compiled_afd["initial"]
+    ranges = compiled_afd.get("ranges")
+
+    if accepting[initial]:
+        return True
+
+    # Conjunto -> {símbolo: siguiente conjunto}. Solo se guardan conjuntos que no
+    # aceptan, porque al llegar a uno que acepta la búsqueda termina.
+    cache = {}
+    current = frozenset([initial])
+
+    for text in iter_text_chunks(source, chunk_size):
+        for symbol in text:
+            row = cache.get(current)
+            if row is None:
+                if len(cache) >= MAX_SEARCH_STATES:
+                    cache.clear()
+                row = cache[current] = {}
+
+            following = row.get(symbol)
+            if following is None:
+                column = alphabet.get(symbol)
+                if column is None and ranges:
+                    column = range_lookup(ranges, symbol)
+                reached = {initial}
+                if column is not None:
+                    for state in current:
+                        next_state = table[state * width + column]
+                        if next_state >= 0:
+                            reached.add(next_state)
+                following = row[symbol] = frozenset(reached)
+                if any(accepting[state] for state in following):
+                    return True
+
+            current = following
+
+    return False
+
+
+# Función que verifica la entrada completa o una subcadena según `mode`
+def match_stream(compiled_afd, source, mode="full", chunk_size=DEFAULT_CHUNK_SIZE):
+    if mode == "full":
+        return fullmatch_stream(compiled_afd, source, chunk_size)
+    if mode == "contains":
+        return search_stream(compiled_afd, source, chunk_size)
+    raise ValueError(f"Modo desconocido: {mode!r} (se esperaba 'full' o 'contains')")
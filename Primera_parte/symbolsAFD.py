@@ -0,0 +1,435 @@
+# Clases de caracteres y partición del alfabeto en intervalos
+#
+# En infix se aceptan clases entre corchetes ([a-z], [^0-9_]), el comodín "." (todo
+# menos "\n"), los escapes \d \w \s y sus negaciones \D \W \S (en su versión ASCII,
+# como re.ASCII) y los escapes de un carácter (\n, \t, \x41, \u00e9, \., \*, ...).
+# Cada uno se convierte en un solo operando: el texto canónico de su conjunto de
+# puntos de código, siempre entre corchetes. Así el postfix sigue siendo una cadena y
+# una clase ocupa una sola posición del árbol sintáctico (o un solo estado del AFN).
+#
+# Al construir el AFD, las etiquetas de las posiciones se reparten en clases
+# disjuntas: dos caracteres quedan en la misma clase si todas las etiquetas los
+# aceptan por igual. Cada clase es una columna de la tabla, así que [a-z]* cuesta una
+# columna y no 26, y una clase Unicode enorme sigue siendo una columna. Las clases de
+# un solo carácter se identifican con ese carácter; las demás con su texto canónico.
+#
+# Las repeticiones acotadas ({3}, {2,5}, {2,}, {,5}) también se leen aquí y quedan
+# como un solo operador con su texto canónico ({m,n} o {m,}).
+
+import functools
+from bisect import bisect_left, bisect_right
+
+# Mayor punto de código de Unicode
+MAX_CODE_POINT = 0x10FFFF
+
+# Conjuntos de los escapes de clase (versión ASCII)
+DIGITS = ((0x30, 0x39),)
+WORD = ((0x30, 0x39), (0x41, 0x5A), (0x5F, 0x5F), (0x61, 0x7A))
+SPACES = ((0x09, 0x0D), (0x20, 0x20))
+
+# Escapes de un carácter con nombre
+NAMED_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v"}
+
+# Cantidad de dígitos hexadecimales de \x, \u y \U
+HEX_ESCAPES = {"x": 2, "u": 4, "U": 8}
+
+# Caracteres que se escapan dentro del texto canónico de una clase
+CLASS_SPECIALS = "\\[]-^"
+
+# Etiquetas reservadas: marcador de fin (construcción directa) y epsilon
+RESERVED_SYMBOLS = "#_"
+
+
+# Función que ordena y une intervalos que se solapan o son contiguos
+def normalize_intervals(intervals):
+    merged = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + 1:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return tuple(merged)
+
+
+# Función que devuelve el complemento de intervalos normalizados
+def complement_intervals(intervals):
+    result = []
+    start = 0
+    for lo, hi in intervals:
+        if lo > start:
+            result.append((start, lo - 1))
+        start = hi + 1
+    if start <= MAX_CODE_POINT:
+        result.append((start, MAX_CODE_POINT))
+    return tuple(result)
+
+
+SHORTHAND_CLASSES = {
+    "d": DIGITS,
+    "w": WORD,
+    "s": SPACES,
+    "D": complement_intervals(DIGITS),
+    "W": complement_intervals(WORD),
+    "S": complement_intervals(SPACES),
+}
+
+# Comodín ".": cualquier carácter menos el salto de línea
+WILDCARD = complement_intervals(((0x0A, 0x0A),))
+
+
+# Función que lee el escape que empieza después de la barra en text[i]
+def parse_escape(text, i):
+    """Devuelve (intervalos, posición siguiente)."""
+    if i >= len(text):
+        raise ValueError("Escape incompleto al final de la expresión")
+
+    c = text[i]
+    if c in SHORTHAND_CLASSES:
+        return SHORTHAND_CLASSES[c], i + 1
+    if c in NAMED_ESCAPES:
+        code = ord(NAMED_ESCAPES[c])
+        return ((code, code),), i + 1
+    if c in HEX_ESCAPES:
+        digits = text[i + 1 : i + 1 + HEX_ESCAPES[c]]
+        try:
+            if len(digits) != HEX_ESCAPES[c]:
+                raise ValueError
+            code = int(digits, 16)
+        except ValueError:
+            raise ValueError(
+                f"Escape \\{c} inválido: {text[i - 1 : i + 9]!r}"
+            ) from None
+        if code > MAX_CODE_POINT:
+            raise ValueError(f"Punto de código fuera de Unicode: \\{c}{digits}")
+        return ((code, code),), i + 1 + len(digits)
+
+    # Cualquier otro carácter escapado se toma literal (\., \*, \[, \#, ...)
+    code = ord(c)
+    return ((code, code),), i + 1
+
+
+# Función que lee un elemento de una clase (carácter o escape) desde text[i]
+def parse_class_item(text, i):
+    if text[i] == "\\":
+        return parse_escape(text, i + 1)
+    code = ord(text[i])
+    return ((code, code),), i + 1
+
+
+# Función que lee la clase entre corchetes que empieza en text[i] ("[")
+def parse_class(text, i):
+    """
+    Devuelve (intervalos, posición después de "]"). Un "]" justo después de "[" o
+    "[^" es literal, igual que un "-" al principio o al final de la clase.
+    """
+    start = i
+    i += 1
+    negated = text.startswith("^", i)
+    if negated:
+        i += 1
+
+    items = []
+    first = True
+    while True:
+        if i >= len(text):
+            raise ValueError(f"Clase de caracteres sin cerrar: {text[start:]!r}")
+        if text[i] == "]" and not first:
+            i += 1
+            break
+        first = False
+
+        low, i = parse_class_item(text, i)
+        single = len(low) == 1 and low[0][0] == low[0][1]
+        # Un "-" entre dos caracteres es un rango; al final de la clase es literal
+        is_range = text.startswith("-", i) and text[i + 1 : i + 2] not in ("", "]")
+        if single and is_range:
+            high, i = parse_class_item(text, i + 1)
+            if len(high) != 1 or high[0][0] != high[0][1] or high[0][0] < low[0][0]:
+                raise ValueError(f"Rango inválido en la clase: {text[start:i]!r}")
+            items.append((low[0][0], high[0][0]))
+        else:
+            items.extend(low)
+
+    intervals = normalize_intervals(items)
+    if negated:
+        intervals = complement_intervals(intervals)
+    return intervals, i
+
+
+# Función que lee la repetición {m,n} que empieza en text[i] ("{")
+def parse_repetition(text, i):
+    """
+    Devuelve (mínimo, máximo, posición después de "}"); el máximo es None si la
+    repetición no tiene límite. Se aceptan {m}, {m,}, {m,n} y {,n}.
+    """
+    end = text.find("}", i)
+    if end < 0:
+        raise ValueError(f"Repetición sin cerrar: {text[i:]!r}")
+
+    low, comma, high = text[i + 1 : end].partition(",")
+    parts = [part for part in (low, high) if part]
+    if not parts or not all(part.isascii() and part.isdigit() for part in parts):
+        raise ValueError(f"Repetición inválida: {text[i : end + 1]!r}")
+
+    minimum = int(low) if low else 0
+    maximum = (int(high) if high else None) if comma else minimum
+    if maximum is not None and maximum < minimum:
+        raise ValueError(
+            f"Repetición con máximo menor que el mínimo: {text[i : end + 1]!r}"
+        )
+    return minimum, maximum, end + 1
+
+
+# Función que escribe el texto canónico de una repetición
+def repetition_text(minimum, maximum):
+    return f"{{{minimum},{'' if maximum is None else maximum}}}"
+
+
+# Función que indica si un símbolo es una repetición canónica ({m,n} o {m,})
+def is_repetition(token):
+    return token[:1] == "{"
+
+
+# Función que devuelve (mínimo, máximo) de una repetición canónica
+@functools.lru_cache(maxsize=1024)
+def repetition_bounds(token):
+    minimum, maximum, _ = parse_repetition(token, 0)
+    return minimum, maximum
+
+
+# Función que escribe un punto de código dentro del texto canónico de una clase
+def class_char(code):
+    c = chr(code)
+    if c in CLASS_SPECIALS:
+        return "\\" + c
+    if c in ("\n", "\t", "\r"):
+        return {"\n": "\\n", "\t": "\\t", "\r": "\\r"}[c]
+    if c.isprintable():
+        return c
+    if code <= 0xFF:
+        return f"\\x{code:02x}"
+    if code <= 0xFFFF:
+        return f"\\u{code:04x}"
+    return f"\\U{code:08x}"
+
+
+# Función que escribe el texto canónico de un conjunto de intervalos
+def class_text(intervals):
+    """
+    El texto siempre va entre corchetes y parse_class lo vuelve a leer como los
+    mismos intervalos. Los conjuntos que contienen los dos extremos de Unicode se
+    escriben negados ([^\\n] en lugar de dos intervalos enormes).
+    """
+    complement = complement_intervals(intervals)
+    negated = not intervals or (
+        complement and intervals[0][0] == 0 and intervals[-1][1] == MAX_CODE_POINT
+    )
+    if negated:
+        intervals = complement
+
+    parts = []
+    for lo, hi in intervals:
+        parts.append(class_char(lo))
+        if hi > lo + 1:
+            parts.append("-")
+        if hi > lo:
+            parts.append(class_char(hi))
+    return ("[^" if negated else "[") + "".join(parts) + "]"
+
+
+# Función que divide una expresión infix en símbolos, con las clases ya canónicas
+def infix_tokens(infix, is_operand):
+    """
+    Devuelve la lista de símbolos de `infix`: los caracteres sueltos quedan igual y
+    cada clase, escape o comodín se reemplaza por su texto canónico. Un escape de un
+    solo carácter que ya es un operando (\\a) queda como ese carácter; si no lo es
+    (\\., \\+, \\#, \\_) se escribe entre corchetes para no confundirlo con un
+    operador, el marcador de fin o epsilon. Las repeticiones quedan como un solo
+    símbolo {m,n}.
+    """
+    tokens = []
+    i = 0
+    while i < len(infix):
+        c = infix[i]
+        if c == "{":
+            minimum, maximum, i = parse_repetition(infix, i)
+            tokens.append(repetition_text(minimum, maximum))
+            continue
+        if c == "[":
+            intervals, i = parse_class(infix, i)
+        elif c == "\\":
+            intervals, i = parse_escape(infix, i + 1)
+        elif c == ".":
+            intervals, i = WILDCARD, i + 1
+        else:
+            tokens.append(c)
+            i += 1
+            continue
+
+        if len(intervals) == 1 and intervals[0][0] == intervals[0][1]:
+            symbol = chr(intervals[0][0])
+            if is_operand(symbol) and symbol not in RESERVED_SYMBOLS:
+                tokens.append(symbol)
+                continue
+        tokens.append(class_text(intervals))
+    return tokens
+
+
+# Función que recorre los símbolos de una expresión ya canónica (infix o postfix)
+def iter_tokens(expression):
+    if "[" not in expression and "{" not in expression:
+        return iter(expression)
+    return class_tokens(expression)
+
+
+def class_tokens(expression):
+    i = 0
+    while i < len(expression):
+        if expression[i] == "[":
+            _, end = parse_class(expression, i)
+            yield expression[i:end]
+            i = end
+        elif expression[i] == "{":
+            end = expression.index("}", i) + 1
+            yield expression[i:end]
+            i = end
+        else:
+            yield expression[i]
+            i += 1
+
+
+# Función que indica si un símbolo es una clase (texto canónico entre corchetes)
+def is_class(token):
+    return len(token) > 1 and token[0] == "["
+
+
+# Función que devuelve los intervalos de puntos de código de un símbolo o una clase
+@functools.lru_cache(maxsize=4096)
+def symbol_set(token):
+    if len(token) == 1:
+        code = ord(token)
+        return ((code, code),)
+    return parse_class(token, 0)[0]
+
+
+# Función que indica si el carácter `symbol` pertenece a la etiqueta `label`
+def label_contains(label, symbol):
+    if len(label) == 1:
+        return label == symbol
+    intervals = symbol_set(label)
+    code = ord(symbol)
+    index = bisect_right(intervals, (code, MAX_CODE_POINT)) - 1
+    return index >= 0 and intervals[index][1] >= code
+
+
+# Función que da el identificador de una clase del alfabeto
+def class_key(intervals):
+    if len(intervals) == 1 and intervals[0][0] == intervals[0][1]:
+        symbol = chr(intervals[0][0])
+        if symbol not in RESERVED_SYMBOLS:
+            return symbol
+    return class_text(intervals)
+
+
+# Función que reparte el alfabeto de las etiquetas en clases disjuntas
+def alphabet_classes(labels):
+    """
+    Devuelve un diccionario etiqueta -> tupla de claves de las clases que cubre.
+
+    Los extremos de todos los intervalos cortan los puntos de código en intervalos
+    elementales; los elementales cubiertos por el mismo conjunto de etiquetas forman
+    una clase. Los caracteres que ninguna etiqueta acepta no tienen clase (rechazo).
+    Si todas las etiquetas son caracteres sueltos cada una es su propia clase.
+    """
+    labels = set(labels)
+    if not any(len(label) > 1 for label in labels):
+        return {label: (label,) for label in labels}
+
+    label_sets = {label: symbol_set(label) for label in labels}
+    bounds = sorted(
+        {
+            bound
+            for intervals in label_sets.values()
+            for lo, hi in intervals
+            for bound in (lo, hi + 1)
+        }
+    )
+
+    # Etiquetas que cubren cada intervalo elemental [bounds[k], bounds[k + 1] - 1]
+    covering = [[] for _ in bounds]
+    for label, intervals in label_sets.items():
+        for lo, hi in intervals:
+            for k in range(bisect_left(bounds, lo), bisect_left(bounds, hi + 1)):
+                covering[k].append(label)
+
+    groups = {}
+    for k in range(len(bounds) - 1):
+        if covering[k]:
+            groups.setdefault(frozenset(covering[k]), []).append(
+                (bounds[k], bounds[k + 1] - 1)
+            )
+
+    classes = {label: [] for label in labels}
+    for members, intervals in groups.items():
+        key = class_key(normalize_intervals(intervals))
+        for label in members:
+            classes[label].append(key)
+    return {label: tuple(keys) for label, keys in classes.items()}
+
+
+# Función que arma la tabla de búsqueda de las clases de más de un carácter
+def class_ranges(mapping):
+    """
+    `mapping` es clave de clase -> valor (una columna, por ejemplo). Devuelve las
+    tuplas (inicios, finales, valores) de los intervalos de las claves de más de un
+    carácter ordenados por inicio, o None si no hay ninguna.
+    """
+    entries = sorted(
+        (lo, hi, value)
+        for key, value in mapping.items()
+        if len(key) > 1
+        for lo, hi in symbol_set(key)
+    )
+    if not entries:
+        return None
+    starts, ends, values = zip(*entries)
+    return starts, ends, values
+
+
+# Función que busca el valor de la clase a la que pertenece un carácter
+def range_lookup(ranges, symbol):
+    starts, ends, values = ranges
+    code = ord(symbol)
+    index = bisect_right(starts, code) - 1
+    if index >= 0 and ends[index] >= code:
+        return values[index]
+    return None
+
+
+# Función que crea el clasificador carácter -> clave de clase de un conjunto de claves
+def symbol_classifier(keys):
+    """Devuelve None si todas las claves son caracteres sueltos (no hace falta)."""
+    keys = list(keys)
+    ranges = class_ranges({key: key for key in keys})
+    if ranges is None:
+        return None
+    singles = {key: key for key in keys if len(key) == 1}
+
+    def classify(symbol):
+        key = singles.get(symbol)
+        if key is None:
+            key = range_lookup(ranges, symbol)
+        return key
+
+    return classify
+
+
+# Función que lista los caracteres de una clase con punto de código menor que `limit`
+def class_symbols(key, limit):
+    return [
+        chr(code)
+        for lo, hi in symbol_set(key)
+        if lo < limit
+        for code in range(lo, min(hi, limit - 1) + 1)
+    ]
@@ -1,77 +1,216 @@
-from regexpToAFN import toAFN
+from regexpToAFN import newAFN, toAFN
 from pprint import pp
+import os
+import sys
+
+# La instrumentación compartida está en Primera_parte
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Primera_parte")
+)
+from instrumentAFD import count, stage
+from symbolsAFD import alphabet_classes, is_class
 
 type AFDState = frozenset[int]
 type AFDTransitions = dict[AFDState, dict[str, AFDState]]
 
 
+@stage("subsets.fromAFNToAFD")
 def fromAFNToAFD(afn):
+    afn = splitClassLabels(afn)
     afdTransitions: AFDTransitions = {}
-    closure, inputs = findClosure(afn, 0, set(()))
-    travelAFN(afn, frozenset(closure), frozenset(inputs), afdTransitions)
+    closureOf = computeClosures(afn)
+    travelAFN(afn, closureOf(0), afdTransitions, closureOf)
 
     accepted = []
     for state in afdTransitions:
         if afn["accepted"] in state:
             accepted.append(state)
 
+    count("afd_states", len(afdTransitions))
+    count("afd_transitions", sum(map(len, afdTransitions.values())))
     return newAFD(afdTransitions, accepted)
 
 
+def splitClassLabels(afn: dict) -> dict:
+    """
+    Reemplaza las etiquetas que son clases ([a-z], [^\\n]) por las clases disjuntas
+    del alfabeto que cubren (symbolsAFD.alphabet_classes), así dos transiciones con
+    símbolos distintos nunca comparten caracteres y la construcción de subconjuntos
+    trabaja sobre una columna por clase. Si el AFN no tiene clases se devuelve tal cual.
+    """
+    labels = {
+        label
+        for transitions in afn["transitions"]
+        for label in transitions
+        if label != "_"
+    }
+    if not any(is_class(label) for label in labels):
+        return afn
+
+    classes = alphabet_classes(labels)
+    transitions = []
+    for stateTransitions in afn["transitions"]:
+        split = {}
+        for label, targets in stateTransitions.items():
+            for symbol in classes.get(label, (label,)):
+                split.setdefault(symbol, []).extend(targets)
+        transitions.append(split)
+    return newAFN(transitions, afn["accepted"])
+
+
 def travelAFN(
     afn: dict,
     closure: frozenset,
-    inputs: frozenset,
     stateTransitions: AFDTransitions,
+    closureOf,
 ):
-    if closure in stateTransitions:
-        return
+    """
+    Recorre los estados del AFD alcanzables desde `closure` con una lista de trabajo
+    explícita, para no depender del límite de recursión de Python.
+
+    Los cierres epsilon de los destinos se piden a `closureOf` (computeClosures),
+    que calcula cada uno una sola vez. Cada estado del AFD recorre una sola vez las
+    transiciones de sus estados del AFN y las agrupa por símbolo.
+    """
 
-    stateTransitions[closure] = {}
+    transitions = afn["transitions"]
+    pending = [closure]
 
-    for i in inputs:
-        if i == "_":
+    while pending:
+        closure = pending.pop()
+        if closure in stateTransitions:
             continue
-        reach = set(())
-        reachInputs = set(())
+
+        targets = {}
         for stateIdx in closure:
-            state = afn["transitions"][stateIdx]
-            if i not in state:
-                continue
-            for targetIdx in state[i]:
-                target, targetInput = findClosure(afn, targetIdx, set(()))
-                reach |= target
-                reachInputs |= targetInput
+            for symbol, symbolTargets in transitions[stateIdx].items():
+                if symbol != "_":
+                    targets.setdefault(symbol, set()).update(symbolTargets)
 
-        reach = frozenset(reach)
-        stateTransitions[closure][i] = reach
-        travelAFN(afn, reach, frozenset(reachInputs), stateTransitions)
+        stateTransitions[closure] = {}
+        for symbol, symbolTargets in targets.items():
+            reach = set()
+            for targetIdx in symbolTargets:
+                reach |= closureOf(targetIdx)
 
+            reach = frozenset(reach)
+            stateTransitions[closure][symbol] = reach
+            if reach not in stateTransitions:
+                pending.append(reach)
 
-def findClosure(afn: dict, stateIdx: int, alreadyEvaluated: set) -> tuple[set, set]:
-    """
-    Encuentra el cierre de un estado en el AFN.
 
-    Retorna un conjunto de todos los estados dentro del cierre y el conjunto de entradas válidas para ese cierre.
+@stage("subsets.computeClosures")
+def computeClosures(afn: dict):
     """
+    Prepara el cálculo de los cierres epsilon del AFN y devuelve la función
+    closureOf(estado) -> cierre (frozenset de estados).
+
+    Se condensan una sola vez las componentes fuertemente conexas del grafo de
+    transiciones epsilon (algoritmo de Tarjan con pila explícita), en tiempo lineal.
+    Los cierres no se materializan para todos los estados: closureOf calcula el de
+    la componente del estado la primera vez que se pide (el estado inicial y los
+    destinos de transiciones con símbolo) y lo guarda. Para calcularlo recorre el
+    grafo de componentes y, si llega a una componente que ya tiene su cierre, lo une
+    sin volver a recorrer sus sucesoras. Así una unión w1+w2+...+wn, cuya cadena de
+    estados epsilon daría n cierres anidados, cuesta O(n) y no O(n²).
+    """
+
+    transitions = afn["transitions"]
+    n = len(transitions)
+    component = [-1] * n  # Estado -> componente
+    members: list[list[int]] = []  # Componente -> estados
+    successors: list[list[int]] = []  # Componente -> componentes sucesoras
 
-    if stateIdx in alreadyEvaluated:
-        return (set(), set())  # Cambiado de listas vacías a conjuntos vacíos
+    index = [-1] * n
+    low = [0] * n
+    onStack = [False] * n
+    stack = []
+    counter = 0
 
-    alreadyEvaluated.add(stateIdx)
+    for root in range(n):
+        if index[root] != -1:
+            continue
 
-    original = afn["transitions"][stateIdx]
-    closure = set([stateIdx])  # Usamos un conjunto para el cierre
-    inputs = set(original.keys())  # Usamos un conjunto para las entradas
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        onStack[root] = True
+        work = [(root, 0)]  # (estado, siguiente transición epsilon por revisar)
+
+        while work:
+            stateIdx, edge = work[-1]
+            targets = transitions[stateIdx].get("_", ())
+
+            if edge < len(targets):
+                work[-1] = (stateIdx, edge + 1)
+                target = targets[edge]
+                if index[target] == -1:
+                    index[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    onStack[target] = True
+                    work.append((target, 0))
+                elif onStack[target]:
+                    low[stateIdx] = min(low[stateIdx], index[target])
+                continue
 
-    if "_" in original:
-        for state in original["_"]:
-            foundClosure, foundInputs = findClosure(afn, state, alreadyEvaluated)
-            closure |= set(foundClosure)  # Convertimos a conjunto si es necesario
-            inputs |= set(foundInputs)
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[stateIdx])
 
-    return (closure, inputs)
+            if low[stateIdx] != index[stateIdx]:
+                continue
 
+            # stateIdx es la raíz de una componente: sacarla de la pila. Las
+            # componentes salen en orden topológico inverso, así que sus sucesoras
+            # ya están numeradas
+            componentIdx = len(members)
+            componentMembers = []
+            while True:
+                member = stack.pop()
+                onStack[member] = False
+                component[member] = componentIdx
+                componentMembers.append(member)
+                if member == stateIdx:
+                    break
+
+            componentSuccessors = set()
+            for member in componentMembers:
+                for target in transitions[member].get("_", ()):
+                    componentSuccessors.add(component[target])
+            componentSuccessors.discard(componentIdx)
+            members.append(componentMembers)
+            successors.append(list(componentSuccessors))
+
+    closures: dict[int, frozenset] = {}  # Componente -> cierre
+
+    def closureOf(stateIdx: int) -> frozenset:
+        start = component[stateIdx]
+        if start in closures:
+            return closures[start]
+
+        closure = set()
+        seen = {start}
+        pending = [start]
+        while pending:
+            componentIdx = pending.pop()
+            if componentIdx in closures and componentIdx != start:
+                # Cierre ya calculado: se une sin recorrer sus sucesoras
+                closure |= closures[componentIdx]
+                continue
+            closure.update(members[componentIdx])
+            for successor in successors[componentIdx]:
+                if successor not in seen:
+                    seen.add(successor)
+                    pending.append(successor)
+
+        closures[start] = frozenset(closure)
+        # Cada componente fuertemente conexa se cierra a lo sumo una vez
+        count("epsilon_closures")
+        return closures[start]
+
+    return closureOf
 
 
 def initializeOrAppend():
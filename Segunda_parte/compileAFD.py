@@ -0,0 +1,37 @@
+import os
+import sys
+
+from AFNToAFD import fromAFNToAFD
+from minimizeAFD import minimize_afd
+from regexpToAFN import toAFN
+from shunYard import toPostFix
+
+# La tabla compilada y los simuladores que la recorren están en Primera_parte
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Primera_parte")
+)
+from regexpToAFD import compile_afd
+
+
+def compileAFD(afd: dict) -> dict:
+    """
+    Compila un AFD de Segunda_parte ({"transitions": {estado: {símbolo: estado}},
+    "accepted": [...]}) a la tabla de transiciones densa de compile_afd.
+
+    El estado inicial es el primero de las transiciones, igual que en simulate.py.
+    """
+    states = list(afd["transitions"].keys())
+    transitions = {
+        (state, symbol): nextState
+        for state, stateTransitions in afd["transitions"].items()
+        for symbol, nextState in stateTransitions.items()
+    }
+    return compile_afd(states, transitions, afd["accepted"], states[0])
+
+
+def compileRegex(infix: str) -> dict:
+    """
+    Compila una expresión regular (Thompson, subconjuntos y minimización) hasta la
+    tabla de transiciones densa.
+    """
+    return compileAFD(minimize_afd(fromAFNToAFD(toAFN(toPostFix(infix)))))
@@ -0,0 +1,56 @@
+import os
+import sys
+
+from AFNToAFD import computeClosures, splitClassLabels
+from regexpToAFN import toAFN
+from shunYard import toPostFix
+
+# El motor perezoso con caché acotada se comparte con la construcción directa
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Primera_parte")
+)
+from lazyAFD import DEFAULT_MAX_MEMORY, LazyAFD
+from symbolsAFD import symbol_classifier
+
+
+def lazyAFDFromAFN(afn: dict, maxMemory: int = DEFAULT_MAX_MEMORY) -> LazyAFD:
+    """
+    Crea un AFD perezoso sobre el AFN de Thompson.
+
+    Cada estado del AFD es el conjunto (cerrado bajo epsilon) de estados del AFN; se
+    calcula durante la simulación solo cuando la entrada llega a él, en lugar de hacer
+    toda la construcción de subconjuntos con fromAFNToAFD. Los cierres epsilon se
+    piden a computeClosures, que calcula cada uno una sola vez. Si el AFN tiene
+    clases, cada carácter se traduce a su clase del alfabeto antes de avanzar.
+    """
+
+    afn = splitClassLabels(afn)
+    closureOf = computeClosures(afn)
+    classify = symbol_classifier(
+        {symbol for transitions in afn["transitions"] for symbol in transitions} - {"_"}
+    )
+
+    def step(state: frozenset, symbol: str) -> frozenset:
+        if classify is not None:
+            symbol = classify(symbol)
+        if symbol is None or symbol == "_":
+            return frozenset()
+        reach = set()
+        for stateIdx in state:
+            for targetIdx in afn["transitions"][stateIdx].get(symbol, ()):
+                reach |= closureOf(targetIdx)
+        return frozenset(reach)
+
+    def isAccepting(state: frozenset) -> bool:
+        return afn["accepted"] in state
+
+    return LazyAFD(closureOf(0), step, isAccepting, maxMemory)
+
+
+def lazyAFDFromRegex(infix: str, maxMemory: int = DEFAULT_MAX_MEMORY) -> LazyAFD:
+    return lazyAFDFromAFN(toAFN(toPostFix(infix)), maxMemory)
+
+
+if __name__ == "__main__":
+    lazyAFD = lazyAFDFromRegex("(a+b)*a" + "(a+b)" * 20)
+    print(lazyAFD.fullmatch("ab" * 1000 + "a" + "b" * 20), lazyAFD.stats())
@@ -1,38 +1,105 @@
-import string
+import os
+import sys
 
+# La instrumentación compartida está en Primera_parte
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Primera_parte")
+)
+from instrumentAFD import count, stage
 
+
+@stage("subsets.minimize_afd")
 def minimize_afd(afd):
-    accepted_states = set(afd["accepted"])
-    non_accepted_states = set(afd["transitions"].keys()) - accepted_states
+    """
+    Minimiza el AFD refinando particiones hasta un punto fijo (algoritmo de Hopcroft).
+
+    Se mantiene un mapa estado -> bloque y un índice inverso de transiciones
+    (símbolo -> destino -> predecesores), de modo que cada división solo revisa
+    los predecesores del bloque separador. Los bloques resultantes se nombran
+    con enteros; el bloque del estado inicial (el primero de las transiciones)
+    es el 0.
+    """
+    states = list(afd["transitions"].keys())
+    index = {state: i for i, state in enumerate(states)}
+    n = len(states)
+
+    # Índice inverso: símbolo -> destino -> lista de predecesores
+    inverse = {}
+    for state, transitions in afd["transitions"].items():
+        for input_char, next_state in transitions.items():
+            predecessors = inverse.setdefault(input_char, {})
+            predecessors.setdefault(index[next_state], []).append(index[state])
+
+    # Partición inicial: aceptados y no aceptados
+    accepted_states = {index[state] for state in afd["accepted"] if state in index}
+    non_accepted_states = set(range(n)) - accepted_states
+    blocks = [set(group) for group in (accepted_states, non_accepted_states) if group]
+    block_of = [0] * n
+    for block, group in enumerate(blocks):
+        for state in group:
+            block_of[state] = block
+
+    # El AFD es parcial (no hay estado sumidero), así que ambos bloques iniciales
+    # entran a la lista de trabajo
+    pending = list(range(len(blocks)))
+    in_pending = [True] * len(blocks)
+    splits = 0
+
+    while pending:
+        splitter = pending.pop()
+        in_pending[splitter] = False
+        splitter_states = list(blocks[splitter])
 
-    grouped = {}
+        for predecessors in inverse.values():
+            # Agrupar por bloque los estados que entran al separador con este símbolo
+            touched = {}
+            for target in splitter_states:
+                for state in predecessors.get(target, ()):
+                    touched.setdefault(block_of[state], []).append(state)
 
+            for block, moved in touched.items():
+                if len(moved) == len(blocks[block]):
+                    continue
+
+                # Separar los estados tocados en un bloque nuevo
+                splits += 1
+                new_block = len(blocks)
+                new_group = set(moved)
+                blocks[block] -= new_group
+                blocks.append(new_group)
+                in_pending.append(False)
+                for state in moved:
+                    block_of[state] = new_block
+
+                if in_pending[block]:
+                    pending.append(new_block)
+                    in_pending[new_block] = True
+                else:
+                    smaller = (
+                        new_block if len(new_group) <= len(blocks[block]) else block
+                    )
+                    pending.append(smaller)
+                    in_pending[smaller] = True
+
+    # Renumerar los bloques en orden de aparición (el inicial queda como 0)
+    block_ids = {}
+    for state in range(n):
+        block_ids.setdefault(block_of[state], len(block_ids))
+
+    minimized_transitions = {block: {} for block in range(len(block_ids))}
     for state, transitions in afd["transitions"].items():
-        is_accepted = state in accepted_states
-        key = (frozenset(transitions.items()), is_accepted)
-        grouped.setdefault(key, []).append(state)
-
-    minimized_transitions = {}
-    minimized_accepted = set()
-    state_mapping = {}
-
-    # Asignar nombres de letra a los grupos
-    for i, group in enumerate(grouped.values()):
-        letter = string.ascii_uppercase[i]  # A, B, C, ...
-        state_mapping[frozenset(group)] = letter
-        minimized_transitions[letter] = {}
-        if any(state in accepted_states for state in group):
-            minimized_accepted.add(letter)
-
-    # Reasignar transiciones con los nuevos nombres
-    for group, letter in state_mapping.items():
-        sample_state = next(
-            iter(group)
-        )  # Tomar un estado de muestra para las transiciones
-        for input_char, next_state in afd["transitions"][sample_state].items():
-            for next_group, next_letter in state_mapping.items():
-                if next_state in next_group:
-                    minimized_transitions[letter][input_char] = next_letter
-                    break
-
-    return {"transitions": minimized_transitions, "accepted": list(minimized_accepted)}
+        block = block_ids[block_of[index[state]]]
+        for input_char, next_state in transitions.items():
+            minimized_transitions[block][input_char] = block_ids[
+                block_of[index[next_state]]
+            ]
+
+    minimized_accepted = {block_ids[block_of[state]] for state in accepted_states}
+
+    count("partition_splits", splits)
+    count("minimized_states", len(minimized_transitions))
+
+    return {
+        "transitions": minimized_transitions,
+        "accepted": sorted(minimized_accepted),
+    }
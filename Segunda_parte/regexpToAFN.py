@@ -1,87 +1,187 @@
+import os
+import sys
+
+# La instrumentación compartida está en Primera_parte
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Primera_parte")
+)
+from instrumentAFD import count, stage
+from symbolsAFD import is_repetition, iter_tokens, repetition_bounds, repetition_text
+
 type AFNTransitions = list[dict[str, list[AFNState]]]
 type AFNState = int
 
 
-def toAFN(postfix: str):
-    stack = []
-    for char in postfix:
-        match char:
-            case ".":  # Concatenate
-                afn2 = stack.pop()
-                afn1 = stack.pop()
-
-                afn1OriginalLength = len(afn1["transitions"])
-                newAccepted = afn2["accepted"] + afn1OriginalLength
+# Salida sin destino y fin de una lista de salidas pendientes (los enlaces de la
+# lista se guardan como -(siguiente + 2), siempre menores que -1)
+NO_SLOT = -1
 
-                # Add epsilon transition to start of AFN2
-                afn1Accepted = afn1["accepted"]
-                initializeOrAppend(
-                    afn1["transitions"][afn1Accepted], "_", afn1OriginalLength
-                )
+# Cantidad máxima de estados que puede copiar una repetición {m,n}: el AFN de
+# Thompson desenrolla las copias y los subconjuntos y la minimización las recorren
+# todas, así que las cotas grandes se rechazan (la construcción directa de
+# Primera_parte las cuenta sin copiar)
+MAX_REPETITION_STATES = 4096
 
-                # Map AFN2 transitions to start at the end of AFN1
-                mappedAFN2Transitions = displaceTransitions(afn2, afn1OriginalLength)
-                afn1["transitions"] += mappedAFN2Transitions
 
-                # Set new accepted
-                afn1["accepted"] = newAccepted
-                stack.append(afn1)
+@stage("subsets.toAFN")
+def toAFN(postfix: str):
+    """
+    Construye el AFN de Thompson sobre un arreglo compartido de estados.
+
+    Cada estado tiene una etiqueta (un símbolo o "_") y dos salidas en el arreglo
+    plano `out` (posiciones 2·estado y 2·estado + 1). Un fragmento es (inicio,
+    primera salida pendiente, última salida pendiente): las salidas que todavía no
+    tienen destino forman una lista enlazada guardada en esas mismas posiciones
+    (como -(siguiente + 2)), así que unir dos listas cuesta O(1) y cada salida se
+    completa una sola vez. Los estados nunca se renumeran, y sin repeticiones {m,n}
+    la construcción es lineal en la longitud del postfix.
+
+    Los estados de un fragmento ocupan un tramo contiguo del arreglo (desde `low`),
+    porque el postfix construye cada subexpresión de una sola vez. Una repetición
+    {m,n} copia ese tramo n veces (m si no tiene máximo) desplazando sus salidas;
+    las copias opcionales se anidan, x(x(x)?)?, para que cada cierre epsilon siga
+    siendo de tamaño constante. Si las copias suman más de MAX_REPETITION_STATES
+    estados se lanza ValueError en lugar de desenrollarlas.
+    """
+    labels = []  # Estado -> símbolo ("_" = epsilon)
+    out = []  # Salida 2·estado y 2·estado + 1 (-1 = sin salida)
+    stack = []  # Fragmentos (primer estado, inicio, primera y última pendiente)
+
+    def newState(label, first, second):
+        labels.append(label)
+        out.append(first)
+        out.append(second)
+        return len(labels) - 1
+
+    def patch(slot, target):
+        # Completar todas las salidas de la lista con `target`
+        while slot != NO_SLOT:
+            link = out[slot]
+            out[slot] = target
+            slot = -link - 2
+
+    def join(first, last, otherFirst, otherLast):
+        # Unir dos listas de salidas pendientes
+        out[last] = -otherFirst - 2
+        return first, otherLast
+
+    def concatenate(fragment1, fragment2):
+        low1, start1, first1, _ = fragment1
+        _, start2, first2, last2 = fragment2
+        patch(first1, start2)
+        return (low1, start1, first2, last2)
+
+    def optional(fragment):
+        low, start, first, last = fragment
+        state = newState("_", start, NO_SLOT)
+        return (low, state, *join(first, last, 2 * state + 1, 2 * state + 1))
+
+    def loop(fragment, skip):
+        # Cerradura: del final se vuelve al inicio; con `skip` también se puede saltar
+        low, start, first, _ = fragment
+        state = newState("_", start, NO_SLOT)
+        patch(first, state)
+        return (low, state if skip else start, 2 * state + 1, 2 * state + 1)
+
+    def copy(fragment, end):
+        # Copiar los estados [low, end) del fragmento con sus salidas desplazadas
+        low, start, first, last = fragment
+        offset = len(labels) - low
+        for state in range(low, end):
+            targets = []
+            for target in out[2 * state : 2 * state + 2]:
+                if target >= 0:
+                    target += offset
+                elif target != NO_SLOT:
+                    target -= 2 * offset  # Enlace a otra salida pendiente
+                targets.append(target)
+            newState(labels[state], *targets)
+        return (low + offset, start + offset, first + 2 * offset, last + 2 * offset)
+
+    def repeat(fragment, minimum, maximum):
+        if maximum == 0:
+            state = newState("_", NO_SLOT, NO_SLOT)
+            return (fragment[0], state, 2 * state, 2 * state)
+
+        end = len(labels)
+        copies = maximum if maximum is not None else max(minimum, 1)
+        if copies * (end - fragment[0]) > MAX_REPETITION_STATES:
+            raise ValueError(
+                f"La repetición {repetition_text(minimum, maximum)} copiaría "
+                f"{copies} veces un fragmento de {end - fragment[0]} estados (más de "
+                f"{MAX_REPETITION_STATES}); usa la construcción directa de "
+                "Primera_parte, que cuenta las repeticiones sin copiarlas"
+            )
+        fragments = [fragment] + [copy(fragment, end) for _ in range(copies - 1)]
+        required, optionals = fragments[:minimum], fragments[minimum:]
+
+        tail = None
+        if maximum is None:
+            # La última copia se repite: x{m,} = x...x x+ (o x* si m es 0)
+            required[-1:] = [loop(fragments[-1], skip=not required)]
+        else:
+            for optionalFragment in reversed(optionals):
+                if tail is not None:
+                    optionalFragment = concatenate(optionalFragment, tail)
+                tail = optional(optionalFragment)
+
+        result = tail
+        for requiredFragment in reversed(required):
+            if result is not None:
+                requiredFragment = concatenate(requiredFragment, result)
+            result = requiredFragment
+        return result
+
+    # Una clase ([a-z], [^\n]) es un solo símbolo y etiqueta un solo estado
+    for char in iter_tokens(postfix):
+        match char:
+            case ".":  # Concatenate
+                fragment2 = stack.pop()
+                stack.append(concatenate(stack.pop(), fragment2))
 
             case "+":  # Logical OR
-                afn2 = stack.pop()
-                afn1 = stack.pop()
-
-                lenAfn1 = len(afn1["transitions"])
-                afn = newAFN([{"_": [2, 2 + lenAfn1]}, {}], 1)
-                afnLength = len(afn["transitions"])
-                mappedAFN1Transitions = displaceTransitions(afn1, afnLength)
-
-                afn1Accepted = afn1["accepted"]
-                initializeOrAppend(mappedAFN1Transitions[afn1Accepted], "_", 1)
-
-                afnLength += lenAfn1
-                mappedAFN2Transitions = displaceTransitions(afn2, afnLength)
-
-                afn2Accepted = afn2["accepted"]
-                initializeOrAppend(mappedAFN2Transitions[afn2Accepted], "_", 1)
-
-                mappedAFN1Transitions += mappedAFN2Transitions
-                afn["transitions"] += mappedAFN1Transitions
-                stack.append(afn)
+                _, start2, first2, last2 = stack.pop()
+                low1, start1, first1, last1 = stack.pop()
+                state = newState("_", start1, start2)
+                stack.append((low1, state, *join(first1, last1, first2, last2)))
 
             case "*":  # 0 or more
-                received = stack.pop()
-
-                afn = newAFN([{"_": [1, 2]}, {}], 1)
-                afnLength = len(afn["transitions"])
-                mappedReceivedTransitions = displaceTransitions(received, afnLength)
+                stack.append(loop(stack.pop(), skip=True))
 
-                receivedAccepted = received["accepted"]
-                initializeOrAppend(mappedReceivedTransitions[receivedAccepted], "_", 1)
-                mappedReceivedTransitions[receivedAccepted]["_"].append(2)
+            case "?":  # 0 or 1
+                stack.append(optional(stack.pop()))
 
-                afn["transitions"] += mappedReceivedTransitions
-                stack.append(afn)
+            case _ if is_repetition(char):  # {m,n}
+                stack.append(repeat(stack.pop(), *repetition_bounds(char)))
 
             case _:
-                stack.append(newAFN([{char: [1]}, {}], 1))
-    return stack.pop()
-
-
-def initializeOrAppend(dictionary: dict, key: str, append):
-    if key not in dictionary:
-        dictionary[key] = []
-    dictionary[key].append(append)
-
-
-def displaceTransitions(afn, delta: int):
-    return [
-        {
-            word: [d + delta for d in destinations]
-            for (word, destinations) in transition.items()
-        }
-        for transition in afn["transitions"]
-    ]
+                state = newState(char, NO_SLOT, NO_SLOT)
+                stack.append((state, state, 2 * state, 2 * state))
+
+    _, start, first, _ = stack.pop()
+    accepted = newState(None, NO_SLOT, NO_SLOT)
+    patch(first, accepted)
+
+    # El estado inicial debe ser el 0: se intercambia con el que ocupa esa posición
+    order = list(range(len(labels)))
+    order[0], order[start] = order[start], order[0]
+    newIds = [0] * len(labels)
+    for newId, state in enumerate(order):
+        newIds[state] = newId
+
+    transitions: AFNTransitions = []
+    for state in order:
+        targets = [
+            newIds[target]
+            for target in (out[2 * state], out[2 * state + 1])
+            if target >= 0
+        ]
+        label = labels[state]
+        transitions.append({label: targets} if targets else {})
+
+    afn = newAFN(transitions, newIds[accepted])
+    count("afn_states", len(afn["transitions"]))
+    return afn
 
 
 def newAFN(transitions: AFNTransitions, accepted: AFNState):
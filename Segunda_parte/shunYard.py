@@ -1,5 +1,15 @@
+import os
+import sys
+
+# La instrumentación compartida está en Primera_parte
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Primera_parte")
+)
+from instrumentAFD import stage
+from symbolsAFD import infix_tokens, is_class, is_repetition, iter_tokens
+
 # Prioridades de los operadores (más alto número, mayor prioridad)
-precedence = {'+': 1, '.': 2, '*': 3}
+precedence = {'+': 1, '.': 2, '*': 3, '?': 3}
 
 # Función para verificar si un carácter es un operador
 def is_operator(c: str) -> bool:
@@ -12,12 +22,23 @@ def is_operand(c: str) -> bool:
     # que en este caso representa el símbolo epsilon (vacío)
     return c.isalnum() or c == '_'
 
+# Función para verificar si un símbolo (carácter o clase canónica como [a-z]) es un operando
+def is_symbol_operand(token: str) -> bool:
+    return is_operand(token) or is_class(token)
+
+# Función para verificar si un símbolo es un operador unario ('*', '?' o una repetición {m,n})
+def is_unary_operator(token: str) -> bool:
+    # '+' es la unión en este módulo; "una o más veces" se escribe {1,}
+    return token == '*' or token == '?' or is_repetition(token)
+
 # Función para insertar puntos de concatenación '.' en la expresión infix
 def insert_concatenation_operators(infix: str) -> str:
+    # Las clases, escapes y '.' se convierten en un solo símbolo canónico
+    infix = infix_tokens(infix, is_operand)
     result = []  # Lista donde se almacenará la nueva expresión con los puntos
-    length = len(infix)  # Longitud de la expresión infix
+    length = len(infix)  # Cantidad de símbolos de la expresión infix
     
-    # Iteramos sobre cada carácter de la expresión
+    # Iteramos sobre cada símbolo de la expresión
     for i in range(length):
         result.append(infix[i])  # Añadimos el carácter actual a la lista resultado
         
@@ -26,16 +47,17 @@ def insert_concatenation_operators(infix: str) -> str:
             # Insertar un '.' si:
             # 1. El carácter actual es un operando y el siguiente es un operando o un paréntesis abierto
             # 2. El carácter actual es un paréntesis cerrado y el siguiente es un operando o un paréntesis abierto
-            # 3. El carácter actual es '*' y el siguiente es un operando o un paréntesis abierto
-            if (is_operand(infix[i]) and (is_operand(infix[i+1]) or infix[i+1] == '(')) or \
-               (infix[i] == ')' and (is_operand(infix[i+1]) or infix[i+1] == '(')) or \
-               (infix[i] == '*' and (is_operand(infix[i+1]) or infix[i+1] == '(')):
+            # 3. El carácter actual es '*', '?' o {m,n} y el siguiente es un operando o un paréntesis abierto
+            if (is_symbol_operand(infix[i]) and (is_symbol_operand(infix[i+1]) or infix[i+1] == '(')) or \
+               (infix[i] == ')' and (is_symbol_operand(infix[i+1]) or infix[i+1] == '(')) or \
+               (is_unary_operator(infix[i]) and (is_symbol_operand(infix[i+1]) or infix[i+1] == '(')):
                 result.append('.')  # Insertar el punto de concatenación
 
     # Devolver la expresión con los puntos de concatenación como cadena
     return ''.join(result)
 
 # Función principal para convertir una expresión infix a postfix
+@stage("subsets.toPostFix")
 def toPostFix(infixExpression: str) -> str:
     # Primero, inserta los puntos de concatenación explícitos
     infixExpression = insert_concatenation_operators(infixExpression)
@@ -43,12 +65,11 @@ def toPostFix(infixExpression: str) -> str:
     output = []  # Lista para almacenar el resultado en notación postfix
     operators = []  # Pila para almacenar los operadores
 
-    i = 0
-    # Recorremos la expresión infix carácter por carácter
-    while i < len(infixExpression):
-        c = infixExpression[i]
-
-        if is_operand(c):  # Si es un operando, lo añadimos directamente al resultado
+    # Recorremos la expresión infix símbolo por símbolo (una clase es un solo símbolo)
+    for c in iter_tokens(infixExpression):
+        if is_symbol_operand(c):  # Si es un operando, lo añadimos directamente al resultado
+            output.append(c)
+        elif is_unary_operator(c):  # Los operadores unarios se aplican al operando anterior
             output.append(c)
         elif c == '(':  # Si es un paréntesis abierto, lo apilamos
             operators.append(c)
@@ -63,7 +84,6 @@ def toPostFix(infixExpression: str) -> str:
                 output.append(operators.pop())
             # Finalmente, apilamos el operador actual
             operators.append(c)
-        i += 1
 
     # Desapilar cualquier operador restante en la pila
     while operators:
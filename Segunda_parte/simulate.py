@@ -1,36 +1,71 @@
 import os
+import sys
 import time
 import json
 from shunYard import toPostFix
 from regexpToAFN import toAFN
 from AFNToAFD import fromAFNToAFD
 from minimizeAFD import minimize_afd
+from simulateAFN import simulateAFN
 import graphviz
 from colorama import Fore, Style, init
 
+# El guardado de grafos (DOT y dibujo en segundo plano) está en Primera_parte
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Primera_parte")
+)
+from renderAFD import save_graph
+from symbolsAFD import symbol_classifier
+
 init(autoreset=True)  # Para que los colores se reinicien automáticamente
 
+# Carpeta donde se guardan los grafos y el JSON de cada expresión
+GRAPHS_FOLDER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "automaton_graphs"
+)
+
 
 def sanitize_folder_name(name):
     return "".join(c if c.isalnum() else "_" for c in name)
 
 
-def generate_graph(automaton, name, folder):
+def graphs_folder(infix_expression):
+    return os.path.join(GRAPHS_FOLDER, sanitize_folder_name(infix_expression))
+
+
+def state_label(state):
+    # Los estados del AFD son conjuntos del AFN; los del AFD minimizado son enteros
+    if isinstance(state, frozenset):
+        return ",".join(map(str, state))
+    return str(state)
+
+
+def state_to_json(state):
+    if isinstance(state, frozenset):
+        return list(state)
+    return state
+
+
+def automaton_graph(automaton, name):
     dot = graphviz.Digraph(comment=name)
 
     if isinstance(automaton["transitions"], list):  # Para AFN (lista de transiciones)
         for state_idx, transitions in enumerate(automaton["transitions"]):
-            state_label = str(state_idx)
             for input_char, next_states in transitions.items():
                 for next_state in next_states:
-                    next_state_label = str(next_state)
-                    dot.edge(state_label, next_state_label, label=input_char)
+                    dot.edge(
+                        str(state_idx),
+                        str(next_state),
+                        label=graphviz.escape(input_char),
+                    )
     else:  # Para AFD o AFD minimizado (diccionario de transiciones)
         for state, transitions in automaton["transitions"].items():
-            state_label = ",".join(map(str, state))
             for input_char, next_state in transitions.items():
-                next_state_label = ",".join(map(str, next_state))
-                dot.edge(state_label, next_state_label, label=input_char)
+                dot.edge(
+                    state_label(state),
+                    state_label(next_state),
+                    label=graphviz.escape(input_char),
+                )
 
     accepted_states = (
         automaton["accepted"]
@@ -39,19 +74,33 @@ def generate_graph(automaton, name, folder):
     )
 
     for accepted_state in accepted_states:
-        accepted_label = (
-            ",".join(map(str, accepted_state))
-            if isinstance(accepted_state, frozenset)
-            else str(accepted_state)
-        )
-        dot.node(accepted_label, shape="doublecircle")
+        dot.node(state_label(accepted_state), shape="doublecircle")
+
+    return dot
+
 
+# Guarda el grafo sin imprimir nada y devuelve (ruta del DOT, ruta de la imagen o None)
+def save_automaton_graph(automaton, name, folder, render=False):
+    # Solo el DOT por defecto; el PNG se dibuja en segundo plano si se pide
     output_path = os.path.join(folder, f"{name}.gv")
-    dot.render(output_path, format="png")
-    print(f"{Fore.GREEN}Generated {name} graph at {output_path}.png")
+    image_path = save_graph(
+        automaton_graph(automaton, name),
+        output_path,
+        len(automaton["transitions"]),
+        render,
+    )
+    return output_path, image_path
 
 
-def write_automaton_to_json(automaton, filename):
+def generate_graph(automaton, name, folder, render=False):
+    output_path, image_path = save_automaton_graph(automaton, name, folder, render)
+    if image_path:
+        print(f"{Fore.GREEN}Generating {name} graph at {image_path}")
+    else:
+        print(f"{Fore.GREEN}Generated {name} graph at {output_path}")
+
+
+def automaton_to_json(automaton):
     if isinstance(automaton["transitions"], list):
         estados = list(range(len(automaton["transitions"])))
         transiciones = set()
@@ -82,29 +131,44 @@ def write_automaton_to_json(automaton, filename):
         for origen, transitions in automaton["transitions"].items():
             for simbolo, destino in transitions.items():
                 simbolos.add(simbolo)
-                transiciones.add((tuple(origen), simbolo, tuple(destino)))
+                transiciones.add((origen, simbolo, destino))
 
         automaton_data = {
-            "ESTADOS": [list(state) for state in estados],
+            "ESTADOS": [state_to_json(state) for state in estados],
             "SIMBOLOS": list(simbolos),
-            "INICIO": [list(next(iter(estados)))],
-            "ACEPTACION": [list(state) for state in automaton["accepted"]],
+            "INICIO": [state_to_json(next(iter(estados)))],
+            "ACEPTACION": [state_to_json(state) for state in automaton["accepted"]],
             "TRANSICIONES": [
-                (list(origen), simbolo, list(destino))
+                (state_to_json(origen), simbolo, state_to_json(destino))
                 for (origen, simbolo, destino) in transiciones
             ],
         }
 
+    return automaton_data
+
+
+# Escribe el JSON del autómata sin imprimir nada
+def save_automaton_json(automaton, filename):
     with open(filename, "w") as file:
-        json.dump(automaton_data, file, indent=4)
+        json.dump(automaton_to_json(automaton), file, indent=4)
 
+
+def write_automaton_to_json(automaton, filename):
+    save_automaton_json(automaton, filename)
     print(f"{Fore.YELLOW}Automaton written to {filename}")
 
 
-def simulate_regexp_process(infix_expression, test_string):
-    # Sanitizar nombre de la carpeta usando la expresión regular
-    sanitized_infix = sanitize_folder_name(infix_expression)
-    folder = f"./Segunda_parte/automaton_graphs/{sanitized_infix}"
+def simulate_regexp_process(infix_expression, test_string, engine="afd", render=False):
+    """
+    Convierte la expresión y simula la cadena de prueba.
+
+    Con engine="afd" se construye el AFD y el AFD minimizado antes de simular; con
+    engine="afn" la cadena se simula directamente sobre el AFN de Thompson, sin
+    determinizar. Los grafos se guardan como DOT; con render=True los PNG se dibujan
+    en segundo plano sin detener la simulación.
+    """
+    # Carpeta con el nombre sanitizado de la expresión regular
+    folder = graphs_folder(infix_expression)
 
     # Crear la carpeta específica para esta expresión si no existe
     os.makedirs(folder, exist_ok=True)
@@ -116,16 +180,27 @@ def simulate_regexp_process(infix_expression, test_string):
     # Paso 2: Convertir postfix a AFN
     afn = toAFN(postfix)
     print(f"AFN: {afn}")
-    generate_graph(afn, "AFN", folder)
+    generate_graph(afn, "AFN", folder, render)
     write_automaton_to_json(afn, os.path.join(folder, "afn.json"))
 
+    if engine == "afn":
+        start_time = time.time()
+        accepted = simulateAFN(afn, test_string)
+        elapsed_time = time.time() - start_time
+        if accepted:
+            print(f"String '{test_string}' is accepted.")
+        else:
+            print(f"String '{test_string}' is not accepted.")
+        print(f"Verification time: {elapsed_time} seconds")
+        return accepted
+
     # Paso 3: Convertir AFN a AFD
     afd = fromAFNToAFD(afn)
     print(f"AFD Transitions:")
     for state, transitions in afd["transitions"].items():
         print(f"State: {state} -> Transitions: {transitions}")
     print(f"AFD Accepted States: {afd['accepted']}")
-    generate_graph(afd, "AFD", folder)
+    generate_graph(afd, "AFD", folder, render)
     write_automaton_to_json(afd, os.path.join(folder, "afd.json"))
 
     # Paso 4: Minimizar AFD
@@ -134,7 +209,7 @@ def simulate_regexp_process(infix_expression, test_string):
     for state, transitions in minimized_afd["transitions"].items():
         print(f"State: {state} -> Transitions: {transitions}")
     print(f"Minimized AFD Accepted States: {minimized_afd['accepted']}")
-    generate_graph(minimized_afd, "Minimized_AFD", folder)
+    generate_graph(minimized_afd, "Minimized_AFD", folder, render)
     write_automaton_to_json(minimized_afd, os.path.join(folder, "minimized_afd.json"))
 
     # Paso 5: Simular la cadena de entrada
@@ -154,12 +229,22 @@ def simulate_regexp_process(infix_expression, test_string):
             )
         return
 
+    # Si el AFD tiene clases ([a-z], [^\n]), cada carácter se traduce a su clase
+    classify = symbol_classifier(
+        {
+            symbol
+            for transitions in minimized_afd["transitions"].values()
+            for symbol in transitions
+        }
+    )
+
     start_time = time.time()  # Comienza a medir el tiempo
 
     for char in test_string:
         print(f"Processing character: {char}")
-        if char in minimized_afd["transitions"][current_state]:
-            next_state = minimized_afd["transitions"][current_state][char]
+        symbol = classify(char) if classify is not None else char
+        if symbol in minimized_afd["transitions"][current_state]:
+            next_state = minimized_afd["transitions"][current_state][symbol]
             print(f"Transition from {current_state} to {next_state} on '{char}'")
             current_state = next_state
         else:
@@ -185,5 +270,6 @@ def simulate_regexp_process(infix_expression, test_string):
 if __name__ == "__main__":
     infix_expr = input("Ingrese la expresión regular en infix: ")
     test_str = input("Ingrese la cadena a probar: ")
+    engine = input("Motor de simulación (afd/afn) [afd]: ").strip().lower() or "afd"
 
-    simulate_regexp_process(infix_expr, test_str)
+    simulate_regexp_process(infix_expr, test_str, engine, render=True)
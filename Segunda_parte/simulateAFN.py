@@ -0,0 +1,119 @@
+import os
+import sys
+
+from AFNToAFD import splitClassLabels
+from regexpToAFN import toAFN
+from shunYard import toPostFix
+
+# Las clases de caracteres compartidas están en Primera_parte
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Primera_parte")
+)
+from symbolsAFD import symbol_classifier
+
+
+def prepareAFN(afn: dict) -> dict:
+    """
+    Prepara el AFN de Thompson para simularlo sin determinizarlo.
+
+    Separa las transiciones epsilon de las transiciones con símbolo en listas planas
+    indexadas por estado, para no consultar "_" en cada paso de la simulación. Si el
+    AFN tiene clases, sus etiquetas se parten en las clases disjuntas del alfabeto y
+    "classify" traduce cada carácter de la entrada a su clase.
+    """
+    afn = splitClassLabels(afn)
+    epsilon = []
+    moves = []
+    symbols = set()
+    for transitions in afn["transitions"]:
+        epsilon.append(transitions.get("_", []))
+        moves.append(
+            {
+                symbol: targets
+                for symbol, targets in transitions.items()
+                if symbol != "_"
+            }
+        )
+        symbols.update(moves[-1])
+
+    return {
+        "epsilon": epsilon,
+        "moves": moves,
+        "accepted": afn["accepted"],
+        "classify": symbol_classifier(symbols),
+    }
+
+
+def runAFN(prepared: dict, inputString: str) -> bool:
+    """
+    Simula el AFN manteniendo el conjunto de estados activos (algoritmo de Thompson).
+
+    En cada paso cada estado del AFN se visita a lo sumo una vez: un arreglo de sellos
+    guarda la generación (paso) en la que se agregó cada estado, así que no hace falta
+    crear conjuntos nuevos por paso. El tiempo es O(len(inputString) × tamaño del AFN).
+    Solo se guardan como activos los estados con transiciones de símbolo; la
+    aceptación se revisa con el sello del estado de aceptación.
+    """
+    epsilon = prepared["epsilon"]
+    moves = prepared["moves"]
+    accepted = prepared["accepted"]
+    classify = prepared.get("classify")
+
+    stamps = [0] * len(moves)
+    generation = 1
+    current = []
+    following = []
+    pending = []
+
+    # Cierre epsilon del estado inicial
+    stamps[0] = generation
+    pending.append(0)
+    while pending:
+        stateIdx = pending.pop()
+        if moves[stateIdx]:
+            current.append(stateIdx)
+        for target in epsilon[stateIdx]:
+            if stamps[target] != generation:
+                stamps[target] = generation
+                pending.append(target)
+
+    for symbol in inputString:
+        generation += 1
+        following.clear()
+        if classify is not None:
+            symbol = classify(symbol)
+
+        for stateIdx in current:
+            targets = moves[stateIdx].get(symbol)
+            if not targets:
+                continue
+            for target in targets:
+                if stamps[target] == generation:
+                    continue
+                # Agregar el destino y su cierre epsilon
+                stamps[target] = generation
+                pending.append(target)
+                while pending:
+                    reached = pending.pop()
+                    if moves[reached]:
+                        following.append(reached)
+                    for nextIdx in epsilon[reached]:
+                        if stamps[nextIdx] != generation:
+                            stamps[nextIdx] = generation
+                            pending.append(nextIdx)
+
+        current, following = following, current
+        if not current and stamps[accepted] != generation:
+            return False
+
+    return stamps[accepted] == generation
+
+
+def simulateAFN(afn: dict, inputString: str) -> bool:
+    return runAFN(prepareAFN(afn), inputString)
+
+
+if __name__ == "__main__":
+    exampleAFN = toAFN(toPostFix("(a+b)*a(a+b)(a+b)"))
+    for example in ("abaab", "abba", "aaa", ""):
+        print(example, simulateAFN(exampleAFN, example))
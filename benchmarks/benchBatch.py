@@ -0,0 +1,62 @@
+# Benchmark del verificador por lotes con NumPy (batchAFD.match_batch).
+#
+# Verifica 1 000 000 de identificadores cortos contra un AFD compilado y compara
+# con recorrer la tabla cadena por cadena (run_compiled_afd). Ejecutar desde la raíz:
+#
+#   python benchmarks/benchBatch.py [cantidad]
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Primera_parte"))
+
+from regexpToAFD import (
+    augmented_postfix,
+    build_syntax_tree,
+    compile_afd,
+    construct_afd,
+    minimize_afd,
+    run_compiled_afd,
+)
+from batchAFD import match_batch
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+DIGITS = "0123456789"
+
+# Identificador: letra o "_" seguida de letras, dígitos o "_"
+IDENTIFIER = f"({'|'.join(LETTERS)}|_)({'|'.join(LETTERS + DIGITS)}|_)*"
+
+
+def identifiers(count, seed=0):
+    rng = random.Random(seed)
+    alphabet = LETTERS + DIGITS + "_"
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 16)))
+        for _ in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    compiled_afd = compile_afd(
+        *minimize_afd(*construct_afd(*build_syntax_tree(augmented_postfix(IDENTIFIER))))
+    )
+    candidates = identifiers(count)
+
+    start = time.perf_counter()
+    batch = match_batch(compiled_afd, candidates)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [run_compiled_afd(compiled_afd, candidate) for candidate in candidates]
+    single_time = time.perf_counter() - start
+
+    assert batch.tolist() == single
+    print(f"{count} cadenas, {int(batch.sum())} aceptadas")
+    print(f"match_batch:      {batch_time:.3f} s ({count / batch_time:,.0f} cadenas/s)")
+    print(
+        f"run_compiled_afd: {single_time:.3f} s ({count / single_time:,.0f} cadenas/s)"
+    )
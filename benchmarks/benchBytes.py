@@ -0,0 +1,52 @@
+# Benchmark del autómata de bytes UTF-8 (bytesAFD.ByteMatcher).
+#
+# Verifica unos 10 MB de texto ASCII y de texto con caracteres de varios bytes, y
+# compara decodificar y usar matcherAFD.Matcher con recorrer los bytes directamente.
+# Ejecutar desde la raíz:
+#
+#   python benchmarks/benchBytes.py [megabytes]
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Primera_parte"))
+
+from bytesAFD import ByteMatcher
+from matcherAFD import Matcher
+
+CASES = (
+    ("ascii", r"[a-z0-9 \n]*", "hola mundo 2024\n"),
+    ("latin", r"[a-zñáéíóú \n]*", "canción año pequeño\n"),
+    ("cjk", r"[一-鿿 \n]*", "自动机 正则表达式\n"),
+)
+
+
+def timed(function, argument):
+    start = time.perf_counter()
+    result = function(argument)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for name, regex, line in CASES:
+        data = line.encode("utf-8")
+        data *= int(megabytes * 1024 * 1024) // len(data)
+
+        matcher = Matcher.from_regex(regex)
+        byte_matcher = ByteMatcher.from_regex(regex)
+
+        decoded, decoded_time = timed(
+            lambda data: matcher.fullmatch(data.decode("utf-8")), data
+        )
+        raw, raw_time = timed(byte_matcher.fullmatch, data)
+        assert decoded == raw
+
+        size = len(data) / (1024 * 1024)
+        states = len(byte_matcher.byte_afd["accepting"])
+        print(f"{name}: {size:.1f} MB, {states} estados de bytes, aceptado={raw}")
+        timings = (("decode + Matcher", decoded_time), ("ByteMatcher", raw_time))
+        for label, elapsed in timings:
+            print(f"  {label + ':':17} {elapsed:.3f} s ({size / elapsed:.1f} MB/s)")
@@ -0,0 +1,69 @@
+# Benchmark de las clases de caracteres de la construcción directa.
+#
+# Compara cada clase ([a-z], [0-9A-Za-z], un bloque Unicode) con la unión escrita a
+# mano de todos sus caracteres: cantidad de posiciones del árbol, ancho de la tabla
+# compilada (columnas) y tiempo de compile_regex. Las clases cuya unión sería enorme
+# (bloques de miles de caracteres) o imposible de escribir ([^a], .) solo se miden
+# como clase. Ejecutar desde la raíz del repositorio:
+#
+#   python benchmarks/benchClasses.py
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Primera_parte"))
+
+from regexpToAFD import augmented_postfix, build_syntax_tree, compile_regex
+
+# Las uniones de más caracteres que esto no se construyen
+MAX_UNION_SIZE = 300
+
+
+def union(characters):
+    return "(" + "|".join(characters) + ")"
+
+
+def letters(first, last):
+    return [chr(code) for code in range(ord(first), ord(last) + 1)]
+
+
+def patterns():
+    lower = letters("a", "z")
+    alnum = letters("0", "9") + letters("A", "Z") + lower
+    cyrillic = letters("а", "я")
+    cjk = letters("一", "龥")
+
+    # (nombre, clase, unión equivalente o None)
+    yield "ident", "[a-z][a-z0-9]*", None
+    yield "lower", "[a-z]*x[a-z]*", union(lower) + "*x" + union(lower) + "*"
+    yield "alnum", "[0-9A-Za-z][0-9A-Za-z]*", union(alnum) + union(alnum) + "*"
+    yield "cyrillic", "[а-я]*", union(cyrillic) + "*"
+    yield "cjk", "[一-龥]*", union(cjk) + "*"
+    yield "negated", "([^a]a)*", None
+    yield "wildcard", ".*a.", None
+
+
+def measure(regex):
+    positions = len(build_syntax_tree(augmented_postfix(regex))[1])
+    start = time.perf_counter()
+    compiled = compile_regex(regex)
+    elapsed = time.perf_counter() - start
+    return positions, compiled["width"], elapsed
+
+
+if __name__ == "__main__":
+    print(
+        f"{'patrón':<10} {'forma':<6} {'posiciones':>10} {'columnas':>8} "
+        f"{'compilar (s)':>12}"
+    )
+    for name, regex, expanded in patterns():
+        for form, text in (("clase", regex), ("unión", expanded)):
+            if text is None:
+                continue
+            if form == "unión" and text.count("|") > MAX_UNION_SIZE:
+                print(f"{name:<10} {form:<6} {'-':>10} {'-':>8} {'-':>12}")
+                continue
+            positions, width, elapsed = measure(text)
+            print(f"{name:<10} {form:<6} {positions:>10} {width:>8} {elapsed:>12.4f}")
@@ -0,0 +1,106 @@
+# Benchmark de la construcción de subconjuntos con la tabla de cierres epsilon.
+#
+# Compara fromAFNToAFD (cierres de computeClosures, calculados una vez) con la versión
+# anterior, que calculaba el cierre de cada destino de cada estado en cada símbolo
+# con previous_findClosure. Los AFN son los de Thompson generados por
+# regexpToAFN.toAFN. Ejecutar desde la raíz del repositorio:
+#
+#   python benchmarks/benchClosures.py
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Segunda_parte"))
+
+from shunYard import toPostFix
+from regexpToAFN import toAFN
+from AFNToAFD import fromAFNToAFD, newAFD
+
+
+def previous_findClosure(afn, stateIdx, alreadyEvaluated):
+    # Cierre de un solo estado recorriendo las transiciones epsilon con una pila
+    closure = set()
+    inputs = set()
+    pending = [stateIdx]
+
+    while pending:
+        stateIdx = pending.pop()
+        if stateIdx in alreadyEvaluated:
+            continue
+
+        alreadyEvaluated.add(stateIdx)
+
+        original = afn["transitions"][stateIdx]
+        closure.add(stateIdx)
+        inputs.update(original.keys())
+
+        if "_" in original:
+            pending.extend(original["_"])
+
+    return (closure, inputs)
+
+
+def previous_fromAFNToAFD(afn):
+    # Versión anterior: un previous_findClosure nuevo por cada destino alcanzado
+    afdTransitions = {}
+    closure, inputs = previous_findClosure(afn, 0, set())
+    pending = [(frozenset(closure), frozenset(inputs))]
+    while pending:
+        closure, inputs = pending.pop()
+        if closure in afdTransitions:
+            continue
+        afdTransitions[closure] = {}
+        for i in inputs:
+            if i == "_":
+                continue
+            reach = set()
+            reachInputs = set()
+            for stateIdx in closure:
+                state = afn["transitions"][stateIdx]
+                if i not in state:
+                    continue
+                for targetIdx in state[i]:
+                    target, targetInput = previous_findClosure(afn, targetIdx, set())
+                    reach |= target
+                    reachInputs |= targetInput
+            reach = frozenset(reach)
+            afdTransitions[closure][i] = reach
+            if reach not in afdTransitions:
+                pending.append((reach, frozenset(reachInputs)))
+
+    accepted = [state for state in afdTransitions if afn["accepted"] in state]
+    return newAFD(afdTransitions, accepted)
+
+
+def patterns():
+    # Estrellas anidadas: cierres epsilon grandes y con ciclos
+    for k in (5, 20, 80, 320):
+        yield f"nested_{k}", "((a*b*)*c)*" * k
+    # Unión ancha dentro de una cerradura
+    for k in (10, 40, 160, 640):
+        yield f"wide_{k}", "(" + "+".join("ab" * (i % 4 + 1) for i in range(k)) + ")*"
+    # Caso exponencial clásico
+    for k in (6, 9):
+        yield f"exp_{k}", "(a+b)*a" + "(a+b)" * k
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(
+        f"{'patrón':<12} {'estados AFN':>11} {'estados AFD':>11} {'anterior (s)':>12} {'tabla (s)':>10}"
+    )
+    for name, regex in patterns():
+        afn = toAFN(toPostFix(regex))
+        afd, new_time = timed(fromAFNToAFD, afn)
+        _, previous_time = timed(previous_fromAFNToAFD, afn)
+        print(
+            f"{name:<12} {len(afn['transitions']):>11} {len(afd['transitions']):>11} "
+            f"{previous_time:>12.3f} {new_time:>10.3f}"
+        )
@@ -0,0 +1,72 @@
+# Benchmark de uniones grandes de palabras clave en los dos pipelines.
+#
+# Compila w1|w2|...|wn (palabras de 8 letras) con la construcción directa y con
+# Thompson, subconjuntos y minimización (Segunda_parte, donde la unión es "+"), y
+# mide cada etapa del pipeline de subconjuntos con instrumentAFD (el tiempo de
+# fromAFNToAFD incluye el de computeClosures, que se llama dentro). Con los cierres
+# epsilon bajo demanda de computeClosures ambos pipelines crecen de forma casi lineal
+# con la cantidad de palabras. Ejecutar desde la raíz del repositorio:
+#
+#   python benchmarks/benchKeywords.py [cantidad ...]
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Primera_parte"))
+
+from cacheAFD import pipeline_functions
+from instrumentAFD import instrument
+
+DEFAULT_COUNTS = (1000, 5000, 20000, 40000)
+
+# Etapas del pipeline de subconjuntos que se muestran por separado
+SUBSETS_STAGES = (
+    "subsets.toAFN",
+    "subsets.computeClosures",
+    "subsets.fromAFNToAFD",
+    "subsets.minimize_afd",
+)
+
+
+def keywords(count, length=8, seed=0):
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(alphabet) for _ in range(length)) for _ in range(count)]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    counts = [int(count) for count in sys.argv[1:]] or DEFAULT_COUNTS
+    _, compile_direct = pipeline_functions("direct")
+    _, compile_subsets = pipeline_functions("subsets")
+
+    print(
+        f"{'palabras':>8} {'estados':>8} {'directo (s)':>11} {'estados':>8} "
+        f"{'subconjuntos (s)':>16}  "
+        + " ".join(f"{name.split('.')[1]:>15}" for name in SUBSETS_STAGES)
+    )
+    for count in counts:
+        words = keywords(count)
+        direct, direct_time = timed(compile_direct, "|".join(words))
+        with instrument() as recorder:
+            subsets, subsets_time = timed(compile_subsets, "+".join(words))
+        # Ambos AFD son el AFD mínimo del mismo lenguaje
+        assert len(direct["accepting"]) == len(subsets["accepting"])
+
+        stages = recorder.as_dict()["stages"]
+        print(
+            f"{count:>8} {len(direct['accepting']):>8} {direct_time:>11.2f} "
+            f"{len(subsets['accepting']):>8} {subsets_time:>16.2f}  "
+            + " ".join(
+                f"{stages.get(name, {}).get('seconds', 0.0):>15.2f}"
+                for name in SUBSETS_STAGES
+            )
+        )
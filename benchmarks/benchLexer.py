@@ -0,0 +1,74 @@
+# Benchmark del analizador léxico de coincidencia más larga (lexerAFD.tokenize).
+#
+# Tokeniza un archivo fuente de varios MB (o uno generado con palabras clave,
+# identificadores y números separados por espacios y saltos de línea) y reporta
+# tokens por segundo. Ejecutar desde la raíz:
+#
+#   python benchmarks/benchLexer.py [MB | ruta]
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Primera_parte"))
+
+from lexerAFD import compile_lexer, tokenize
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+DIGITS = "0123456789"
+KEYWORDS = ["if", "else", "while", "for", "return", "def", "class", "import"]
+
+RULES = [
+    *((keyword.upper(), keyword) for keyword in KEYWORDS),
+    ("NUMBER", f"({'|'.join(DIGITS)})({'|'.join(DIGITS)})*"),
+    ("IDENT", f"({'|'.join(LETTERS)})({'|'.join(LETTERS + DIGITS)})*"),
+]
+
+SKIP = " \t\r\n"
+
+
+def source(megabytes, seed=0):
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < megabytes * 1024 * 1024:
+        kind = rng.random()
+        if kind < 0.25:
+            word = rng.choice(KEYWORDS)
+        elif kind < 0.45:
+            word = "".join(rng.choice(DIGITS) for _ in range(rng.randint(1, 8)))
+        else:
+            word = rng.choice(LETTERS) + "".join(
+                rng.choice(LETTERS + DIGITS) for _ in range(rng.randint(0, 11))
+            )
+        words.append(word)
+        words.append("\n" if rng.random() < 0.1 else " ")
+        size += len(word) + 1
+    return "".join(words)
+
+
+if __name__ == "__main__":
+    argument = sys.argv[1] if len(sys.argv) > 1 else "4"
+    if os.path.exists(argument):
+        with open(argument, encoding="utf-8") as file:
+            text = file.read()
+    else:
+        text = source(float(argument))
+
+    start = time.perf_counter()
+    compiled_lexer = compile_lexer(RULES)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    count = 0
+    for _ in tokenize(compiled_lexer, text, skip=SKIP):
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"AFD: {len(compiled_lexer['accepting'])} estados, compilado en {compile_time:.3f} s"
+    )
+    print(f"{len(text) / 1e6:.1f} MB, {count} tokens en {elapsed:.3f} s")
+    print(f"{count / elapsed:,.0f} tokens/s, {len(text) / elapsed / 1e6:.2f} MB/s")
@@ -0,0 +1,82 @@
+# Benchmark de la minimización de Segunda_parte sobre AFDs de fromAFNToAFD.
+#
+# Compara minimizeAFD.minimize_afd (refinamiento de Hopcroft) con la agrupación
+# de una sola pasada que se usaba antes. Ejecutar desde la raíz del repositorio:
+#
+#   python benchmarks/benchMinimize.py
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Segunda_parte"))
+
+from shunYard import toPostFix
+from regexpToAFN import toAFN
+from AFNToAFD import fromAFNToAFD
+from minimizeAFD import minimize_afd
+
+
+def single_pass_minimize_afd(afd):
+    # Versión anterior: agrupa una sola vez por (transiciones, aceptación). Los
+    # grupos se nombran con enteros en lugar de string.ascii_uppercase[i] para
+    # que pueda medirse con más de 26 grupos.
+    accepted_states = set(afd["accepted"])
+    grouped = {}
+    for state, transitions in afd["transitions"].items():
+        key = (frozenset(transitions.items()), state in accepted_states)
+        grouped.setdefault(key, []).append(state)
+
+    minimized_transitions = {}
+    minimized_accepted = set()
+    state_mapping = {}
+    for i, group in enumerate(grouped.values()):
+        letter = i
+        state_mapping[frozenset(group)] = letter
+        minimized_transitions[letter] = {}
+        if any(state in accepted_states for state in group):
+            minimized_accepted.add(letter)
+
+    for group, letter in state_mapping.items():
+        sample_state = next(iter(group))
+        for input_char, next_state in afd["transitions"][sample_state].items():
+            for next_group, next_letter in state_mapping.items():
+                if next_state in next_group:
+                    minimized_transitions[letter][input_char] = next_letter
+                    break
+
+    return {"transitions": minimized_transitions, "accepted": list(minimized_accepted)}
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def patterns():
+    # (a+b)*a(a+b)^k: el AFD de subconjuntos crece como 2^(k+1)
+    for k in range(2, 9):
+        yield f"(a+b)*a{'(a+b)' * k}"
+    # Ramas con prefijos distintos y el mismo sufijo: los sufijos son equivalentes
+    # pero una sola pasada de agrupación no los fusiona
+    for branches, length in ((4, 8), (16, 16), (40, 32)):
+        prefixes = "defghijklmnopqrstuvwxyzDEFGHIJKLMNOPQRSTUVWXYZ"[:branches]
+        yield "+".join(f"{prefix}({'bc' * length})*" for prefix in prefixes)
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(10000)
+    print(
+        f"{'estados':>8} {'nuevo':>7} {'t_nuevo':>9} {'anterior':>8} {'t_anterior':>10}  regex"
+    )
+    for regex in patterns():
+        afd = fromAFNToAFD(toAFN(toPostFix(regex)))
+        minimized, new_time = timed(minimize_afd, afd)
+        previous, previous_time = timed(single_pass_minimize_afd, afd)
+        print(
+            f"{len(afd['transitions']):>8} {len(minimized['transitions']):>7} "
+            f"{new_time:>9.4f} {len(previous['transitions']):>8} "
+            f"{previous_time:>10.4f}  {regex[:40]}"
+        )
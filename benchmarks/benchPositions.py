@@ -0,0 +1,67 @@
+# Benchmark de la construcción directa del AFD: conjuntos vs máscaras de bits.
+#
+# Compara construct_afd_from_sets (posiciones en set/frozenset) con
+# construct_afd_from_masks (posiciones como enteros de Python usados como máscara
+# de bits) sobre expresiones con miles de posiciones, junto con construct_afd, que
+# elige entre ambas según la densidad de siguientepos. Ejecutar desde la raíz:
+#
+#   python benchmarks/benchPositions.py
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Primera_parte"))
+
+from regexpToAFD import (
+    augmented_postfix,
+    build_syntax_tree,
+    construct_afd,
+    construct_afd_from_masks,
+    construct_afd_from_sets,
+)
+
+
+def words(count, length, alphabet, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(alphabet) for _ in range(length)) for _ in range(count)]
+
+
+def patterns():
+    # Cerradura de una unión de palabras: siguientepos denso
+    for count in (250, 1000, 2500):
+        yield f"star_ab_{count}", "(" + "|".join(words(count, 6, "ab")) + ")*"
+    yield "star_a-h_1000", "(" + "|".join(words(1000, 6, "abcdefgh")) + ")*"
+    # Unión de palabras sin cerradura: siguientepos disperso
+    for count in (500, 2000):
+        yield f"words_{count}", "(" + "|".join(words(count, 8, "abcdefgh")) + ")"
+    # Caso exponencial clásico: pocas posiciones, muchos estados
+    for k in (10, 13):
+        yield f"exp_{k}", "(a|b)*a" + "(a|b)" * k
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(
+        f"{'patrón':<16} {'posiciones':>10} {'estados':>8} {'sets (s)':>9} "
+        f"{'máscaras (s)':>12} {'speedup':>8} {'construct_afd (s)':>17}"
+    )
+    for name, regex in patterns():
+        root, position_symbol_map = build_syntax_tree(augmented_postfix(regex))
+        (states, _, _), sets_time = timed(
+            construct_afd_from_sets, root, position_symbol_map
+        )
+        _, masks_time = timed(construct_afd_from_masks, root, position_symbol_map)
+        _, chosen_time = timed(construct_afd, root, position_symbol_map)
+        print(
+            f"{name:<16} {len(position_symbol_map):>10} {len(states):>8} "
+            f"{sets_time:>9.3f} {masks_time:>12.3f} {sets_time / masks_time:>7.1f}x "
+            f"{chosen_time:>17.3f}"
+        )
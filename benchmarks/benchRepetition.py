@@ -0,0 +1,92 @@
+# Benchmark de las repeticiones acotadas {m,n} de la construcción directa.
+#
+# Compara x{m,n} (un solo nodo con contador) con la misma expresión desenrollada a
+# mano (m copias de x seguidas de n - m copias de x?): posiciones del árbol, estados
+# del AFD minimizado, tiempo de compile_regex y pico de memoria (tracemalloc). Las
+# versiones desenrolladas con más de UNROLLED_MAX_BOUND copias no se construyen.
+# También mide el AFD perezoso, que no calcula los estados que la entrada no alcanza.
+# Ejecutar desde la raíz del repositorio:
+#
+#   python benchmarks/benchRepetition.py [límite ...]
+
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Primera_parte"))
+
+from lazyAFD import lazy_afd_from_regex
+from regexpToAFD import augmented_postfix, build_syntax_tree, compile_regex
+
+# Las expresiones desenrolladas de más copias que esto no se construyen
+UNROLLED_MAX_BOUND = 1000
+
+DEFAULT_BOUNDS = (100, 1000, 5000)
+
+
+def unrolled(atom, minimum, maximum):
+    return atom * minimum + (atom + "?") * (maximum - minimum)
+
+
+def patterns(bound):
+    # (nombre, expresión con {m,n}, expresión desenrollada, cadena aceptada)
+    yield "a{1,n}", f"a{{1,{bound}}}", unrolled("a", 1, bound), "a" * bound
+    yield (
+        "[a-z0-9]{n}",
+        f"[a-z0-9]{{{bound}}}",
+        unrolled("[a-z0-9]", bound, bound),
+        "x1" * (bound // 2),
+    )
+    yield (
+        "(ab|c){0,n}",
+        f"(ab|c){{0,{bound}}}",
+        unrolled("(ab|c)", 0, bound),
+        "abc" * (bound // 2),
+    )
+    yield "x[0-9]{n,}", f"x[0-9]{{{bound},}}", None, "x" + "7" * (bound + 3)
+
+
+def measure(regex):
+    positions = len(build_syntax_tree(augmented_postfix(regex))[1])
+    tracemalloc.start()
+    start = time.perf_counter()
+    compiled = compile_regex(regex)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return positions, len(compiled["accepting"]), elapsed, peak
+
+
+def measure_lazy(regex, text):
+    start = time.perf_counter()
+    lazy_afd = lazy_afd_from_regex(regex)
+    accepted = lazy_afd.fullmatch(text)
+    return accepted, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    bounds = [int(bound) for bound in sys.argv[1:]] or DEFAULT_BOUNDS
+    print(
+        f"{'patrón':<12} {'n':>6} {'forma':<12} {'posiciones':>10} {'estados':>8} "
+        f"{'compilar (s)':>12} {'pico (MB)':>10}"
+    )
+    for bound in bounds:
+        for name, regex, expanded, text in patterns(bound):
+            for form, expression in (("contador", regex), ("desenrollada", expanded)):
+                if expression is None:
+                    continue
+                if form == "desenrollada" and bound > UNROLLED_MAX_BOUND:
+                    print(f"{name:<12} {bound:>6} {form:<12} {'-':>10}")
+                    continue
+                positions, states, elapsed, peak = measure(expression)
+                print(
+                    f"{name:<12} {bound:>6} {form:<12} {positions:>10} {states:>8} "
+                    f"{elapsed:>12.4f} {peak / 2**20:>10.1f}"
+                )
+            accepted, elapsed = measure_lazy(regex, text)
+            print(
+                f"{name:<12} {bound:>6} {'perezoso':<12} "
+                f"aceptada={accepted} en {elapsed:.4f} s"
+            )
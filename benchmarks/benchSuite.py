@@ -0,0 +1,339 @@
+# Suite de benchmarks de todas las etapas de ambos pipelines.
+#
+# Para cada familia de patrones y cada tamaño mide el tiempo (mínimo de varias
+# repeticiones), el pico de memoria (tracemalloc, en una pasada aparte para no
+# alterar los tiempos) y el tamaño de los autómatas de cada etapa:
+#
+#   directo:       toPostFix, build_syntax_tree, compute_followpos, construct_afd,
+#                  minimize_afd, compile_afd
+#   subconjuntos:  toPostFix, toAFN, fromAFNToAFD, minimize_afd
+#   verificadores: run_compiled_afd, Matcher.fullmatch, LazyAFD y simulateAFN sobre
+#                  entradas de distintos tamaños
+#
+# Los resultados se guardan en JSON y se comparan con una línea base guardada antes
+# con --save-baseline; las etapas más lentas que la línea base por encima del umbral
+# se marcan como regresiones. Ejecutar desde la raíz:
+#
+#   python benchmarks/benchSuite.py [--quick] [--save-baseline] [--threshold 1.2]
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Primera_parte"))
+sys.path.insert(0, os.path.join(ROOT, "Segunda_parte"))
+
+import regexpToAFD as direct
+from AFNToAFD import fromAFNToAFD
+from lazyAFD import lazy_afd_from_regex
+from matcherAFD import Matcher
+from minimizeAFD import minimize_afd as minimize_subsets
+from regexpToAFN import toAFN
+from shunYard import toPostFix as subsets_postfix
+from simulateAFN import prepareAFN, runAFN
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "latest.json")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+
+
+# Familias de patrones (sintaxis de Primera_parte; en Segunda_parte "|" es "+")
+def long_literal(n):
+    return "".join("abc"[i % 3] for i in range(n))
+
+
+def wide_alternation(n):
+    return "(" + "|".join(f"w{i}" for i in range(n)) + ")"
+
+
+def nested_stars(n):
+    pattern = "a"
+    for depth in range(n):
+        pattern = f"({pattern}{'ab'[depth % 2]})*"
+    return pattern
+
+
+def exponential(n):
+    return "(a|b)*a" + "(a|b)" * n
+
+
+FAMILIES = {
+    "long_literal": (long_literal, [100, 1000, 4000]),
+    "wide_alternation": (wide_alternation, [10, 100, 1000]),
+    "nested_stars": (nested_stars, [5, 20, 80]),
+    "exponential": (exponential, [4, 8, 12]),
+}
+
+QUICK_FAMILIES = {
+    "long_literal": (long_literal, [100, 1000]),
+    "wide_alternation": (wide_alternation, [10, 100]),
+    "nested_stars": (nested_stars, [5, 20]),
+    "exponential": (exponential, [4, 8]),
+}
+
+# Los verificadores se miden con (a|b)*a(a|b){n}: toda cadena de a y b se lee completa
+MATCHER_PATTERN_SIZE = 8
+INPUT_SIZES = [1_000, 100_000, 1_000_000]
+QUICK_INPUT_SIZES = [1_000, 100_000]
+
+# Las etapas más rápidas que esto (en ambas corridas) no se comparan: es puro ruido
+MIN_COMPARE_SECONDS = 0.001
+
+
+def measure(function, repeat):
+    """Devuelve (resultado, mejor tiempo en segundos, pico de memoria en bytes)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, best, peak
+
+
+def direct_stages(pattern, repeat):
+    stages = []
+
+    postfix, seconds, peak = measure(lambda: direct.augmented_postfix(pattern), repeat)
+    stages.append(("toPostFix", seconds, peak, {"postfix_length": len(postfix)}))
+
+    (root, symbols), seconds, peak = measure(
+        lambda: direct.build_syntax_tree(postfix), repeat
+    )
+    stages.append(("build_syntax_tree", seconds, peak, {"positions": len(symbols)}))
+
+    def followpos():
+        table = {pos: set() for pos in symbols}
+        direct.compute_followpos(root, table)
+        return table
+
+    table, seconds, peak = measure(followpos, repeat)
+    stages.append(
+        (
+            "compute_followpos",
+            seconds,
+            peak,
+            {"followpos_size": sum(map(len, table.values()))},
+        )
+    )
+
+    (states, transitions, accepting), seconds, peak = measure(
+        lambda: direct.construct_afd(root, symbols), repeat
+    )
+    stages.append(
+        (
+            "construct_afd",
+            seconds,
+            peak,
+            {"states": len(states), "transitions": len(transitions)},
+        )
+    )
+
+    minimized, seconds, peak = measure(
+        lambda: direct.minimize_afd(states, transitions, accepting), repeat
+    )
+    stages.append(
+        (
+            "minimize_afd",
+            seconds,
+            peak,
+            {"states": len(minimized[0]), "transitions": len(minimized[1])},
+        )
+    )
+
+    compiled, seconds, peak = measure(lambda: direct.compile_afd(*minimized), repeat)
+    stages.append(
+        ("compile_afd", seconds, peak, {"table_cells": len(compiled["table"])})
+    )
+
+    return stages
+
+
+def subsets_stages(pattern, repeat):
+    stages = []
+    infix = pattern.replace("|", "+")
+
+    postfix, seconds, peak = measure(lambda: subsets_postfix(infix), repeat)
+    stages.append(("toPostFix", seconds, peak, {"postfix_length": len(postfix)}))
+
+    afn, seconds, peak = measure(lambda: toAFN(postfix), repeat)
+    stages.append(("toAFN", seconds, peak, {"states": len(afn["transitions"])}))
+
+    afd, seconds, peak = measure(lambda: fromAFNToAFD(afn), repeat)
+    stages.append(
+        (
+            "fromAFNToAFD",
+            seconds,
+            peak,
+            {
+                "states": len(afd["transitions"]),
+                "transitions": sum(map(len, afd["transitions"].values())),
+            },
+        )
+    )
+
+    minimized, seconds, peak = measure(lambda: minimize_subsets(afd), repeat)
+    stages.append(
+        ("minimize_afd", seconds, peak, {"states": len(minimized["transitions"])})
+    )
+
+    return stages
+
+
+def matcher_stages(input_sizes, repeat):
+    pattern = exponential(MATCHER_PATTERN_SIZE)
+    compiled = direct.compile_regex(pattern)
+    matcher = Matcher(compiled, pattern, "direct")
+    lazy = lazy_afd_from_regex(pattern)
+    prepared = prepareAFN(toAFN(subsets_postfix(pattern.replace("|", "+"))))
+    rng = random.Random(0)
+
+    results = []
+    for size in input_sizes:
+        text = "".join(rng.choice("ab") for _ in range(size))
+        engines = {
+            "run_compiled_afd": lambda: direct.run_compiled_afd(compiled, text),
+            "Matcher.fullmatch": lambda: matcher.fullmatch(text),
+            "LazyAFD.fullmatch": lambda: lazy.fullmatch(text),
+            "simulateAFN": lambda: runAFN(prepared, text),
+        }
+        for name, function in engines.items():
+            accepted, seconds, peak = measure(function, repeat)
+            results.append((size, name, seconds, peak, {"accepted": accepted}))
+    return results
+
+
+def run_suite(families, input_sizes, repeat):
+    results = []
+    for family, (build, sizes) in families.items():
+        for size in sizes:
+            pattern = build(size)
+            for pipeline, stages in (
+                ("direct", direct_stages),
+                ("subsets", subsets_stages),
+            ):
+                for stage, seconds, peak, sizes_info in stages(pattern, repeat):
+                    results.append(
+                        {
+                            "pipeline": pipeline,
+                            "family": family,
+                            "size": size,
+                            "stage": stage,
+                            "seconds": seconds,
+                            "peak_bytes": peak,
+                            "sizes": sizes_info,
+                        }
+                    )
+                    print(
+                        f"{pipeline:8} {family:17} {size:6} {stage:18} "
+                        f"{seconds * 1000:10.3f} ms {peak / 1024:10.1f} KiB {sizes_info}"
+                    )
+
+    for size, engine, seconds, peak, info in matcher_stages(input_sizes, repeat):
+        results.append(
+            {
+                "pipeline": "matchers",
+                "family": "exponential",
+                "size": size,
+                "stage": engine,
+                "seconds": seconds,
+                "peak_bytes": peak,
+                "sizes": info,
+            }
+        )
+        print(
+            f"matchers exponential      {size:8} {engine:18} "
+            f"{seconds * 1000:10.3f} ms {peak / 1024:10.1f} KiB"
+        )
+
+    return results
+
+
+def result_key(result):
+    return (result["pipeline"], result["family"], result["size"], result["stage"])
+
+
+def compare(results, baseline, threshold):
+    """Imprime las etapas cuyo tiempo cambió más que `threshold` y devuelve las regresiones."""
+    previous = {result_key(result): result for result in baseline["results"]}
+    regressions = []
+
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None or max(old["seconds"], result["seconds"]) < MIN_COMPARE_SECONDS:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        if ratio >= threshold:
+            regressions.append((result, ratio))
+            label = "REGRESIÓN"
+        elif ratio <= 1 / threshold:
+            label = "mejora"
+        else:
+            continue
+        print(
+            f"{label:9} {' '.join(map(str, result_key(result)))}: "
+            f"{old['seconds'] * 1000:.3f} ms -> {result['seconds'] * 1000:.3f} ms "
+            f"(x{ratio:.2f})"
+        )
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks de todas las etapas de ambos pipelines."
+    )
+    parser.add_argument("--quick", action="store_true", help="tamaños reducidos")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="guardar estos resultados como la nueva línea base",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="razón de tiempo a partir de la cual se reporta una regresión",
+    )
+    options = parser.parse_args()
+
+    families = QUICK_FAMILIES if options.quick else FAMILIES
+    input_sizes = QUICK_INPUT_SIZES if options.quick else INPUT_SIZES
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": options.quick,
+        "results": run_suite(families, input_sizes, options.repeat),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(options.output)), exist_ok=True)
+    with open(options.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Resultados en {options.output}")
+
+    if options.save_baseline:
+        with open(options.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Línea base guardada en {options.baseline}")
+    elif os.path.exists(options.baseline):
+        with open(options.baseline) as file:
+            regressions = compare(report["results"], json.load(file), options.threshold)
+        print(f"{len(regressions)} regresiones respecto a {options.baseline}")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,124 @@
+# Benchmark de la construcción de Thompson (regexpToAFN.toAFN).
+#
+# Compara la construcción sobre un arreglo compartido de estados con la versión
+# anterior, que copiaba y desplazaba el sub-AFN completo (displaceTransitions) en cada
+# ".", "+" y "*", con costo cuadrático en la longitud del patrón. Los patrones tienen
+# decenas de miles de operadores. Ejecutar desde la raíz del repositorio:
+#
+#   python benchmarks/benchThompson.py
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Segunda_parte"))
+
+from shunYard import toPostFix
+from regexpToAFN import newAFN, toAFN
+
+# Si la versión anterior tarda más que esto, no se mide con los tamaños siguientes de
+# la misma familia (es cuadrática: 10 veces más operadores son 100 veces más tiempo)
+PREVIOUS_MAX_SECONDS = 1.0
+
+
+def initializeOrAppend(dictionary, key, append):
+    if key not in dictionary:
+        dictionary[key] = []
+    dictionary[key].append(append)
+
+
+def displaceTransitions(afn, delta):
+    return [
+        {
+            word: [d + delta for d in destinations]
+            for (word, destinations) in transition.items()
+        }
+        for transition in afn["transitions"]
+    ]
+
+
+def previous_toAFN(postfix):
+    # Versión anterior: cada operador copia los sub-AFN con los índices desplazados
+    stack = []
+    for char in postfix:
+        match char:
+            case ".":
+                afn2 = stack.pop()
+                afn1 = stack.pop()
+                afn1OriginalLength = len(afn1["transitions"])
+                newAccepted = afn2["accepted"] + afn1OriginalLength
+                initializeOrAppend(
+                    afn1["transitions"][afn1["accepted"]], "_", afn1OriginalLength
+                )
+                afn1["transitions"] += displaceTransitions(afn2, afn1OriginalLength)
+                afn1["accepted"] = newAccepted
+                stack.append(afn1)
+
+            case "+":
+                afn2 = stack.pop()
+                afn1 = stack.pop()
+                lenAfn1 = len(afn1["transitions"])
+                afn = newAFN([{"_": [2, 2 + lenAfn1]}, {}], 1)
+                mapped1 = displaceTransitions(afn1, 2)
+                initializeOrAppend(mapped1[afn1["accepted"]], "_", 1)
+                mapped2 = displaceTransitions(afn2, 2 + lenAfn1)
+                initializeOrAppend(mapped2[afn2["accepted"]], "_", 1)
+                afn["transitions"] += mapped1 + mapped2
+                stack.append(afn)
+
+            case "*":
+                received = stack.pop()
+                afn = newAFN([{"_": [1, 2]}, {}], 1)
+                mapped = displaceTransitions(received, 2)
+                initializeOrAppend(mapped[received["accepted"]], "_", 1)
+                mapped[received["accepted"]]["_"].append(2)
+                afn["transitions"] += mapped
+                stack.append(afn)
+
+            case _:
+                stack.append(newAFN([{char: [1]}, {}], 1))
+
+    return stack.pop()
+
+
+def patterns():
+    # Concatenación larga: un "." por símbolo
+    for k in (1_000, 10_000, 50_000):
+        yield f"literal_{k}", "".join("abc"[i % 3] for i in range(k))
+    # Unión ancha: un "+" por alternativa
+    for k in (1_000, 10_000):
+        yield f"union_{k}", "(" + "+".join(f"w{i % 10}" for i in range(k)) + ")"
+    # Estrellas y uniones mezcladas
+    for k in (1_000, 10_000):
+        yield f"mixed_{k}", "(a*b+c)*" * k
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(
+        f"{'patrón':<14} {'operadores':>10} {'estados AFN':>11} "
+        f"{'anterior (s)':>12} {'arreglo (s)':>11}"
+    )
+    slow_families = set()
+    for name, regex in patterns():
+        family = name.split("_")[0]
+        postfix = toPostFix(regex)
+        operators = sum(char in ".+*" for char in postfix)
+        afn, new_time = timed(toAFN, postfix)
+        if family not in slow_families:
+            _, previous_time = timed(previous_toAFN, postfix)
+            previous = f"{previous_time:>12.3f}"
+            if previous_time > PREVIOUS_MAX_SECONDS:
+                slow_families.add(family)
+        else:
+            previous = f"{'-':>12}"
+        print(
+            f"{name:<14} {operators:>10} {len(afn['transitions']):>11} "
+            f"{previous} {new_time:>11.3f}"
+        )
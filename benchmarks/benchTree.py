@@ -0,0 +1,179 @@
+# Benchmark de la representación del árbol sintáctico (build_syntax_tree).
+#
+# Compara el SyntaxTree en arreglos paralelos con la representación anterior: un
+# objeto Node con __dict__ y dos conjuntos por nodo, en la que cada "." con un hijo
+# anulable y cada "|" que no reutilizaba el conjunto de su hijo creaban un conjunto
+# nuevo. Mide el pico de memoria (tracemalloc) y el tiempo de construir el árbol de
+# expresiones de unos 50 000 símbolos. Ejecutar desde la raíz del repositorio:
+#
+#   python benchmarks/benchTree.py
+
+import itertools
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Primera_parte"))
+
+from regexpToAFD import (
+    OPERATOR_BOUNDS,
+    augmented_postfix,
+    build_syntax_tree,
+    is_symbol_operand,
+)
+from symbolsAFD import is_repetition, iter_tokens, repetition_bounds
+
+SYMBOLS = 50_000
+
+# Tamaño de las familias en las que la versión anterior es cuadrática
+PREVIOUS_SYMBOLS = 4_000
+
+
+class PreviousNode:
+    # Versión anterior: un objeto por nodo con sus propios conjuntos
+    def __init__(self, value, left=None, right=None):
+        self.value = value
+        self.left = left
+        self.right = right
+        self.nullable = False
+        self.firstpos = set()
+        self.lastpos = set()
+        self.position = None
+
+
+def previous_merge_union_sets(left, right, attribute):
+    left_set = getattr(left, attribute)
+    right_set = getattr(right, attribute)
+    candidates = [
+        (len(child_set), child_set, other_set)
+        for child, child_set, other_set in (
+            (left, left_set, right_set),
+            (right, right_set, left_set),
+        )
+        if child.value == "|"
+    ]
+    if not candidates:
+        return left_set | right_set
+    _, reused, other = max(candidates, key=lambda candidate: candidate[0])
+    reused |= other
+    return reused
+
+
+def previous_repetition_node(child, token):
+    bounds = OPERATOR_BOUNDS.get(token) or repetition_bounds(token)
+    if bounds == (1, 1):
+        return child
+    value = next(
+        (operator for operator, limits in OPERATOR_BOUNDS.items() if limits == bounds),
+        token,
+    )
+    node = PreviousNode(value, left=child)
+    node.nullable = child.nullable or bounds[0] == 0
+    if bounds[1] == 0:
+        node.firstpos, node.lastpos = set(), set()
+    else:
+        node.firstpos, node.lastpos = child.firstpos, child.lastpos
+    return node
+
+
+def previous_build_syntax_tree(postfix):
+    stack = []
+    pos_counter = itertools.count(1)
+    position_symbol_map = {}
+
+    for char in iter_tokens(postfix):
+        if is_symbol_operand(char):
+            node = PreviousNode(char)
+            node.position = next(pos_counter)
+            node.firstpos.add(node.position)
+            node.lastpos.add(node.position)
+            position_symbol_map[node.position] = char
+            stack.append(node)
+        elif char == "*":
+            child = stack.pop()
+            node = PreviousNode("*", left=child)
+            node.nullable = True
+            node.firstpos = child.firstpos
+            node.lastpos = child.lastpos
+            stack.append(node)
+        elif char == "+" or char == "?" or is_repetition(char):
+            stack.append(previous_repetition_node(stack.pop(), char))
+        elif char == ".":
+            right = stack.pop()
+            left = stack.pop()
+            node = PreviousNode(".", left, right)
+            node.nullable = left.nullable and right.nullable
+            node.firstpos = (
+                left.firstpos | right.firstpos if left.nullable else left.firstpos
+            )
+            node.lastpos = (
+                right.lastpos | left.lastpos if right.nullable else right.lastpos
+            )
+            stack.append(node)
+        elif char == "|":
+            right = stack.pop()
+            left = stack.pop()
+            node = PreviousNode("|", left, right)
+            node.nullable = left.nullable or right.nullable
+            node.firstpos = previous_merge_union_sets(left, right, "firstpos")
+            node.lastpos = previous_merge_union_sets(left, right, "lastpos")
+            stack.append(node)
+
+    return stack.pop(), position_symbol_map
+
+
+def words(count, length, seed=0):
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice("abcdefghij") for _ in range(length)) for _ in range(count)
+    ]
+
+
+def patterns():
+    # (nombre, expresión, medir también la versión anterior)
+    yield "literal", "".join("abc"[i % 3] for i in range(SYMBOLS)), True
+    yield "palabras", "(" + "|".join(words(SYMBOLS // 10, 10)) + ")*", True
+    yield "opcionales", "([a-z]?x|y)" * (SYMBOLS // 3), True
+
+    # En estas familias la versión anterior copia en cada nivel un conjunto cada vez
+    # más grande (memoria cuadrática) y con 50 000 símbolos se queda sin memoria: se
+    # compara con PREVIOUS_SYMBOLS y la versión nueva se mide también con 50 000
+    for symbols, compare in ((PREVIOUS_SYMBOLS, True), (SYMBOLS, False)):
+        # Uniones anidadas: el hijo izquierdo de cada "|" es una concatenación
+        half = symbols // 2
+        yield "anidadas", "(a" * half + "|b)" * half, compare
+        # Cada "." tiene un hijo izquierdo anulable
+        yield "anulables", "[a-z]?" * symbols, compare
+
+
+def measure(build, postfix):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(postfix)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    print(
+        f"{'patrón':<11} {'posiciones':>10} {'forma':<9} {'tiempo (s)':>10} "
+        f"{'pico (MB)':>10}"
+    )
+    for name, regex, compare in patterns():
+        postfix = augmented_postfix(regex)
+        positions = len(build_syntax_tree(postfix)[1])
+        forms = [("arreglos", build_syntax_tree)]
+        if compare:
+            forms.insert(0, ("anterior", previous_build_syntax_tree))
+        for form, build in forms:
+            elapsed, peak = measure(build, postfix)
+            print(
+                f"{name:<11} {positions:>10} {form:<9} {elapsed:>10.3f} "
+                f"{peak / 2**20:>10.1f}"
+            )